@@ -1,7 +1,17 @@
 from langchain_openai import AzureChatOpenAI
+from langchain_core.globals import set_llm_cache
+import os
+import sys
 
 from dotenv import load_dotenv
 load_dotenv()
+
+# langgraph-study 의 common 패키지 (TieredLLMCache) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "langgraph-study"))
+from common import TieredLLMCache
+
+# 같은 입력 / 같은 schema 면 저장해 둔 structured output 을 다시 쓴다.
+set_llm_cache(TieredLLMCache("llm_cache.db"))
 # OpenAI 모델 초기화
 llm = AzureChatOpenAI(model="gpt-4o", temperature=0)  
 
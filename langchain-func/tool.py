@@ -3,9 +3,17 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableConfig, chain
 
 from langchain_community.tools import TavilySearchResults
+import os
+import sys
+
+# langgraph-study 의 common 패키지 (SingleFlightSearchTool) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "langgraph-study"))
+from common import SingleFlightSearchTool
 
 # Tavily 검색 도구 초기화 (최대 2개의 결과 반환)
-web_search = TavilySearchResults(max_results=2)
+# web_search = TavilySearchResults(max_results=2)
+# batch 안의 같은 검색어는 한 번만 요청하고, 결과는 10분 동안 재사용한다.
+web_search = SingleFlightSearchTool(TavilySearchResults(max_results=2), ttl=600)
 
 # 오늘 날짜 설정
 today = datetime.today().strftime("%Y-%m-%d")
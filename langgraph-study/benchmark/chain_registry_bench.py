@@ -0,0 +1,101 @@
+# chain_registry 적용 전/후 노드 1회 실행(1 turn) 당 오버헤드 비교
+# 실제 API 호출 없이 비교할 수 있도록 로컬 Fake chat model을 사용한다.
+import os
+import sys
+import time
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.prompts import PromptTemplate
+from langchain_openai import ChatOpenAI
+from pydantic import BaseModel, Field
+
+# part0 의 chain_registry 를 import 하기 위한 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "part0"))
+from chain_registry import ChainRegistry
+
+TURNS = 2000
+
+CHECK_TEMPLATE = """당신은 유저의 입력을 보고 날짜와 관련된 질문인지 아닌지 판별해주는 AI입니다.
+
+    유저 입력:
+    {input}
+
+    {format_instruction}
+    """
+
+
+class QuestionFilterResult(BaseModel):
+    result: bool = Field(description="Whether the question is about datetime or not")
+
+
+FAKE_RESPONSES = ['{"result": true}']
+
+
+# 기존 방식: 노드가 실행될 때마다 모델 / 파서 / 프롬프트 / 체인을 새로 만든다.
+def check_location_before(state):
+    output_parser = PydanticOutputParser(pydantic_object=QuestionFilterResult)
+    model = FakeListChatModel(responses=FAKE_RESPONSES)
+    prompt = PromptTemplate(
+        template=CHECK_TEMPLATE,
+        input_variables=["input"],
+        partial_variables={"format_instruction": output_parser.get_format_instructions()},
+    )
+    chain = prompt | model | output_parser
+    return {"lock": chain.invoke({"input": state["messages"][-1]}).result}
+
+
+registry = ChainRegistry()
+
+
+def build_check_chain():
+    output_parser = registry.parser(PydanticOutputParser, pydantic_object=QuestionFilterResult)
+    prompt = registry.prompt(
+        CHECK_TEMPLATE,
+        input_variables=["input"],
+        partial_variables={"format_instruction": output_parser.get_format_instructions()},
+    )
+    return prompt | registry.model(FakeListChatModel, responses=FAKE_RESPONSES) | output_parser
+
+
+# 레지스트리 방식: 첫 turn 에만 만들고 이후에는 꺼내 쓴다.
+def check_location_after(state):
+    chain = registry.chain("bench.check_location", build_check_chain)
+    return {"lock": chain.invoke({"input": state["messages"][-1]}).result}
+
+
+def run(label, func, turns=TURNS):
+    state = {"messages": ["29999년12월30일은 무슨 요일이야?"]}
+    func(state)  # warm-up
+    start = time.perf_counter()
+    for _ in range(turns):
+        func(state)
+    elapsed = time.perf_counter() - start
+    per_turn = elapsed / turns * 1e6
+    print(f"{label:<28} {per_turn:10.1f} us/turn")
+    return per_turn
+
+
+print(f"== node 1회 실행 오버헤드 (Fake model, {TURNS} turns) ==")
+before = run("before (per-call build)", check_location_before)
+after = run("after (registry)", check_location_after)
+print(f"speedup: x{before / after:.2f}")
+print("registry stats:", registry.stats())
+print()
+
+# ChatOpenAI 생성 비용 (HTTP 클라이언트 생성 포함). 호출은 하지 않으므로 더미 키로 충분하다.
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench-dummy")
+print("== ChatOpenAI 생성 vs 레지스트리 조회 ==")
+N = 200
+start = time.perf_counter()
+for _ in range(N):
+    ChatOpenAI(model="gpt-4o")
+new_model = (time.perf_counter() - start) / N * 1e6
+
+registry.model(ChatOpenAI, model="gpt-4o")
+start = time.perf_counter()
+for _ in range(N):
+    registry.model(ChatOpenAI, model="gpt-4o")
+cached_model = (time.perf_counter() - start) / N * 1e6
+
+print(f"{'ChatOpenAI(model=gpt-4o)':<28} {new_model:10.1f} us")
+print(f"{'registry.model(...)':<28} {cached_model:10.1f} us")
@@ -0,0 +1,127 @@
+# 필드가 많은 Pydantic state 에서 업데이트 하나를 검증하는 비용 비교
+#   1) 검증만 : PydanticState(**state) 로 전체 검증 vs ChangedKeysValidator 로 업데이트 key 만 검증
+#   2) 그래프 전체 : StateGraph(PydanticState) vs StateGraph(TypedDict) + validator.node(...)
+#      (langgraph 자체의 채널 읽기 / 쓰기 비용도 필드 수에 비례하기 때문에 차이는 1) 보다 작다. 참고용)
+#
+# 사용 예시
+#   python changed_keys_state_bench.py
+#   python changed_keys_state_bench.py --widths 10 100 2000 --nodes 50
+import argparse
+import os
+import sys
+import time
+
+from typing import Any
+
+from pydantic import BaseModel, create_model, field_validator
+from typing_extensions import TypedDict
+from langgraph.graph import START, END, StateGraph
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import ChangedKeysValidator
+
+
+class Base(BaseModel):
+    step: int = 0
+
+    @field_validator("step")
+    @classmethod
+    def validate_step(cls, value):
+        if value < 0:
+            raise ValueError("step must be >= 0")
+        return value
+
+
+def make_schema(width):
+    # 절반은 문자열, 절반은 숫자 리스트 (검색 결과 / 중간 결과가 쌓인 state 처럼)
+    fields = {}
+    for i in range(width):
+        fields[f"f{i}"] = (str, "") if i % 2 == 0 else (list[int], [])
+    return create_model(f"WideState{width}", __base__=Base, **fields)
+
+
+def make_input(width):
+    return {f"f{i}": (f"value {i}" if i % 2 == 0 else list(range(50))) for i in range(width)}
+
+
+def build(schema, nodes, validated):
+    if validated:
+        # state 는 검증하지 않는 dict 로 두고 노드 업데이트만 검증한다.
+        validator = ChangedKeysValidator(schema)
+        builder = StateGraph(TypedDict(f"{schema.__name__}Dict", {name: Any for name in schema.model_fields}))
+        wrap = validator.node
+        read = lambda state, key: state[key]
+    else:
+        builder = StateGraph(schema)
+        wrap = lambda node: node
+        read = getattr
+
+    def node(state):
+        return {"step": read(state, "step") + 1}
+
+    for i in range(nodes):
+        builder.add_node(f"node_{i}", wrap(node))
+        builder.add_edge(START if i == 0 else f"node_{i - 1}", f"node_{i}")
+    builder.add_edge(f"node_{nodes - 1}", END)
+    return builder.compile()
+
+
+def run(schema, width, nodes, repeats, validated):
+    graph = build(schema, nodes, validated)
+    payload = make_input(width)
+    if validated:
+        payload = ChangedKeysValidator(schema).validate_input(payload)
+    graph.invoke(payload)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        output = graph.invoke(payload)
+    elapsed = time.perf_counter() - start
+    assert output["step"] == nodes
+    return elapsed / (repeats * nodes)
+
+
+def bench_validation(width, steps):
+    schema = make_schema(width)
+    state = schema(**make_input(width)).__dict__
+    validator = ChangedKeysValidator(schema)
+
+    start = time.perf_counter()
+    for i in range(steps):
+        schema(**{**state, "step": i})
+    full = (time.perf_counter() - start) / steps
+
+    start = time.perf_counter()
+    for i in range(steps):
+        validator.validate({"step": i}, state)
+    changed = (time.perf_counter() - start) / steps
+
+    # 잘못된 값은 똑같이 ValidationError 로 막는다.
+    try:
+        validator.validate({"step": -1}, state)
+        raise AssertionError("invalid update passed")
+    except ValueError:
+        pass
+    return full, changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="changed-keys-only pydantic state validation benchmark")
+    parser.add_argument("--widths", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--nodes", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    print("validation of a one-key update")
+    for width in args.widths:
+        full, changed = bench_validation(width, 200)
+        print(f"  {width:>5} fields   full model {full * 1e6:9.1f} us   changed keys {changed * 1e6:7.1f} us")
+
+    print(f"graph, {args.nodes} nodes, one key updated per node")
+    for width in args.widths:
+        schema = make_schema(width)
+        full = run(schema, width, args.nodes, args.repeats, validated=False)
+        changed = run(schema, width, args.nodes, args.repeats, validated=True)
+        print(f"  {width:>5} fields   StateGraph(model) {full * 1e6:9.1f} us/step   TypedDict + validator.node {changed * 1e6:9.1f} us/step")
+
+
+main()
@@ -0,0 +1,105 @@
+# PooledSqliteSaver (checkpoint 마다 전체 channel 값 저장) vs DeltaSqliteSaver (delta + 내용 hash blob) 비교
+# 한 thread 에서 대화를 길게 이어갈 때 db 크기, 턴당 쓰는 byte, 턴 / get_state 시간을 본다. (LLM 호출 없음)
+#
+# 사용 예시
+#   python delta_sqlite_bench.py
+#   python delta_sqlite_bench.py --turns 500 --snapshot-every 50
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import MessagesState, StateGraph, START, END
+
+# part2 의 delta_sqlite_saver / wal_sqlite_saver 를 import 하기 위한 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "part2"))
+from delta_sqlite_saver import DeltaSqliteSaver
+from wal_sqlite_saver import PooledSqliteSaver
+
+
+def chatbot(state: MessagesState):
+    return {"messages": [AIMessage(content="The 49ers won five Super Bowls. " * 10)]}
+
+
+builder = StateGraph(MessagesState)
+builder.add_node("chatbot", chatbot)
+builder.add_edge(START, "chatbot")
+builder.add_edge("chatbot", END)
+
+
+def stored_bytes(path, tables):
+    # 테이블에 저장된 값의 byte 합 (페이지 여유 공간 / index 제외)
+    conn = sqlite3.connect(path)
+    total = 0
+    for table, columns in tables.items():
+        total += conn.execute(f"SELECT COALESCE(SUM({' + '.join(f'LENGTH({c})' for c in columns)}), 0) FROM {table}").fetchone()[0]
+    conn.close()
+    return total
+
+
+def file_size(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    return os.path.getsize(path)
+
+
+def run(label, factory, path, tables, turns):
+    saver = factory(path)
+    graph = builder.compile(checkpointer=saver)
+    config = {"configurable": {"thread_id": "bench"}}
+    start = time.perf_counter()
+    for turn in range(turns):
+        graph.invoke({"messages": [HumanMessage(content=f"tell me about the 49ers, question {turn}")]}, config)
+    per_turn = (time.perf_counter() - start) / turns
+
+    start = time.perf_counter()
+    for _ in range(10):
+        state = graph.get_state(config)
+    get_state = (time.perf_counter() - start) / 10
+    stats = saver.stats()
+    saver.close()
+
+    # 프로세스를 새로 띄운 것처럼 캐시가 빈 saver 로 한 번 읽기 (delta 는 snapshot 부터 다시 복원)
+    saver = factory(path)
+    start = time.perf_counter()
+    cold = builder.compile(checkpointer=saver).get_state(config)
+    cold_get_state = time.perf_counter() - start
+    saver.close()
+    assert [m.content for m in cold.values["messages"]] == [m.content for m in state.values["messages"]]
+
+    written = stored_bytes(path, tables)
+    print(
+        f"{label:<18} {per_turn * 1e3:7.2f} ms/turn   get_state {get_state * 1e3:6.2f} ms (cold {cold_get_state * 1e3:6.2f} ms)   "
+        f"db {file_size(path) / 1024:9.1f} KiB   {written / turns / 1024:8.1f} KiB stored/turn"
+    )
+    print("  ", stats)
+    return [m.content for m in state.values["messages"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="delta-encoded checkpoint storage benchmark")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--snapshot-every", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"== 1 thread x {args.turns} turns ({args.turns * 2} messages) ==")
+        path = os.path.join(tmp, "pooled.db")
+        full = run(
+            "PooledSqliteSaver", PooledSqliteSaver, path,
+            {"checkpoints": ["checkpoint", "metadata"]}, args.turns,
+        )
+
+        path = os.path.join(tmp, "delta.db")
+        delta = run(
+            "DeltaSqliteSaver", lambda p: DeltaSqliteSaver(p, snapshot_every=args.snapshot_every), path,
+            {"delta_checkpoints": ["checkpoint", "channels", "metadata"], "blobs": ["value"]}, args.turns,
+        )
+        assert full == delta
+
+
+main()
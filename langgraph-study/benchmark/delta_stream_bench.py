@@ -0,0 +1,84 @@
+# stream_mode="values" vs stream_deltas 비교 : history 길이별로 step 하나를 client 로 보낼 때의 크기 / 직렬화 CPU
+# 노드 --steps 개가 차례로 메시지 하나씩 append 하고 dummy_data 를 바꾸는 그래프 (part4/example4 의 State 와 같은 모양, LLM 호출 없음)
+# 첫 출력 (입력 state 전체) 은 두 방식 모두 전체를 보내므로 빼고, 그 뒤 step 들의 평균을 본다.
+# client 쪽 StateRebuilder 로 다시 만든 state 가 stream_mode="values" 와 같은지도 확인한다.
+#
+# 사용 예시
+#   python delta_stream_bench.py
+#   python delta_stream_bench.py --history 100 1000 10000 --steps 20
+import argparse
+import os
+import sys
+import time
+
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import START, END, StateGraph
+from langgraph.graph.message import add_messages
+from typing import Annotated
+from typing_extensions import TypedDict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import StateRebuilder, stream_deltas
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+    dummy_data: Annotated[str, "dummy"]
+
+
+def build_graph(steps):
+    builder = StateGraph(State)
+    previous = START
+    for i in range(steps):
+
+        def node(state: State, i=i):
+            return {"messages": [AIMessage(content=f"step {i} answer about the news", id=f"a{i}")], "dummy_data": f"[node_{i}] 호출"}
+
+        builder.add_node(f"node_{i}", node)
+        builder.add_edge(previous, f"node_{i}")
+        previous = f"node_{i}"
+    builder.add_edge(previous, END)
+    return builder.compile()
+
+
+def history(n):
+    return [
+        (HumanMessage if i % 2 == 0 else AIMessage)(content=f"earlier message {i} about 미국 대선 news " * 3, id=f"m{i}")
+        for i in range(n)
+    ]
+
+
+def measure(chunks):
+    # 첫 출력은 빼고 step 마다 직렬화한 크기 / CPU
+    sizes = []
+    start = time.process_time()
+    for chunk in chunks[1:]:
+        sizes.append(len(dumps(chunk)))
+    cpu = time.process_time() - start
+    return sum(sizes) / len(sizes), cpu / len(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="deltas stream benchmark")
+    parser.add_argument("--history", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+    graph = build_graph(args.steps)
+
+    print(f"== {args.steps} steps, each appends one message ==")
+    for n in args.history:
+        inputs = {"messages": history(n), "dummy_data": "테스트 문자열"}
+        values = list(graph.stream(inputs, stream_mode="values"))
+        deltas = list(stream_deltas(graph, inputs))
+
+        rebuilder = StateRebuilder()
+        for expected, delta in zip(values, deltas):
+            assert rebuilder.apply(delta) == expected
+
+        for label, chunks in (("values", values), ("deltas", deltas)):
+            size, cpu = measure(chunks)
+            print(f"  history {n:6d}   {label:<7} {size / 1024:9.1f} KiB/step   serialize {cpu * 1e3:8.3f} ms/step")
+
+
+main()
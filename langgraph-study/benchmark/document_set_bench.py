@@ -0,0 +1,73 @@
+# 검색 결과 batch 를 계속 누적할 때 중복 제거 리듀서 비교
+#   - set      : tips/custum_reducer.py 의 list(set(left + right)) (str 만 가능, 순서 유지 X)
+#   - rebuild  : 순서를 유지하도록 업데이트마다 전체를 다시 dedup 하는 방식 (Document 가능)
+#   - indexed  : merge_unique_documents (새 batch 만 확인)
+#
+# 사용 예시
+#   python document_set_bench.py
+#   python document_set_bench.py --batches 2000 --batch-size 10
+import argparse
+import os
+import random
+import sys
+import time
+
+from langchain_core.documents import Document
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.document_set import document_key, merge_unique_documents
+
+
+def reduce_with_set(left, right):
+    return list(set((left or []) + (right or [])))
+
+
+def reduce_with_rebuild(left, right):
+    merged = {}
+    for item in (left or []) + (right or []):
+        merged.setdefault(document_key(item), item)
+    return list(merged.values())
+
+
+def make_batches(batches, batch_size, as_documents):
+    random.seed(0)
+    pool = batches * batch_size // 2  # 대략 절반 정도가 중복
+    result = []
+    for _ in range(batches):
+        ids = [random.randrange(pool) for _ in range(batch_size)]
+        if as_documents:
+            result.append([Document(page_content=f"chunk {i}", metadata={"source": f"doc{i % 50}.pdf"}) for i in ids])
+        else:
+            result.append([f"doc{i}.pdf" for i in ids])
+    return result
+
+
+def run(reducer, batches):
+    value = None
+    start = time.perf_counter()
+    for batch in batches:
+        value = reducer(value, batch)
+    return time.perf_counter() - start, len(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ordered dedup reducer benchmark")
+    parser.add_argument("--batches", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=10)
+    args = parser.parse_args()
+
+    strings = make_batches(args.batches, args.batch_size, as_documents=False)
+    documents = make_batches(args.batches, args.batch_size, as_documents=True)
+
+    print(f"{args.batches} batches x {args.batch_size} strings")
+    for name, reducer in (("set", reduce_with_set), ("rebuild", reduce_with_rebuild), ("indexed", merge_unique_documents)):
+        elapsed, size = run(reducer, strings)
+        print(f"  {name:<8} {elapsed * 1e3:9.1f} ms   {size} unique")
+
+    print(f"{args.batches} batches x {args.batch_size} Documents")
+    for name, reducer in (("rebuild", reduce_with_rebuild), ("indexed", merge_unique_documents)):
+        elapsed, size = run(reducer, documents)
+        print(f"  {name:<8} {elapsed * 1e3:9.1f} ms   {size} unique")
+
+
+main()
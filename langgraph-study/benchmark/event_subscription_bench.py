@@ -0,0 +1,128 @@
+# astream_events(version="v2") + 사용자 코드 필터 vs include_* 필터 vs subscribe_events (callback 단계 필터) 비교
+# part3/1 처럼 "conversation" 노드의 chat model token 만 필요할 때, 생성된 token 하나당 event loop CPU 시간을 본다.
+# 그래프에는 token 을 내는 모델 노드 외에 구독하지 않는 prompt / parser / 모델 노드가 같이 돈다. (LLM 호출 없음)
+#
+# 사용 예시
+#   python event_subscription_bench.py
+#   python event_subscription_bench.py --tokens 2000 --noise 0 --runs 20
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from langgraph.graph import START, END, MessagesState, StateGraph
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.event_subscription import subscribe_events
+
+WANTED = ["on_chat_model_start", "on_chat_model_stream", "on_chat_model_end"]
+
+
+class AsyncFakeChatModel(GenericFakeChatModel):
+    # GenericFakeChatModel 의 async stream 은 chunk 마다 thread pool 을 거치기 때문에 (sync _stream 위임)
+    # 이벤트 처리 비용이 묻히지 않도록 event loop 에서 바로 chunk 를 낸다.
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for token in next(self.messages).content.split(" "):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token + " "))
+            if run_manager:
+                await run_manager.on_llm_new_token(token + " ", chunk=chunk)
+            yield chunk
+
+
+def build_graph(tokens, noise):
+    answer = " ".join(f"tok{i}" for i in range(tokens))
+
+    # 노드를 async 로 두어 모델 / callback 이 전부 event loop 에서 돌게 한다. (sync 노드는 thread pool 에서 돈다)
+    async def conversation(state: MessagesState):
+        model = AsyncFakeChatModel(messages=iter([AIMessage(content=answer)]))
+        return {"messages": [await model.ainvoke(state["messages"])]}
+
+    # 구독하지 않는 노드 : prompt -> 모델 -> parser chain (token 도 낸다)
+    async def classify(state: MessagesState):
+        model = AsyncFakeChatModel(messages=iter([AIMessage(content=" ".join(["label"] * noise))]))
+        chain = ChatPromptTemplate.from_messages([("human", "classify: {text}")]) | model | StrOutputParser()
+        await chain.ainvoke({"text": state["messages"][-1].content})
+        return {}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("conversation", conversation)
+    builder.add_node("classify", classify)
+    builder.add_edge(START, "conversation")
+    builder.add_edge(START, "classify")
+    builder.add_edge("conversation", END)
+    builder.add_edge("classify", END)
+    return builder.compile()
+
+
+async def user_side(graph, inputs):
+    # part3/1 기존 방식 : 모든 이벤트를 받은 뒤 사용자 코드에서 거르기
+    async for event in graph.astream_events(inputs, version="v2"):
+        if event["metadata"].get("langgraph_node") == "conversation" and event["event"] in WANTED:
+            yield event
+
+
+async def include_filters(graph, inputs):
+    # astream_events 의 include_* : 이벤트를 만든 뒤 queue 에 넣기 전에 거른다. (node 조건은 지원하지 않음)
+    async for event in graph.astream_events(inputs, version="v2", include_types=["chat_model"]):
+        if event["metadata"].get("langgraph_node") == "conversation":
+            yield event
+
+
+async def subscribed(graph, inputs):
+    async for event in subscribe_events(graph, inputs, nodes=["conversation"], events=WANTED):
+        yield event
+
+
+async def measure(stream, graph, runs):
+    inputs = {"messages": [HumanMessage(content="Tell me about the 49ers NFL team")]}
+    tokens = []
+    start = time.process_time()
+    for _ in range(runs):
+        tokens = []
+        async for event in stream(graph, inputs):
+            if event["event"] == "on_chat_model_stream":
+                tokens.append(event["data"]["chunk"].content)
+    return time.process_time() - start, tokens
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="event subscription pushdown benchmark")
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--noise", type=int, default=1000, help="구독하지 않는 노드가 내는 token 수")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    graph = build_graph(args.tokens, args.noise)
+    # 첫 실행의 import / warmup 비용 제외
+    for stream in (user_side, include_filters, subscribed):
+        await measure(stream, graph, 1)
+
+    variants = (
+        ("astream_events + user filter", user_side),
+        ("astream_events include_types", include_filters),
+        ("subscribe_events", subscribed),
+    )
+    # 변형을 번갈아 여러 번 돌리고 가장 작은 값을 쓴다. (GC / 실행 순서에 따른 흔들림 줄이기)
+    best = {}
+    expected = None
+    for _ in range(args.rounds):
+        for label, stream in variants:
+            cpu, tokens = await measure(stream, graph, args.runs)
+            if expected is None:
+                expected = tokens
+            assert tokens == expected, label
+            best[label] = min(best.get(label, cpu), cpu)
+
+    print(f"== {args.runs} runs x {len(expected)} tokens (+ {args.noise} unsubscribed tokens), best of {args.rounds} ==")
+    for label, _ in variants:
+        cpu = best[label]
+        print(f"{label:<30} {cpu / (args.runs * len(expected)) * 1e6:8.1f} us CPU/token   total {cpu:6.2f} s")
+
+asyncio.run(main())
@@ -0,0 +1,210 @@
+# 스터디용 작은 그래프들로 LangGraph 실행 경로 자체의 오버헤드를 측정하는 벤치마크
+#
+# 대상 그래프 (노드가 거의 일을 하지 않아서 프레임워크 오버헤드만 남는다)
+#   - state    : part0/state.py            노드 1개
+#   - simple   : part1/1.simple.py         조건부 엣지
+#   - reducer  : part2/2.base_reducer.py   fan-out + append_log 리듀서 (common.chunked_log)
+#   - command  : update/command.py         Command(goto=...)
+#
+# 실행 방식: invoke / stream(각 stream_mode) / batch / ainvoke, 각각 checkpointer 유무
+# 측정값  : run 당 지연(mean / p50 / p99), superstep 당 지연, run 당 메모리 할당 peak, 처리량
+#
+# 사용 예시
+#   python graph_runtime_bench.py                          # 전체 실행 (조합마다 500 run)
+#   python graph_runtime_bench.py -n 5000 --json after.json # 비교용으로 길게
+#   python graph_runtime_bench.py -n 100 --graphs reducer  # 일부만 빠르게
+#   python graph_runtime_bench.py --json after.json --baseline before.json
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import runpy
+import statistics
+import sys
+import time
+import tracemalloc
+
+from langgraph.checkpoint.memory import MemorySaver
+
+STUDY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 이름 -> (스크립트 경로, builder 변수 이름, 입력)
+GRAPHS = {
+    "state": ("part0/state.py", "graph", {"counter": 0}),
+    "simple": ("part1/1.simple.py", "builder", {"graph_state": "Hi~~ "}),
+    "reducer": ("part2/2.base_reducer.py", "builder", {"foo": [1]}),
+    "command": ("update/command.py", "graph_builder", {"num_list": [1, 2, 3, 4, 5]}),
+}
+
+STREAM_MODES = ["values", "updates", "debug", "messages", "custom"]
+MODES = ["invoke"] + [f"stream:{m}" for m in STREAM_MODES] + ["batch", "ainvoke"]
+
+BATCH_SIZE = 16
+# 이 비율 이상 느려지면 회귀로 표시
+REGRESSION_THRESHOLD = 0.10
+
+
+@contextlib.contextmanager
+def quiet():
+    # 스터디 그래프의 노드들이 print 를 하기 때문에 측정 중에는 출력을 버린다.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def load_builder(name):
+    path, var, _ = GRAPHS[name]
+    with quiet():
+        namespace = runpy.run_path(os.path.join(STUDY_DIR, path))
+    return namespace[var]
+
+
+def count_supersteps(graph, graph_input, config):
+    steps = {
+        event["step"]
+        for event in graph.stream(graph_input, config, stream_mode="debug")
+        if event["type"] == "task"
+    }
+    return max(len(steps), 1)
+
+
+def make_runner(graph, mode, graph_input, stack):
+    """(config 목록을 받아 한 번 실행하는 함수, 한 번 실행에 처리되는 run 수) 를 반환한다. (정리할 자원은 stack 에 등록)"""
+    if mode == "invoke":
+        return (lambda configs: graph.invoke(graph_input, configs[0])), 1
+    if mode.startswith("stream:"):
+        stream_mode = mode.split(":", 1)[1]
+
+        def run(configs):
+            for _ in graph.stream(graph_input, configs[0], stream_mode=stream_mode):
+                pass
+
+        return run, 1
+    if mode == "batch":
+        return (lambda configs: graph.batch([graph_input] * len(configs), configs)), BATCH_SIZE
+    if mode == "ainvoke":
+        loop = asyncio.new_event_loop()
+        stack.callback(loop.close)
+        return (lambda configs: loop.run_until_complete(graph.ainvoke(graph_input, configs[0]))), 1
+    raise ValueError(f"unknown mode: {mode}")
+
+
+def bench(name, mode, checkpointer, iterations):
+    builder = load_builder(name)
+    graph_input = GRAPHS[name][2]
+    graph = builder.compile(checkpointer=MemorySaver() if checkpointer else None)
+    with contextlib.ExitStack() as stack:
+        runner, runs_per_call = make_runner(graph, mode, graph_input, stack)
+        return measure(name, mode, checkpointer, iterations, graph, graph_input, runner, runs_per_call)
+
+
+def measure(name, mode, checkpointer, iterations, graph, graph_input, runner, runs_per_call):
+    calls = max(iterations // runs_per_call, 1)
+
+    counter = iter(range(10**9))
+
+    def next_configs():
+        # checkpointer 를 쓸 때는 run 마다 새 thread_id 를 써서 상태가 누적되지 않게 한다.
+        return [{"configurable": {"thread_id": str(next(counter))}} for _ in range(runs_per_call)]
+
+    with quiet():
+        supersteps = count_supersteps(graph, graph_input, next_configs()[0])
+        for _ in range(min(50, calls)):  # warm-up
+            runner(next_configs())
+
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(calls):
+            configs = next_configs()
+            t0 = time.perf_counter()
+            runner(configs)
+            latencies.append((time.perf_counter() - t0) / runs_per_call)
+        elapsed = time.perf_counter() - start
+
+        # 할당량은 tracemalloc 이 느리기 때문에 일부 run 으로만 측정
+        tracemalloc.start()
+        peaks = []
+        for _ in range(min(100, calls)):
+            configs = next_configs()
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            runner(configs)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append((peak - base) / runs_per_call)
+        tracemalloc.stop()
+
+    latencies.sort()
+    mean = statistics.fmean(latencies)
+    return {
+        "graph": name,
+        "mode": mode,
+        "checkpointer": checkpointer,
+        "runs": calls * runs_per_call,
+        "supersteps": supersteps,
+        "mean_us": mean * 1e6,
+        "p50_us": latencies[len(latencies) // 2] * 1e6,
+        "p99_us": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1e6,
+        "per_superstep_us": mean / supersteps * 1e6,
+        "alloc_peak_kib": statistics.fmean(peaks) / 1024,
+        "throughput": calls * runs_per_call / elapsed,
+    }
+
+
+def key_of(result):
+    return f"{result['graph']}|{result['mode']}|{'ckpt' if result['checkpointer'] else 'none'}"
+
+
+def print_result(result, baseline):
+    line = (
+        f"{result['graph']:<8} {result['mode']:<16} {'ckpt' if result['checkpointer'] else '-':<5}"
+        f"{result['mean_us']:10.1f}{result['p50_us']:10.1f}{result['p99_us']:10.1f}"
+        f"{result['per_superstep_us']:10.1f}{result['alloc_peak_kib']:10.1f}{result['throughput']:10.0f}"
+    )
+    previous = baseline.get(key_of(result))
+    if previous:
+        change = result["mean_us"] / previous["mean_us"] - 1
+        line += f"  {change:+.1%}"
+        if change > REGRESSION_THRESHOLD:
+            line += "  << REGRESSION"
+    print(line, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LangGraph runtime micro-benchmark")
+    parser.add_argument("-n", "--iterations", type=int, default=500, help="조합마다 실행할 run 수")
+    parser.add_argument("--graphs", nargs="*", default=list(GRAPHS), choices=list(GRAPHS))
+    parser.add_argument("--modes", nargs="*", default=MODES, choices=MODES)
+    parser.add_argument("--json", help="결과를 저장할 json 파일")
+    parser.add_argument("--baseline", help="비교할 이전 결과 json 파일")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {key_of(r): r for r in json.load(f)}
+
+    print(
+        f"{'graph':<8} {'mode':<16} {'saver':<5}{'mean_us':>10}{'p50_us':>10}{'p99_us':>10}"
+        f"{'step_us':>10}{'alloc_KiB':>10}{'runs/s':>10}"
+    )
+    results = []
+    for name in args.graphs:
+        for mode in args.modes:
+            for checkpointer in (False, True):
+                result = bench(name, mode, checkpointer, args.iterations)
+                results.append(result)
+                print_result(result, baseline)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    regressions = [
+        r for r in results
+        if key_of(r) in baseline and r["mean_us"] / baseline[key_of(r)]["mean_us"] - 1 > REGRESSION_THRESHOLD
+    ]
+    if regressions:
+        sys.exit(1)
+
+
+main()
@@ -0,0 +1,106 @@
+# breakpoint (interrupt_before) 에서 멈춘 thread 가 많을 때 MemorySaver vs BoundedMemorySaver.park_on_interrupt 비교
+#   - 멈춘 thread N 개를 들고 있는 동안의 메모리 (tracemalloc) / spill 파일 크기
+#   - 대기 중인 interrupt 목록 조회 시간
+#   - thread 하나를 재개할 때 걸리는 시간 (다른 thread 는 올리지 않는다)
+# part3/2 와 같은 assistant -> tools 그래프, LLM 호출 없음
+#
+# 사용 예시
+#   python interrupt_parking_bench.py
+#   python interrupt_parking_bench.py --threads 5000 --history 40
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import START, END, MessagesState, StateGraph
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import BoundedMemorySaver
+
+
+def assistant(state: MessagesState):
+    if isinstance(state["messages"][-1], ToolMessage):
+        return {"messages": [AIMessage(content="The answer is 6.")]}
+    return {"messages": [AIMessage(content="", tool_calls=[{"name": "multiply", "args": {"a": 2, "b": 3}, "id": "call"}])]}
+
+
+def tools(state: MessagesState):
+    return {"messages": [ToolMessage(content="6", tool_call_id="call")]}
+
+
+def route(state: MessagesState):
+    return "tools" if state["messages"][-1].tool_calls else END
+
+
+builder = StateGraph(MessagesState)
+builder.add_node("assistant", assistant)
+builder.add_node("tools", tools)
+builder.add_edge(START, "assistant")
+builder.add_conditional_edges("assistant", route, ["tools", END])
+builder.add_edge("tools", "assistant")
+
+
+def history(n):
+    return [
+        (HumanMessage if i % 2 == 0 else AIMessage)(content=f"earlier message {i} about multiplying numbers " * 4)
+        for i in range(n)
+    ]
+
+
+def run(label, memory, threads, length, park):
+    graph = builder.compile(checkpointer=memory, interrupt_before=["tools"])
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(threads):
+        config = {"configurable": {"thread_id": f"user-{i}"}}
+        inputs = {"messages": history(length) + [HumanMessage(content="Multiply 2 and 3")]}
+        if park:
+            with memory.park_on_interrupt(graph, config):
+                graph.invoke(inputs, config)
+        else:
+            graph.invoke(inputs, config)
+    pause = (time.perf_counter() - start) / threads
+    resident = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    pending = memory.pending_interrupts() if park else [
+        t for t in (f"user-{i}" for i in range(threads))
+        if graph.get_state({"configurable": {"thread_id": t}}).next
+    ]
+    listing = time.perf_counter() - start
+    assert len(pending) == threads
+
+    config = {"configurable": {"thread_id": f"user-{threads // 2}"}}
+    start = time.perf_counter()
+    output = graph.invoke(None, config)
+    resume = time.perf_counter() - start
+    assert output["messages"][-1].content == "The answer is 6."
+
+    print(
+        f"{label:<28} pause {pause * 1e3:6.2f} ms/thread   resident {resident / 1024 / 1024:8.1f} MiB   "
+        f"list pending {listing * 1e3:8.1f} ms   resume one {resume * 1e3:6.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="park-and-evict benchmark for interrupted threads")
+    parser.add_argument("--threads", type=int, default=2000)
+    parser.add_argument("--history", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"== {args.threads} threads paused at interrupt_before=['tools'], {args.history} messages each ==")
+    run("MemorySaver", MemorySaver(), args.threads, args.history, park=False)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "parked.db")
+        memory = BoundedMemorySaver(max_bytes=None, max_checkpoints=10, spill_path=path)
+        run("BoundedMemorySaver + park", memory, args.threads, args.history, park=True)
+        print(f"  spill file {os.path.getsize(path) / 1024 / 1024:.1f} MiB", memory.stats())
+        memory.close()
+
+
+main()
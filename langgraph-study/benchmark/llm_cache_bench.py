@@ -0,0 +1,100 @@
+# 캐시 없음 vs TieredLLMCache (메모리 hit / SQLite hit) 비교
+#   - 같은 질문을 다른 thread 에서 다시 물을 때 노드 하나의 지연 (모델 호출은 --latency-ms 로 흉내)
+#   - thread 마다 메시지 id 가 달라도 같은 대화면 hit 인지 (정규화 확인)
+#   - metadata={"llm_cache": False} 노드는 매번 모델을 부르는지, 노드별 hit / miss 수
+# part4/example1 처럼 chatbot 노드가 질문에 답하고, grade 노드는 캐시를 쓰지 않는다. (LLM 호출 없음)
+#
+# 사용 예시
+#   python llm_cache_bench.py
+#   python llm_cache_bench.py --questions 200 --latency-ms 50
+import argparse
+import os
+import sys
+import tempfile
+import time
+from itertools import cycle
+
+from langchain_core.globals import set_llm_cache
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import START, END, MessagesState, StateGraph
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import TieredLLMCache
+
+
+class SlowFakeChatModel(GenericFakeChatModel):
+    # 실제 API 호출 대신 latency 만큼 기다린다.
+    latency: float = 0.0
+    calls: int = 0
+
+    def _generate(self, *args, **kwargs):
+        SlowFakeChatModel.calls += 1
+        time.sleep(self.latency)
+        return super()._generate(*args, **kwargs)
+
+
+def build_graph(latency):
+    model = SlowFakeChatModel(messages=cycle([AIMessage(content="The 49ers are a football team in San Francisco.")]), latency=latency)
+
+    def chatbot(state: MessagesState):
+        return {"messages": [model.invoke(state["messages"])]}
+
+    def grade(state: MessagesState):
+        model.invoke([HumanMessage(content="grade: " + state["messages"][-1].content)])
+        return {}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("chatbot", chatbot)
+    builder.add_node("grade", grade, metadata={"llm_cache": False})
+    builder.add_edge(START, "chatbot")
+    builder.add_edge("chatbot", "grade")
+    builder.add_edge("grade", END)
+    return builder.compile(checkpointer=MemorySaver())
+
+
+def run(label, graph, questions, offset):
+    SlowFakeChatModel.calls = 0
+    start = time.perf_counter()
+    for i in range(questions):
+        # 새 thread 라서 HumanMessage 에 매번 새 id 가 붙는다.
+        config = {"configurable": {"thread_id": f"{label}-{offset}-{i}"}}
+        output = graph.invoke({"messages": [HumanMessage(content=f"Tell me about team {i}")]}, config)
+        assert output["messages"][-1].content.startswith("The 49ers")
+        assert output["messages"][-1].id is not None
+    elapsed = (time.perf_counter() - start) / questions
+    print(f"{label:<26} {elapsed * 1e3:7.2f} ms/question   model calls {SlowFakeChatModel.calls:5d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tiered LLM response cache benchmark")
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+    graph = build_graph(args.latency_ms / 1e3)
+
+    print(f"== {args.questions} questions, model latency {args.latency_ms} ms (chatbot cached, grade bypassed) ==")
+    set_llm_cache(None)
+    run("no cache", graph, args.questions, 0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "llm_cache.db")
+        cache = TieredLLMCache(path)
+        set_llm_cache(cache)
+        run("cold (miss)", graph, args.questions, 1)
+        run("memory hit", graph, args.questions, 2)
+        cache.close()
+
+        # 프로세스를 다시 띄운 것처럼 새 cache 객체 (메모리 tier 비어 있음)
+        cache = TieredLLMCache(path)
+        set_llm_cache(cache)
+        run("disk hit (new process)", graph, args.questions, 3)
+        stats = cache.stats()
+        print(f"  disk {stats['disk_entries']} entries / {stats['disk_bytes'] / 1024:.1f} KiB")
+        for node, counters in stats["nodes"].items():
+            print(f"  {node:<10} {counters}")
+        cache.close()
+    set_llm_cache(None)
+
+
+main()
@@ -0,0 +1,138 @@
+# stream_mode="messages" (chunk 마다 write) vs stream_coalesced (노드별로 묶어서 write) 비교
+#   1) 빠른 소비자 : token chunk 를 socket 으로 내보낼 때 send 횟수 / CPU 시간
+#   2) 느린 소비자 : write 마다 지연이 있을 때 아직 내보내지 못한 token 이 얼마나 쌓이는지 (backpressure)
+#
+# 사용 예시
+#   python message_coalescer_bench.py
+#   python message_coalescer_bench.py --tokens 20000 --slow-ms 1
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import START, END, MessagesState, StateGraph
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.message_coalescer import astream_coalesced, stream_coalesced
+
+
+class CountingFakeChatModel(GenericFakeChatModel):
+    # 모델이 만든 token 수 (소비자가 받은 token 수와의 차이 = 쌓여 있는 token)
+    produced: int = 0
+
+    def _stream(self, *args, **kwargs):
+        for chunk in super()._stream(*args, **kwargs):
+            CountingFakeChatModel.produced += chunk.message.content.count("tok")
+            yield chunk
+
+
+def build_graph(tokens):
+    answer = " ".join(f"tok{i}" for i in range(tokens))
+
+    def conversation(state: MessagesState):
+        model = CountingFakeChatModel(messages=iter([AIMessage(content=answer)]))
+        return {"messages": [model.invoke(state["messages"])]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("conversation", conversation)
+    builder.add_edge(START, "conversation")
+    builder.add_edge("conversation", END)
+    return builder.compile()
+
+
+class Transport:
+    """socketpair 한쪽으로 보내고 다른 thread 가 읽어서 버리는 네트워크 흉내"""
+
+    def __init__(self, delay=0.0):
+        self.writer, self.reader = socket.socketpair()
+        self.delay = delay
+        self.sends = 0
+        self.thread = threading.Thread(target=self._drain, daemon=True)
+        self.thread.start()
+
+    def _drain(self):
+        while self.reader.recv(65536):
+            pass
+
+    def send(self, text):
+        self.writer.sendall(text.encode())
+        self.sends += 1
+        if self.delay:
+            time.sleep(self.delay)
+
+    def close(self):
+        self.writer.close()
+        self.thread.join()
+        self.reader.close()
+
+
+def raw_stream(graph, inputs):
+    return graph.stream(inputs, stream_mode="messages")
+
+
+def coalesced_stream(graph, inputs):
+    return stream_coalesced(graph, inputs, max_delay=0.02, max_bytes=1024, max_pending=256)
+
+
+def run(stream, graph, inputs, delay=0.0):
+    transport = Transport(delay)
+    CountingFakeChatModel.produced = 0
+    received = []
+    delivered = peak = 0
+    start_cpu, start = time.process_time(), time.perf_counter()
+    for message, metadata in stream(graph, inputs):
+        if metadata["langgraph_node"] == "conversation" and message.content and message.id.startswith("run-"):
+            received.append(message.content)
+            transport.send(message.content)
+            if delay:
+                delivered += message.content.count("tok")
+                peak = max(peak, CountingFakeChatModel.produced - delivered)
+    cpu, wall = time.process_time() - start_cpu, time.perf_counter() - start
+    transport.close()
+    return "".join(received), transport.sends, cpu, wall, peak
+
+
+async def arun(graph, inputs):
+    transport = Transport()
+    received = []
+    async for message, metadata in astream_coalesced(graph, inputs, max_delay=0.02, max_bytes=1024):
+        if message.content and message.id.startswith("run-"):
+            received.append(message.content)
+            transport.send(message.content)
+    transport.close()
+    return "".join(received), transport.sends
+
+
+def main():
+    parser = argparse.ArgumentParser(description="messages stream coalescing benchmark")
+    parser.add_argument("--tokens", type=int, default=10000)
+    parser.add_argument("--slow-tokens", type=int, default=2000)
+    parser.add_argument("--slow-ms", type=float, default=0.5)
+    args = parser.parse_args()
+    inputs = {"messages": [HumanMessage(content="Tell me about the 49ers NFL team")]}
+
+    graph = build_graph(args.tokens)
+    print(f"== fast consumer, {args.tokens} tokens ==")
+    expected = None
+    for label, stream in (("stream_mode=messages", raw_stream), ("stream_coalesced", coalesced_stream)):
+        text, sends, cpu, wall, _ = run(stream, graph, inputs)
+        expected = expected or text
+        assert text == expected, label
+        print(f"{label:<22} {sends:7d} sends   CPU {cpu * 1e3:7.1f} ms   wall {wall * 1e3:7.1f} ms")
+    text, sends = asyncio.run(arun(graph, inputs))
+    assert text == expected
+    print(f"{'astream_coalesced':<22} {sends:7d} sends")
+
+    graph = build_graph(args.slow_tokens)
+    print(f"== slow consumer ({args.slow_ms} ms / send), {args.slow_tokens} tokens ==")
+    for label, stream in (("stream_mode=messages", raw_stream), ("stream_coalesced", coalesced_stream)):
+        text, sends, cpu, wall, peak = run(stream, graph, inputs, delay=args.slow_ms / 1e3)
+        print(f"{label:<22} {sends:7d} sends   wall {wall * 1e3:7.1f} ms   peak backlog {peak:6d} tokens")
+
+
+main()
@@ -0,0 +1,96 @@
+# add_messages 와 add_messages_indexed (MessageLog) 비교
+#   1) 10k 개 메시지를 한 번에 지우기 : filter_messages / summarize_conversation 처럼 최근 2개만 남기고 RemoveMessage
+#   2) 긴 history 에 한 턴씩 append : 업데이트 한 번의 비용이 history 길이에 비례하는지
+#   3) 그래프 : part2/4 의 filter 노드와 같은 그래프에서 10k 메시지 입력 -> 최근 2개만 남기기
+#
+# 사용 예시
+#   python message_log_bench.py
+#   python message_log_bench.py --messages 50000
+import argparse
+import os
+import sys
+import time
+from typing import Annotated
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, RemoveMessage
+from langgraph.graph import START, END, MessagesState, StateGraph
+from langgraph.graph.message import add_messages
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.message_log import add_messages_indexed
+
+
+def make_history(n):
+    return [
+        (HumanMessage if i % 2 == 0 else AIMessage)(content=f"message {i}", id=f"m{i}")
+        for i in range(n)
+    ]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def bench_delete(reducer, n):
+    history = reducer([], make_history(n))
+    deletes = [RemoveMessage(id=m.id) for m in history[:-2]]
+    elapsed, result = timed(reducer, history, deletes)
+    assert len(result) == 2
+    return elapsed
+
+
+def bench_append(reducer, n, turns):
+    history = reducer([], make_history(n))
+    start = time.perf_counter()
+    for i in range(turns):
+        history = reducer(history, [HumanMessage(content=f"turn {i}", id=f"t{i}")])
+        _ = history[-1]
+    return (time.perf_counter() - start) / turns
+
+
+def bench_graph(reducer, n):
+    class State(MessagesState):
+        messages: Annotated[list[AnyMessage], reducer]
+
+    def filter_messages(state):
+        return {"messages": [RemoveMessage(id=m.id) for m in state["messages"][:-2]]}
+
+    def chat_model_node(state):
+        return {"messages": [AIMessage(content=f"{len(state['messages'])} messages left")]}
+
+    builder = StateGraph(State)
+    builder.add_node("filter", filter_messages)
+    builder.add_node("chat_model", chat_model_node)
+    builder.add_edge(START, "filter")
+    builder.add_edge("filter", "chat_model")
+    builder.add_edge("chat_model", END)
+    graph = builder.compile()
+
+    elapsed, output = timed(graph.invoke, {"messages": make_history(n)})
+    assert len(output["messages"]) == 3
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="id-indexed message log benchmark")
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+    reducers = (("add_messages", add_messages), ("indexed", add_messages_indexed))
+
+    print(f"delete {args.messages - 2} of {args.messages} messages in one update")
+    for name, reducer in reducers:
+        print(f"  {name:<13} {bench_delete(reducer, args.messages) * 1e3:9.2f} ms")
+
+    print(f"append one message to a {args.messages}-message history")
+    for name, reducer in reducers:
+        print(f"  {name:<13} {bench_append(reducer, args.messages, args.turns) * 1e6:9.1f} us/update")
+
+    print(f"graph: filter {args.messages} messages down to 2, then one model node")
+    for name, reducer in reducers:
+        print(f"  {name:<13} {bench_graph(reducer, args.messages) * 1e3:9.2f} ms")
+
+
+main()
@@ -0,0 +1,169 @@
+# part4/example4 의 GoogleNews (매번 feedparser.parse(url)) vs AsyncNewsFetcher 비교 (로컬 RSS 서버, 외부 요청 없음)
+#   - 같은 키워드를 반복 검색할 때 (tool 호출이 이어질 때) 검색 하나의 시간 / 서버가 받은 요청 / 새 연결 수
+#   - feed 가 바뀌지 않았을 때 조건부 요청 (304) 과 fresh_for 안의 재사용
+#   - 여러 키워드를 한 번에 검색할 때 (순차 vs search_many)
+# 서버는 구글 뉴스 RSS 형식의 녹화된 feed (item --items 개) 를 ETag / Last-Modified 와 함께 --latency-ms 만큼 늦게 보낸다.
+#
+# 사용 예시
+#   python news_fetcher_bench.py
+#   python news_fetcher_bench.py --items 200 --latency-ms 50 --keywords 8
+import argparse
+import hashlib
+import os
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+from xml.sax.saxutils import escape
+
+import feedparser
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import AsyncNewsFetcher
+
+
+def recorded_feed(query, items):
+    # news.google.com/rss/search 응답과 같은 모양 (description 에 HTML 이 escape 되어 들어 있다)
+    description = '<a href="https://example.com/{i}">{query} 기사 {i}</a>&nbsp;&nbsp;<font color="#6f6f6f">언론사{press}</font>' * 3
+    entries = "".join(
+        f"<item><title>{escape(query)} 관련 기사 {i} - 언론사{i % 7}</title>"
+        f"<link>https://news.google.com/rss/articles/CBMi{i:08d}?oc=5</link>"
+        f'<guid isPermaLink="false">CBMi{i:08d}</guid>'
+        f"<pubDate>Mon, 14 Oct 2024 0{i % 10}:00:00 GMT</pubDate>"
+        f"<description>{escape(description.format(i=i, query=query, press=i % 7))}</description>"
+        f'<source url="https://press{i % 7}.example.com">언론사{i % 7}</source></item>'
+        for i in range(items)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?><rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/">'
+        f"<channel><title>\"{escape(query)}\" - Google 뉴스</title><link>https://news.google.com/search?q={escape(query)}</link>"
+        f"<language>ko</language>{entries}</channel></rss>"
+    ).encode()
+
+
+class FeedServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, items, latency):
+        super().__init__(("127.0.0.1", 0), FeedHandler)
+        self.items = items
+        self.latency = latency
+        self.feeds = {}
+        self.last_modified = formatdate(usegmt=True)
+        self.requests = self.connections = self.not_modified = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/rss"
+
+    def reset(self):
+        self.requests = self.connections = self.not_modified = 0
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get("q", ["latest"])[0]
+        with self.server.lock:
+            self.server.requests += 1
+            body = self.server.feeds.get(query)
+            if body is None:
+                body = self.server.feeds[query] = recorded_feed(query, self.server.items)
+        time.sleep(self.server.latency)
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            with self.server.lock:
+                self.server.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", self.server.last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class GoogleNews:
+    """part4/example4.py 의 기존 구현 (base_url 만 로컬 서버)"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def search_by_keyword(self, keyword, k=3):
+        url = f"{self.base_url}/search?q={quote(keyword)}&hl=ko&gl=KR&ceid=KR:ko"
+        news_data = feedparser.parse(url)
+        return [{"url": entry.link, "content": entry.title} for entry in news_data.entries[:k]]
+
+
+def measure(label, server, repeats, fn):
+    server.reset()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    elapsed = (time.perf_counter() - start) / repeats
+    print(
+        f"  {label:<34} {elapsed * 1e3:8.2f} ms/call   requests {server.requests:4d}   "
+        f"304 {server.not_modified:4d}   connections {server.connections:4d}"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pooled conditional-GET RSS fetcher benchmark")
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=30)
+    parser.add_argument("--keywords", type=int, default=6)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    server = FeedServer(args.items, args.latency_ms / 1e3)
+    base_url = server.url
+    keyword = "미국 대선"
+    print(f"== same keyword x {args.repeats}, feed {args.items} items ({len(recorded_feed(keyword, args.items)) / 1024:.0f} KiB), k={args.k}, latency {args.latency_ms} ms ==")
+
+    expected = measure("GoogleNews (feedparser.parse)", server, args.repeats, lambda: GoogleNews(base_url).search_by_keyword(keyword, args.k))
+    for label, fresh_for in (("AsyncNewsFetcher fresh_for=0 (304)", 0.0), ("AsyncNewsFetcher fresh_for=60", 60.0)):
+        news = AsyncNewsFetcher(base_url, fresh_for=fresh_for)
+        result = measure(label, server, args.repeats, lambda: news.search_by_keyword(keyword, args.k))
+        assert result == expected, label
+        news.close()
+
+    # 캐시 없이 (매번 다른 키워드) parse 비용만 비교
+    news = AsyncNewsFetcher(base_url, fresh_for=0)
+    counter = iter(range(10 ** 6))
+    print("== cold searches (new keyword every time) ==")
+    measure("GoogleNews (feedparser.parse)", server, args.repeats, lambda: GoogleNews(base_url).search_by_keyword(f"a{next(counter)}", args.k))
+    measure("AsyncNewsFetcher (stop after k)", server, args.repeats, lambda: news.search_by_keyword(f"b{next(counter)}", args.k))
+
+    keywords = [f"키워드 {i}" for i in range(args.keywords)]
+    print(f"== {args.keywords} keywords at once ==")
+    sequential = measure("GoogleNews sequential", server, 1, lambda: {kw: GoogleNews(base_url).search_by_keyword(kw, args.k) for kw in keywords})
+    news.close()
+    news = AsyncNewsFetcher(base_url)
+    concurrent = measure("AsyncNewsFetcher.search_many", server, 1, lambda: news.search_many(keywords, args.k))
+    assert concurrent == sequential
+    print(" ", news.stats())
+    news.close()
+    server.shutdown()
+
+
+main()
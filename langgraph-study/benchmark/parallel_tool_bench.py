@@ -0,0 +1,71 @@
+# 한 turn 에 독립적인 tool call 3개가 왔을 때 tools 단계의 실행 시간 비교
+#   - 순차 실행 : 각 tool 시간의 합
+#   - ParallelToolNode : 가장 느린 tool 의 시간
+import asyncio
+import os
+import sys
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+# part1 의 parallel_tool_node 를 import 하기 위한 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "part1"))
+from parallel_tool_node import ParallelToolNode
+
+
+@tool
+def slow_add(a: int, b: int) -> int:
+    """Adds a and b slowly."""
+    time.sleep(0.3)
+    return a + b
+
+
+@tool
+def slow_multiply(a: int, b: int) -> int:
+    """Multiplies a and b slowly."""
+    time.sleep(0.5)
+    return a * b
+
+
+@tool
+async def slow_divide(a: int, b: int) -> float:
+    """Divides a and b slowly (async tool)."""
+    await asyncio.sleep(0.4)
+    return a / b
+
+
+tools = [slow_add, slow_multiply, slow_divide]
+tools_by_name = {t.name: t for t in tools}
+
+message = AIMessage(
+    content="",
+    tool_calls=[
+        {"name": "slow_add", "args": {"a": 3, "b": 4}, "id": "call_1"},
+        {"name": "slow_multiply", "args": {"a": 7, "b": 2}, "id": "call_2"},
+        {"name": "slow_divide", "args": {"a": 14, "b": 5}, "id": "call_3"},
+    ],
+)
+state = {"messages": [message]}
+
+# 순차 실행
+start = time.perf_counter()
+for call in message.tool_calls:
+    asyncio.run(tools_by_name[call["name"]].ainvoke({**call, "type": "tool_call"}))
+print(f"sequential          : {time.perf_counter() - start:.3f}s")
+
+tool_node = ParallelToolNode(tools, max_workers=4)
+
+start = time.perf_counter()
+output = tool_node.invoke(state)
+print(f"ParallelToolNode    : {time.perf_counter() - start:.3f}s")
+
+start = time.perf_counter()
+output = asyncio.run(tool_node.ainvoke(state))
+print(f"ParallelToolNode (a): {time.perf_counter() - start:.3f}s")
+
+# 결과는 tool_call 순서 그대로
+for m in output["messages"]:
+    print(m.tool_call_id, m.content, f"{m.response_metadata['elapsed_ms']:.0f}ms")
+
+print(tool_node.stats())
@@ -0,0 +1,102 @@
+# 1k 턴 대화에서 모델 호출마다 prompt 를 만드는 비용 비교
+#   - baseline : [sys_msg] + state["messages"] 로 새 리스트를 만들고 ChatOpenAI 가 전체를 직렬화
+#   - cached   : PromptAssembler + CachedPrefixChatOpenAI (새 메시지만 붙이고 새 메시지만 직렬화)
+#
+# 네트워크 호출 없이 요청 payload 를 만드는 데까지만 측정한다.
+# 한 턴 = Human -> AI(tool call) -> Tool -> AI 로 모델 호출 2번
+#
+# 사용 예시
+#   python prompt_assembly_bench.py                # 1000 턴
+#   python prompt_assembly_bench.py --turns 2000 --reload   # 턴마다 checkpoint 에서 다시 읽은 것처럼 메시지 객체를 새로 만든다
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")  # payload 만 만들기 때문에 실제 키는 필요 없다.
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_openai import ChatOpenAI
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.prompt_cache import CachedPrefixChatOpenAI, PromptAssembler
+
+sys_msg = SystemMessage(content="You are a helpful assistant tasked with performing arithmetic on a set of inputs.")
+
+
+def multiply(a: int, b: int) -> int:
+    """Multiplies a and b."""
+    return a * b
+
+
+def turn_messages(i):
+    call_id = f"call_{i}"
+    return [
+        HumanMessage(content=f"Multiply {i} and {i + 1}. " + "Please explain the steps. " * 5, id=f"h{i}"),
+        AIMessage(
+            content="",
+            tool_calls=[{"name": "multiply", "args": {"a": i, "b": i + 1}, "id": call_id}],
+            id=f"a{i}",
+        ),
+        ToolMessage(content=str(i * (i + 1)), tool_call_id=call_id, name="multiply", id=f"t{i}"),
+        AIMessage(content=f"The result of {i} x {i + 1} is {i * (i + 1)}. " * 3, id=f"r{i}"),
+    ]
+
+
+def run(turns, build_payload, reload):
+    history = []
+    timings = []
+    for i in range(turns):
+        if reload:
+            # checkpointer 에서 state 를 다시 읽으면 값은 같지만 다른 객체가 된다.
+            history = [m.model_copy() for m in history]
+        human, ai_call, tool_msg, ai_answer = turn_messages(i)
+        start = time.perf_counter()
+        build_payload(history + [human])
+        build_payload(history + [human, ai_call, tool_msg])
+        timings.append(time.perf_counter() - start)
+        history = history + [human, ai_call, tool_msg, ai_answer]
+    return timings
+
+
+def report(name, timings):
+    total = sum(timings)
+    last = timings[-100:]
+    print(
+        f"{name:<10} total {total:8.3f}s   first 100 turns {sum(timings[:100]) / 100 * 1e3:7.3f} ms/turn"
+        f"   last 100 turns {sum(last) / len(last) * 1e3:7.3f} ms/turn"
+    )
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="incremental prompt assembly benchmark")
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--reload", action="store_true", help="턴마다 메시지 객체를 새로 만든다 (checkpoint 에서 읽은 경우)")
+    args = parser.parse_args()
+
+    baseline_llm = ChatOpenAI(model="gpt-4o").bind_tools([multiply])
+    tools_kwargs = baseline_llm.kwargs
+
+    def baseline(messages):
+        return baseline_llm.bound._get_request_payload([sys_msg] + messages, **tools_kwargs)
+
+    assembler = PromptAssembler(sys_msg)
+    cached_llm = CachedPrefixChatOpenAI(model="gpt-4o", prompt_assembler=assembler)
+    config = {"configurable": {"thread_id": "bench"}}
+
+    def cached(messages):
+        return cached_llm._get_request_payload(assembler.assemble(messages, config), **tools_kwargs)
+
+    # 두 방식이 같은 payload 를 만드는지 먼저 확인
+    sample = [m for i in range(3) for m in turn_messages(i)]
+    assert baseline(sample) == cached(sample)
+    assembler.invalidate("bench")
+
+    base_total = report("baseline", run(args.turns, baseline, args.reload))
+    cached_total = report("cached", run(args.turns, cached, args.reload))
+    print(f"speedup    {base_total / cached_total:.1f}x")
+    print(assembler.stats())
+
+
+main()
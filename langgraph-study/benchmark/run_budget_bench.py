@@ -0,0 +1,170 @@
+# recursion_limit vs RunBudget 비교 : 끝나지 않는 ReAct agent (모델이 계속 tool 을 부른다) 를 멈출 때
+#   - recursion_limit : GraphRecursionError 로 끝나고 그때까지 쓴 token / 시간은 세지 않는다.
+#   - RunBudget : tool 호출 / token / step / deadline 중 먼저 넘은 예산에서 멈추고,
+#     멈추기 전까지의 state 가 checkpoint 에 남았는지, 이유가 구조화되어 남는지, 예산을 늘려 이어서 돌 수 있는지 확인한다.
+#   - deadline 은 stream 중인 (느린) 모델 응답과 tool 의 요청 timeout 까지 전달되는지 본다. (sync / async)
+# part4/example3 과 같은 chatbot -> tools 그래프, LLM 호출 없음
+#
+# 사용 예시
+#   python run_budget_bench.py
+#   python run_budget_bench.py --token-ms 20 --deadline 0.5
+import argparse
+import asyncio
+import os
+import sys
+import time
+from itertools import cycle
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.errors import GraphRecursionError
+from langgraph.graph import START, MessagesState, StateGraph
+from langgraph.prebuilt import ToolNode, tools_condition
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import RunBudget
+
+
+class LoopingFakeChatModel(GenericFakeChatModel):
+    """매번 검색 tool 을 부르는 (끝나지 않는) 모델, 호출마다 usage 300 token"""
+
+    token_delay: float = 0.0
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        # 느린 stream 모델 흉내 : token 하나마다 token_delay 초
+        for word in ("searching the news once more " * 20).split(" "):
+            time.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                run_manager.on_llm_new_token(word + " ", chunk=chunk)
+            yield chunk
+
+
+def looping_messages():
+    for i in cycle(range(10 ** 9)):
+        yield AIMessage(
+            content="",
+            tool_calls=[{"name": "search_keyword", "args": {"query": f"뉴스 {i}"}, "id": f"call-{i}"}],
+            usage_metadata={"input_tokens": 250, "output_tokens": 50, "total_tokens": 300},
+        )
+
+
+@tool
+def search_keyword(query: str) -> str:
+    """Look up news by keyword"""
+    budget = RunBudget.from_config()
+    # 느린 검색 API 흉내 : deadline 이 있으면 남은 시간까지만 기다린다.
+    timeout = 0.05 if budget is None or budget.remaining() is None else min(0.05, budget.remaining())
+    time.sleep(timeout)
+    return f"{query} 결과"
+
+
+def build_graph(stream_answer=False, token_delay=0.0):
+    model = LoopingFakeChatModel(messages=looping_messages(), token_delay=token_delay)
+
+    def chatbot(state: MessagesState):
+        if stream_answer:
+            # 긴 답변을 stream 으로 받는 노드 (deadline 이 지나면 token 사이에서 끊긴다)
+            text = "".join(chunk.content for chunk in model.stream(state["messages"]))
+            return {"messages": [AIMessage(content=text)]}
+        return {"messages": [model.invoke(state["messages"])]}
+
+    async def achatbot(state: MessagesState):
+        text = ""
+        async for chunk in model.astream(state["messages"]):
+            text += chunk.content
+        return {"messages": [AIMessage(content=text)]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("chatbot", chatbot)
+    builder.add_node("achatbot", achatbot)
+    builder.add_node("tools", ToolNode([search_keyword]))
+    builder.add_conditional_edges("chatbot", tools_condition)
+    builder.add_edge("tools", "chatbot")
+    builder.add_edge(START, "chatbot")
+    return builder, model
+
+
+def question(thread):
+    return {"messages": [HumanMessage(content="미국 대선 관련 뉴스 알려줘.")]}, {"configurable": {"thread_id": thread}}
+
+
+def report(label, graph, config, budget, start):
+    elapsed = time.perf_counter() - start
+    state = graph.get_state(config)
+    print(
+        f"  {label:<26} stopped in {elapsed * 1e3:7.1f} ms   next {state.next}   "
+        f"saved messages {len(state.values['messages']):3d}   reason {budget.reason}"
+    )
+    assert state.next and state.tasks[0].interrupts[0].value == budget.reason
+
+
+def main():
+    parser = argparse.ArgumentParser(description="per-run budget benchmark")
+    parser.add_argument("--recursion-limit", type=int, default=25)
+    parser.add_argument("--token-ms", type=float, default=10)
+    parser.add_argument("--deadline", type=float, default=0.3)
+    args = parser.parse_args()
+
+    builder, _ = build_graph()
+    graph = builder.compile(checkpointer=MemorySaver())
+
+    print("== runaway ReAct agent ==")
+    inputs, config = question("recursion")
+    start = time.perf_counter()
+    try:
+        graph.invoke(inputs, {**config, "recursion_limit": args.recursion_limit})
+    except GraphRecursionError as e:
+        print(f"  {'recursion_limit':<26} error after {(time.perf_counter() - start) * 1e3:7.1f} ms   {type(e).__name__}")
+
+    for label, budget in (
+        ("max_tool_calls=3", RunBudget(max_tool_calls=3)),
+        ("max_tokens=1000", RunBudget(max_tokens=1000)),
+        ("max_steps=5", RunBudget(max_steps=5)),
+        ("deadline (tool timeout)", RunBudget(deadline=args.deadline)),
+    ):
+        inputs, config = question(label)
+        start = time.perf_counter()
+        graph.invoke(inputs, budget.attach(config))
+        report(label, graph, config, budget, start)
+
+    # 같은 thread 를 예산을 늘려서 이어서 돌린다. (멈춘 노드부터)
+    inputs, config = question("resume")
+    graph.invoke(inputs, RunBudget(max_tool_calls=2).attach(config))
+    before = len(graph.get_state(config).values["messages"])
+    budget = RunBudget(max_tool_calls=2)
+    graph.invoke(None, budget.attach(config))
+    after = len(graph.get_state(config).values["messages"])
+    print(f"  {'resume with a new budget':<26} messages {before} -> {after}   reason {budget.reason}")
+    assert after > before
+
+    print(f"== deadline {args.deadline}s while a model streams ({args.token_ms} ms / token, 100 tokens) ==")
+    builder, model = build_graph(stream_answer=True, token_delay=args.token_ms / 1e3)
+    graph = builder.compile(checkpointer=MemorySaver())
+    inputs, config = question("stream")
+    budget = RunBudget(deadline=args.deadline)
+    start = time.perf_counter()
+    graph.invoke(inputs, budget.attach(config))
+    report("sync stream", graph, config, budget, start)
+
+    async def run_async():
+        async_builder = StateGraph(MessagesState)
+        async_builder.add_node("achatbot", builder.nodes["achatbot"].runnable)
+        async_builder.add_edge(START, "achatbot")
+        async_graph = async_builder.compile(checkpointer=MemorySaver())
+        inputs, config = question("astream")
+        budget = RunBudget(deadline=args.deadline)
+        start = time.perf_counter()
+        await async_graph.ainvoke(inputs, budget.attach(config))
+        report("async stream", async_graph, config, budget, start)
+
+    asyncio.run(run_async())
+
+
+main()
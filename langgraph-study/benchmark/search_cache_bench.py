@@ -0,0 +1,137 @@
+# TavilySearchResults vs SingleFlightSearchTool 비교 (로컬 stub 검색 서버, 외부 API 호출 없음)
+#   - 병렬 branch (ToolNode 의 tool call 여러 개 / thread 여러 개 / async) 가 같은 검색어를 동시에 검색할 때 서버가 받은 요청 수
+#   - TTL 안에서 다시 검색할 때 / TTL 이 지난 뒤의 요청 수
+#   - 실패 응답 (서버 500) 은 캐시하지 않는지
+# stub 서버는 Tavily 의 POST /search 와 같은 형식으로 답하고 --latency-ms 만큼 늦게 응답한다.
+#
+# 사용 예시
+#   python search_cache_bench.py
+#   python search_cache_bench.py --parallel 32 --latency-ms 200
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain_community.utilities import tavily_search
+from langchain_core.messages import AIMessage
+from langgraph.prebuilt import ToolNode
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import SingleFlightSearchTool
+
+
+class StubSearchServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency):
+        super().__init__(("127.0.0.1", 0), StubSearchHandler)
+        self.latency = latency
+        self.requests = 0
+        self.fail = False
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubSearchHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        params = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        # 실제 검색 엔진처럼 검색어 앞뒤 / 중복 공백은 무시한다.
+        params["query"] = " ".join(params["query"].split())
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.latency)
+        if self.server.fail:
+            self.send_error(500)
+            return
+        results = [
+            {"title": f"{params['query']} {i}", "url": f"https://example.com/{i}", "content": f"result {i} for {params['query']}", "score": 0.9}
+            for i in range(params["max_results"])
+        ]
+        body = json.dumps({"query": params["query"], "results": results}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def tool_node_call(tool, parallel):
+    # 모델이 한 번에 같은 검색 tool call 을 여러 개 낸 경우 (ToolNode 가 thread 로 나눠서 실행)
+    calls = [{"name": tool.name, "args": {"query": "오늘 모엣샹동 샴페인 가격"}, "id": f"call-{i}"} for i in range(parallel)]
+    output = ToolNode([tool]).invoke({"messages": [AIMessage(content="", tool_calls=calls)]})
+    assert len(output["messages"]) == parallel
+
+
+def threads_call(tool, parallel):
+    # 여러 thread (대화) 가 공백만 다른 같은 질문을 동시에 검색
+    with ThreadPoolExecutor(parallel) as pool:
+        results = list(pool.map(lambda i: tool.invoke({"query": "  서울 날씨 " + " " * (i % 3)}), range(parallel)))
+    assert all(result == results[0] for result in results)
+
+
+def async_call(tool, parallel):
+    async def main():
+        await asyncio.gather(*(tool.ainvoke({"query": "LangGraph checkpoint"}) for _ in range(parallel)))
+
+    asyncio.run(main())
+
+
+def measure(label, server, fn):
+    server.requests = 0
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {server.requests:4d} requests   {elapsed * 1e3:8.1f} ms")
+    return server.requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="single-flight + TTL search cache benchmark")
+    parser.add_argument("--parallel", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    server = StubSearchServer(args.latency_ms / 1e3)
+    tavily_search.TAVILY_API_URL = server.url
+    os.environ.setdefault("TAVILY_API_KEY", "stub")
+
+    print(f"== {args.parallel} identical searches at once, stub latency {args.latency_ms} ms ==")
+    for label, make in (
+        ("TavilySearchResults", lambda: TavilySearchResults(max_results=2)),
+        ("SingleFlightSearchTool", lambda: SingleFlightSearchTool(TavilySearchResults(max_results=2), ttl=1.0)),
+    ):
+        print(label)
+        for name, fn in (("ToolNode parallel tool calls", tool_node_call), ("threads", threads_call), ("asyncio.gather", async_call)):
+            measure(name, server, lambda: fn(make(), args.parallel))
+
+    tool = SingleFlightSearchTool(TavilySearchResults(max_results=2), ttl=1.0)
+    print("SingleFlightSearchTool TTL")
+    assert measure("first search", server, lambda: tool.invoke({"query": "ttl"})) == 1
+    assert measure("again within ttl", server, lambda: tool.invoke({"query": "ttl"})) == 0
+    time.sleep(1.1)
+    assert measure("again after ttl", server, lambda: tool.invoke({"query": "ttl"})) == 1
+
+    server.fail = True
+    assert measure("server error", server, lambda: tool.invoke({"query": "error"})) == 1
+    server.fail = False
+    assert measure("retry after error (not cached)", server, lambda: tool.invoke({"query": "error"})) == 1
+
+    for stats in tool.stats()["queries"]:
+        print(f"  {stats['query']!r:<10} calls {stats['calls']}  searches {stats['searches']}  cache hits {stats['cache_hits']}  last {stats['last_ms']:.1f} ms")
+    server.shutdown()
+
+
+main()
@@ -0,0 +1,79 @@
+# 긴 history 를 매 턴 trim 할 때 token 계산 비용 비교
+#   - baseline     : trim_messages(token_counter=...) 에 캐시 없는 counter (매 턴 전체를 다시 tokenize, ChatOpenAI 와 같은 방식)
+#   - cached count : trim_messages(token_counter=MessageTokenCounter) (메시지별 token 수만 캐시)
+#   - ledger trim  : MessageTokenCounter.trim (thread 별 prefix sum + 이진 탐색)
+#
+# tiktoken encoding 을 받을 수 없는 환경 (오프라인) 에서는 공백 기준 단어 수로 센다.
+#
+# 사용 예시
+#   python token_counter_bench.py
+#   python token_counter_bench.py --history 20000 --turns 100 --max-tokens 4000
+import argparse
+import os
+import sys
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, trim_messages
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.token_counter import MessageTokenCounter
+
+
+def text_counter():
+    try:
+        import tiktoken
+
+        enc = tiktoken.get_encoding("o200k_base")
+        return "tiktoken o200k_base", lambda text: len(enc.encode(text))
+    except Exception:
+        return "whitespace words (tiktoken encoding unavailable)", lambda text: len(text.split())
+
+
+def turn(i):
+    return [
+        HumanMessage(content=f"Question {i}: tell me about ocean mammal number {i}. " * 3, id=f"h{i}"),
+        AIMessage(content=f"Answer {i}: whales, dolphins, seals and narwhals are ocean mammals. " * 6, id=f"a{i}"),
+    ]
+
+
+def run(name, trim, history, turns):
+    messages = list(history)
+    start = time.perf_counter()
+    for i in range(turns):
+        messages = messages + turn(len(history) + i)
+        kept = trim(messages)
+    per_turn = (time.perf_counter() - start) / turns
+    print(f"  {name:<13} {per_turn * 1e3:9.3f} ms/turn   kept {len(kept)} messages")
+    return kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="cached token counting / trimming benchmark")
+    parser.add_argument("--history", type=int, default=5000, help="처음 history 메시지 수")
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--max-tokens", type=int, default=2000)
+    args = parser.parse_args()
+
+    counter_name, count_text = text_counter()
+    history = [SystemMessage(content="You are a helpful assistant.", id="sys")]
+    history += [m for i in range((args.history - 1) // 2) for m in turn(i)]
+    options = dict(max_tokens=args.max_tokens, strategy="last", include_system=True, start_on="human")
+    print(f"{len(history)} messages, {args.turns} turns, trim to {args.max_tokens} tokens ({counter_name})")
+
+    uncached = MessageTokenCounter(count_text=count_text, max_entries=0)
+    baseline = run("baseline", lambda m: trim_messages(m, token_counter=uncached, **options), history, args.turns)
+
+    cached = MessageTokenCounter(count_text=count_text)
+    cached(history)  # warm-up
+    run("cached count", lambda m: trim_messages(m, token_counter=cached, **options), history, args.turns)
+
+    ledger = MessageTokenCounter(count_text=count_text)
+    config = {"configurable": {"thread_id": "bench"}}
+    ledger.trim(history, config, **options)  # warm-up
+    result = run("ledger trim", lambda m: ledger.trim(m, config, **options), history, args.turns)
+
+    assert [m.id for m in result] == [m.id for m in baseline]
+    print(ledger.stats())
+
+
+main()
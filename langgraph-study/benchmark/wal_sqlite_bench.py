@@ -0,0 +1,85 @@
+# SqliteSaver(connection 1개 공유) vs PooledSqliteSaver(WAL + reader pool + group commit) 비교
+# 여러 thread_id 를 동시에 실행했을 때 체크포인트 I/O 처리량을 본다. (LLM 호출 없음)
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.graph import MessagesState, StateGraph, START, END
+
+# part2 의 wal_sqlite_saver 를 import 하기 위한 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "part2"))
+from wal_sqlite_saver import PooledSqliteSaver
+
+THREADS = 32
+TURNS = 10
+
+
+def chatbot(state: MessagesState):
+    return {"messages": [AIMessage(content="ok " * 20)]}
+
+
+builder = StateGraph(MessagesState)
+builder.add_node("chatbot", chatbot)
+builder.add_edge(START, "chatbot")
+builder.add_edge("chatbot", END)
+
+
+def run_conversation(graph, thread_id):
+    config = {"configurable": {"thread_id": thread_id}}
+    for turn in range(TURNS):
+        graph.invoke({"messages": [HumanMessage(content=f"hello {turn}")]}, config)
+
+
+def bench_sync(label, checkpointer):
+    graph = builder.compile(checkpointer=checkpointer)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        list(pool.map(lambda i: run_conversation(graph, f"{label}-{i}"), range(THREADS)))
+    elapsed = time.perf_counter() - start
+    turns = THREADS * TURNS
+    print(f"{label:<24} {elapsed:7.2f}s  {turns / elapsed:8.1f} turns/s")
+
+
+async def bench_async(label, checkpointer):
+    graph = builder.compile(checkpointer=checkpointer)
+
+    async def conversation(thread_id):
+        config = {"configurable": {"thread_id": thread_id}}
+        for turn in range(TURNS):
+            await graph.ainvoke({"messages": [HumanMessage(content=f"hello {turn}")]}, config)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(conversation(f"{label}-{i}") for i in range(THREADS)))
+    elapsed = time.perf_counter() - start
+    turns = THREADS * TURNS
+    print(f"{label:<24} {elapsed:7.2f}s  {turns / elapsed:8.1f} turns/s")
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"== {THREADS} thread_id x {TURNS} turns ==")
+
+        conn = sqlite3.connect(os.path.join(tmp, "shared.db"), check_same_thread=False)
+        bench_sync("SqliteSaver (sync)", SqliteSaver(conn))
+        conn.close()
+
+        with PooledSqliteSaver(os.path.join(tmp, "pooled.db")) as saver:
+            bench_sync("PooledSqliteSaver (sync)", saver)
+            print("  ", saver.stats())
+
+        async with AsyncSqliteSaver.from_conn_string(os.path.join(tmp, "aio.db")) as saver:
+            await bench_async("AsyncSqliteSaver", saver)
+
+        with PooledSqliteSaver(os.path.join(tmp, "pooled_aio.db")) as saver:
+            await bench_async("PooledSqliteSaver (async)", saver)
+            print("  ", saver.stats())
+
+
+asyncio.run(main())
@@ -0,0 +1,23 @@
+from .background_summarizer import BackgroundSummarizer
+from .bounded_memory_saver import BoundedMemorySaver
+from .changed_keys_state import ChangedKeysValidator
+from .chunked_log import ChunkedLog, ChunkedLogSerializer, append_log
+from .delta_stream import DeltaEncoder, StateRebuilder, astream_deltas, stream_deltas
+from .document_set import DocumentSet, document_key, merge_unique_documents
+from .event_subscription import subscribe_events
+from .llm_cache import TieredLLMCache
+from .message_coalescer import StreamClosed, astream_coalesced, stream_coalesced
+from .message_log import IndexedMessagesState, MessageLog, add_messages_indexed
+from .prompt_cache import CachedPrefixAzureChatOpenAI, CachedPrefixChatOpenAI, PromptAssembler
+from .run_budget import BudgetExceeded, RunBudget
+from .search_cache import SingleFlightSearchTool
+from .token_counter import MessageTokenCounter
+
+
+def __getattr__(name):
+    # news_fetcher 는 feedparser / aiohttp 가 필요하므로 AsyncNewsFetcher 를 처음 쓸 때 import 한다.
+    if name == "AsyncNewsFetcher":
+        from .news_fetcher import AsyncNewsFetcher
+
+        return AsyncNewsFetcher
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,164 @@
+# 대화 요약을 사용자 응답 경로 밖 (background) 에서 실행하는 모듈
+#
+# conversation -> (메시지가 6개 넘으면) summarize_conversation -> END 그래프는
+# 요약이 필요한 턴에서 사용자가 요약 LLM 호출까지 기다려야 한다. (응답은 이미 나왔는데도 invoke / stream 이 끝나지 않는다)
+#
+# BackgroundSummarizer 는
+#   - 그래프는 conversation -> END 로 바로 끝내고 (응답을 먼저 돌려주고)
+#   - 턴이 끝나면 thread 의 최신 state 로 요약 함수를 background thread 에서 실행한 뒤
+#   - 요약과 RemoveMessage 를 update_state 한 번으로 (checkpoint 하나로) 반영한다.
+#   - 같은 thread 의 다음 턴은 시작하기 전에 아직 끝나지 않은 요약을 기다린다. (요약이 반영된 state 를 읽는다)
+#
+# 사용 예시
+#   workflow.add_edge("conversation", END)                     # 조건부 edge 대신
+#   workflow.add_edge("summarize_conversation", END)           # 요약 노드는 update_state(as_node=...) 용으로 남겨둔다.
+#   graph = workflow.compile(checkpointer=memory)
+#   summarizer = BackgroundSummarizer(graph, summarize_conversation, should_summarize=lambda s: len(s["messages"]) > 6)
+#
+#   with summarizer.turn(config):                              # async 는 async with summarizer.aturn(config):
+#       output = graph.invoke({"messages": [input_message]}, config)
+import asyncio
+import contextlib
+import inspect
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from langchain_core.messages import RemoveMessage
+from langchain_core.runnables import RunnableConfig
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundSummarizer:
+    """
+    턴이 끝난 뒤 요약 노드 함수를 background 에서 실행하고 결과를 checkpoint 에 반영합니다.
+
+    Args:
+        graph: checkpointer 와 함께 compile 한 그래프
+        summarize: state -> {"summary": ..., "messages": [RemoveMessage, ...]} 를 반환하는 함수 (기존 요약 노드 함수)
+        should_summarize: state 를 보고 요약이 필요한지 판단하는 함수
+        as_node: update_state 에서 업데이트를 기록할 노드 이름
+        max_workers: 동시에 요약할 수 있는 thread 수
+    """
+
+    def __init__(
+        self,
+        graph: Any,
+        summarize: Callable[[Dict[str, Any]], Any],
+        should_summarize: Callable[[Dict[str, Any]], bool],
+        as_node: Optional[str] = "summarize_conversation",
+        max_workers: int = 2,
+    ):
+        self.graph = graph
+        self.summarize = summarize
+        self.should_summarize = should_summarize
+        self.as_node = as_node
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="summarizer")
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+        self._stats = {"scheduled": 0, "summarized": 0, "skipped": 0, "failed": 0, "waited": 0}
+
+    # ------------------------------------------------------------------ turn
+
+    @contextlib.contextmanager
+    def turn(self, config: RunnableConfig) -> Iterator[None]:
+        """턴 앞뒤로 감싼다. 시작할 때 이전 요약을 기다리고, 끝나면 요약을 예약한다."""
+        self.wait(config)
+        yield
+        self.schedule(config)
+
+    @contextlib.asynccontextmanager
+    async def aturn(self, config: RunnableConfig) -> AsyncIterator[None]:
+        await self.await_pending(config)
+        yield
+        self.schedule(config)
+
+    def wait(self, config: RunnableConfig, timeout: Optional[float] = None) -> None:
+        """thread 의 요약이 진행 중이면 끝날 때까지 기다린다."""
+        future = self._pending_future(config)
+        if future is not None:
+            self._count("waited")
+            future.result(timeout)
+
+    async def await_pending(self, config: RunnableConfig) -> None:
+        future = self._pending_future(config)
+        if future is not None:
+            self._count("waited")
+            await asyncio.wrap_future(future)
+
+    def _pending_future(self, config: RunnableConfig) -> Optional[Future]:
+        with self._lock:
+            future = self._pending.get(_thread_id(config))
+        return future if future is not None and not future.done() else None
+
+    # ------------------------------------------------------------------ background
+
+    def schedule(self, config: RunnableConfig) -> Future:
+        """thread 의 최신 state 를 보고 필요하면 요약하는 작업을 background 에 넣는다."""
+        thread_id = _thread_id(config)
+        # 특정 checkpoint 가 아니라 항상 thread 의 최신 checkpoint 를 대상으로 한다.
+        target = {**config, "configurable": {k: v for k, v in config["configurable"].items() if k != "checkpoint_id"}}
+        with self._lock:
+            previous = self._pending.get(thread_id)
+            future = self._executor.submit(self._run, target, previous)
+            self._pending[thread_id] = future
+            self._stats["scheduled"] += 1
+        future.add_done_callback(lambda f: self._forget(thread_id, f))
+        return future
+
+    def _forget(self, thread_id: str, future: Future) -> None:
+        with self._lock:
+            if self._pending.get(thread_id) is future:
+                del self._pending[thread_id]
+
+    def _run(self, config: RunnableConfig, previous: Optional[Future]) -> None:
+        if previous is not None:
+            # 같은 thread 의 이전 요약이 먼저 반영되어야 한다.
+            previous.exception()
+        try:
+            snapshot = self.graph.get_state(config)
+            if not self.should_summarize(snapshot.values):
+                self._count("skipped")
+                return
+            update = self.summarize(snapshot.values)
+            if inspect.isawaitable(update):
+                update = asyncio.run(update)
+            latest = self.graph.get_state(config)
+            if latest.config["configurable"]["checkpoint_id"] != snapshot.config["configurable"]["checkpoint_id"]:
+                # 요약하는 동안 다른 곳에서 (update_state 등) 메시지가 지워졌으면 남아있는 메시지만 지운다.
+                alive = {m.id for m in latest.values.get("messages", [])}
+                update = {
+                    **update,
+                    "messages": [
+                        m for m in update.get("messages", []) if not isinstance(m, RemoveMessage) or m.id in alive
+                    ],
+                }
+            # 요약과 삭제를 update_state 한 번으로 반영해서 checkpoint 하나에 같이 들어가게 한다.
+            self.graph.update_state(config, update, as_node=self.as_node)
+            self._count("summarized")
+        except Exception:
+            # 요약에 실패해도 대화는 계속된다. (메시지가 지워지지 않았으니 다음 턴 뒤에 다시 요약한다)
+            self._count("failed")
+            logger.exception("background summarization failed for thread %s", _thread_id(config))
+
+    def _count(self, name: str) -> None:
+        # worker thread 와 turn 을 실행하는 thread 가 같이 쓰므로 lock 안에서 센다.
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "pending": sum(not f.done() for f in self._pending.values())}
+
+    def close(self, wait: bool = True) -> None:
+        """남은 요약을 (wait=True 면 끝까지) 처리하고 worker 를 정리한다."""
+        self._executor.shutdown(wait=wait)
+
+
+def _thread_id(config: RunnableConfig) -> str:
+    thread_id = (config.get("configurable") or {}).get("thread_id")
+    if thread_id is None:
+        raise ValueError("BackgroundSummarizer 는 config 에 thread_id 가 필요합니다.")
+    return thread_id
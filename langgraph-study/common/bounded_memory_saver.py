@@ -0,0 +1,440 @@
+# 오래 떠 있는 프로세스에서 MemorySaver 대신 쓰는, 메모리 사용량이 제한된 in-memory checkpointer
+#
+# MemorySaver 는 모든 thread 의 모든 checkpoint 를 영원히 들고 있어서 프로세스 메모리가 계속 늘어난다.
+# BoundedMemorySaver 는
+#   - thread (+ checkpoint_ns) 마다 최신 checkpoint N 개만 남기고, 더 이상 참조되지 않는 channel blob 을 지운다.
+#   - 전체 크기가 max_bytes (직렬화된 크기 기준) 를 넘으면 가장 오래 쓰지 않은 thread 부터 내보낸다. (LRU)
+#   - ttl 초 동안 접근이 없는 thread 도 내보낸다.
+#   - spill_path 를 주면 내보낸 thread 를 로컬 SQLite 파일에 저장해두고,
+#     다음에 그 thread 에 접근할 때 (get_state / invoke / stream ...) 자동으로 메모리로 다시 올린다.
+#     spill_path 가 없으면 내보낸 thread 는 그대로 사라진다. (캐시처럼 동작)
+#   - breakpoint (interrupt_before) / interrupt() 에서 멈춘 thread 는 사람을 기다리는 동안 메모리에 둘 필요가 없으므로
+#     park_on_interrupt 로 run 이 끝나자마자 spill 파일로 내보내고 (zlib 압축), 대기 중인 interrupt 를 thread 별로 색인해둔다.
+#     graph.stream(None, ...) / Command(resume=...) 로 재개하면 그 thread 하나만 primary key 로 읽어서 다시 올린다.
+#
+# 사용 예시
+#   memory = BoundedMemorySaver(max_bytes=32 * 1024 * 1024, max_checkpoints=10, ttl=3600, spill_path="spill.db")
+#   graph = builder.compile(checkpointer=memory)
+#
+#   with memory.park_on_interrupt(graph, config):
+#       for event in graph.stream(inputs, config):
+#           ...
+#   memory.pending_interrupts()        # [{"thread_id": ..., "next": ("tools",), "interrupts": [...], ...}]
+import json
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    크기 / 개수 / 유휴 시간에 제한이 있는 MemorySaver 입니다.
+
+    Args:
+        max_bytes: 메모리에 올려둘 checkpoint, write, blob 의 직렬화된 크기 합의 상한 (None 이면 제한 없음)
+        max_checkpoints: (thread, checkpoint_ns) 마다 남길 최신 checkpoint 개수 (None 이면 제한 없음)
+        ttl: 이 시간(초) 동안 접근이 없는 thread 는 내보낸다 (None 이면 사용하지 않음)
+        spill_path: 내보낸 thread 를 저장할 SQLite 파일 경로 (None 이면 버린다)
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: Optional[int] = 64 * 1024 * 1024,
+        max_checkpoints: Optional[int] = 10,
+        ttl: Optional[float] = None,
+        spill_path: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        if max_checkpoints is not None and max_checkpoints < 1:
+            raise ValueError("max_checkpoints must be at least 1")
+        self.max_bytes = max_bytes
+        self.max_checkpoints = max_checkpoints
+        self.ttl = ttl
+        self.spill_path = spill_path
+
+        self._lock = threading.RLock()
+        # thread_id -> 마지막 접근 시각 (앞쪽이 가장 오래된 thread)
+        self._lru: "OrderedDict[str, float]" = OrderedDict()
+        self._bytes: Dict[str, int] = defaultdict(int)
+        # _bytes 의 합 (쓰기마다 전체를 더하지 않도록 _add_bytes / _drop_bytes 에서 같이 갱신한다)
+        self._resident_bytes = 0
+        # thread 단위로 지우고 내보낼 수 있도록 write / blob key 를 thread 별로 모아둔다.
+        self._write_keys: Dict[str, Set[Tuple[str, str, str]]] = defaultdict(set)
+        self._blob_keys: Dict[str, Set[Tuple[str, str, str, Any]]] = defaultdict(set)
+        # (thread_id, checkpoint_ns, checkpoint_id) -> channel_versions (blob 정리용, 역직렬화 없이 참조)
+        self._versions: Dict[Tuple[str, str, str], ChannelVersions] = {}
+        self._counters = {"evictions": 0, "spills": 0, "reloads": 0, "pruned_checkpoints": 0, "parks": 0}
+        # interrupts 테이블에 행이 있는 thread (put 마다 SQLite 를 조회하지 않도록)
+        self._pending: Set[str] = set()
+
+        self._spill: Optional[sqlite3.Connection] = None
+        if spill_path is not None:
+            self._spill = sqlite3.connect(spill_path, check_same_thread=False)
+            self._spill.execute("CREATE TABLE IF NOT EXISTS threads (thread_id TEXT PRIMARY KEY, data BLOB NOT NULL)")
+            self._spill.execute(
+                """
+                CREATE TABLE IF NOT EXISTS interrupts (
+                    thread_id TEXT PRIMARY KEY,
+                    checkpoint_id TEXT,
+                    next TEXT NOT NULL,
+                    interrupts BLOB NOT NULL,
+                    parked_at REAL NOT NULL
+                )
+                """
+            )
+            self._spill.commit()
+            self._pending.update(row[0] for row in self._spill.execute("SELECT thread_id FROM interrupts"))
+            self.stack.callback(self.close)
+
+    # ------------------------------------------------------------------ residency
+
+    def _touch(self, thread_id: str) -> None:
+        """thread 를 메모리에 올리고 (필요하면 spill 파일에서 다시 읽어서) LRU 맨 뒤로 보낸다."""
+        if thread_id in self._lru:
+            self._lru.move_to_end(thread_id)
+        else:
+            self._reload(thread_id)
+        self._lru[thread_id] = time.monotonic()
+
+    def _release(self, thread_id: str) -> None:
+        """접근이 끝난 뒤 비어있는 thread 정리 + TTL / 크기 제한 적용"""
+        if not self.storage.get(thread_id) or not any(self.storage[thread_id].values()):
+            if not self._write_keys.get(thread_id):
+                self.storage.pop(thread_id, None)
+                self._lru.pop(thread_id, None)
+                self._drop_bytes(thread_id)
+        self._enforce(keep=thread_id)
+
+    def _enforce(self, keep: Optional[str] = None) -> None:
+        if self.ttl is not None:
+            deadline = time.monotonic() - self.ttl
+            for thread_id, last_access in list(self._lru.items()):
+                if last_access >= deadline:
+                    break
+                if thread_id != keep:
+                    self._evict(thread_id)
+        if self.max_bytes is not None:
+            while self._resident_bytes > self.max_bytes:
+                victim = next((t for t in self._lru if t != keep), None)
+                if victim is None:
+                    break  # 현재 thread 하나만으로 상한을 넘는 경우는 prune 만 한다.
+                self._evict(victim)
+
+    def _add_bytes(self, thread_id: str, size: int) -> None:
+        self._bytes[thread_id] += size
+        self._resident_bytes += size
+
+    def _drop_bytes(self, thread_id: str) -> int:
+        size = self._bytes.pop(thread_id, 0)
+        self._resident_bytes -= size
+        return size
+
+    def _evict(self, thread_id: str) -> None:
+        data = self._pop_thread(thread_id)
+        self._counters["evictions"] += 1
+        if self._spill is not None and data["storage"]:
+            self._spill.execute(
+                "INSERT OR REPLACE INTO threads (thread_id, data) VALUES (?, ?)",
+                (str(thread_id), zlib.compress(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))),
+            )
+            self._spill.commit()
+            self._counters["spills"] += 1
+
+    def _reload(self, thread_id: str) -> None:
+        if self._spill is None:
+            return
+        row = self._spill.execute("SELECT data FROM threads WHERE thread_id = ?", (str(thread_id),)).fetchone()
+        if row is None:
+            return
+        # 이전 버전이 압축 없이 저장한 행 (pickle 은 0x80 으로 시작한다) 도 읽는다.
+        data = pickle.loads(row[0] if row[0][:1] == b"\x80" else zlib.decompress(row[0]))
+        self._spill.execute("DELETE FROM threads WHERE thread_id = ?", (str(thread_id),))
+        self._spill.commit()
+        self.storage[thread_id] = defaultdict(dict, data["storage"])
+        for key, value in data["writes"].items():
+            self.writes[key] = value
+            self._write_keys[thread_id].add(key)
+        for key, value in data["blobs"].items():
+            self.blobs[key] = value
+            self._blob_keys[thread_id].add(key)
+        self._versions.update(data["versions"])
+        self._drop_bytes(thread_id)
+        self._add_bytes(thread_id, data["bytes"])
+        self._counters["reloads"] += 1
+
+    def _pop_thread(self, thread_id: str) -> Dict[str, Any]:
+        """thread 의 모든 데이터를 메모리에서 떼어내서 반환한다."""
+        storage = {ns: dict(checkpoints) for ns, checkpoints in self.storage.pop(thread_id, {}).items() if checkpoints}
+        writes = {key: self.writes.pop(key) for key in self._write_keys.pop(thread_id, ()) if key in self.writes}
+        blobs = {key: self.blobs.pop(key) for key in self._blob_keys.pop(thread_id, ()) if key in self.blobs}
+        versions = {
+            key: self._versions.pop(key)
+            for ns, checkpoints in storage.items()
+            for key in [(thread_id, ns, checkpoint_id) for checkpoint_id in checkpoints]
+            if key in self._versions
+        }
+        self._lru.pop(thread_id, None)
+        return {
+            "storage": storage,
+            "writes": writes,
+            "blobs": blobs,
+            "versions": versions,
+            "bytes": self._drop_bytes(thread_id),
+        }
+
+    # ------------------------------------------------------------------ parking
+
+    @contextmanager
+    def park_on_interrupt(self, graph: Any, config: RunnableConfig) -> Iterator[None]:
+        """블록 안의 run 이 breakpoint / interrupt 에서 멈춰서 끝나면 thread 를 spill 파일로 내보냅니다. (예외로 끝나면 그대로 둔다)"""
+        yield
+        self.park_if_interrupted(graph, config)
+
+    def park_if_interrupted(self, graph: Any, config: RunnableConfig) -> Optional[Dict[str, Any]]:
+        """thread 의 최신 state 에 실행할 노드가 남아 있으면 (멈춰 있으면) park 하고 색인 항목을 반환합니다."""
+        state = graph.get_state(config)
+        if not state.next:
+            return None
+        return self.park(
+            config["configurable"]["thread_id"],
+            checkpoint_id=state.config["configurable"].get("checkpoint_id"),
+            next=state.next,
+            interrupts=[interrupt.value for task in state.tasks for interrupt in task.interrupts],
+        )
+
+    def park(
+        self,
+        thread_id: str,
+        *,
+        checkpoint_id: Optional[str] = None,
+        next: Sequence[str] = (),
+        interrupts: Sequence[Any] = (),
+    ) -> Dict[str, Any]:
+        """thread 를 메모리에서 내보내고 (spill 파일에 저장) 대기 중인 interrupt 색인에 기록합니다."""
+        if self._spill is None:
+            raise ValueError("park requires spill_path")
+        # 메모리에서는 config 의 thread_id 그대로 (uuid 등), SQLite 에는 문자열로 저장한다.
+        entry = {
+            "thread_id": str(thread_id),
+            "checkpoint_id": checkpoint_id,
+            "next": tuple(next),
+            "interrupts": list(interrupts),
+            "parked_at": time.time(),
+        }
+        with self._lock:
+            self._spill.execute(
+                "INSERT OR REPLACE INTO interrupts (thread_id, checkpoint_id, next, interrupts, parked_at) VALUES (?, ?, ?, ?, ?)",
+                (
+                    entry["thread_id"],
+                    checkpoint_id,
+                    json.dumps(entry["next"]),
+                    pickle.dumps(entry["interrupts"], protocol=pickle.HIGHEST_PROTOCOL),
+                    entry["parked_at"],
+                ),
+            )
+            self._pending.add(entry["thread_id"])
+            if thread_id in self._lru:
+                self._evict(thread_id)  # commit 포함
+            else:
+                self._spill.commit()
+            self._counters["parks"] += 1
+        return entry
+
+    def pending_interrupt(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """thread 의 대기 중인 interrupt (없으면 None). thread 를 메모리로 올리지 않는다."""
+        rows = self._pending_rows("WHERE thread_id = ?", (str(thread_id),))
+        return rows[0] if rows else None
+
+    def pending_interrupts(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """대기 중인 interrupt 목록 (오래 기다린 순). thread 를 메모리로 올리지 않는다."""
+        return self._pending_rows("ORDER BY parked_at LIMIT ?", (-1 if limit is None else limit,))
+
+    def _pending_rows(self, clause: str, params: Tuple[Any, ...]) -> List[Dict[str, Any]]:
+        if self._spill is None:
+            return []
+        with self._lock:
+            rows = self._spill.execute(
+                f"SELECT thread_id, checkpoint_id, next, interrupts, parked_at FROM interrupts {clause}", params
+            ).fetchall()
+        return [
+            {
+                "thread_id": thread_id,
+                "checkpoint_id": checkpoint_id,
+                "next": tuple(json.loads(next)),
+                "interrupts": pickle.loads(interrupts),
+                "parked_at": parked_at,
+            }
+            for thread_id, checkpoint_id, next, interrupts, parked_at in rows
+        ]
+
+    def _resolve(self, thread_id: str) -> None:
+        """thread 가 재개되어 새 checkpoint 를 쓰면 대기 중인 interrupt 색인에서 뺀다."""
+        key = str(thread_id)
+        if key in self._pending and self._spill is not None:
+            self._spill.execute("DELETE FROM interrupts WHERE thread_id = ?", (key,))
+            self._spill.commit()
+            self._pending.discard(key)
+
+    # ------------------------------------------------------------------ pruning
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        """최신 max_checkpoints 개만 남기고, 남은 checkpoint 가 참조하지 않는 blob 을 지운다."""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if self.max_checkpoints is None or len(checkpoints) <= self.max_checkpoints:
+            return
+        for checkpoint_id in sorted(checkpoints)[: len(checkpoints) - self.max_checkpoints]:
+            checkpoint, metadata, _ = checkpoints.pop(checkpoint_id)
+            self._add_bytes(thread_id, -(len(checkpoint[1]) + len(metadata[1])))
+            key = (thread_id, checkpoint_ns, checkpoint_id)
+            self._versions.pop(key, None)
+            if key in self._write_keys[thread_id]:
+                self._write_keys[thread_id].discard(key)
+                self._add_bytes(thread_id, -(sum(len(w[2][1]) for w in self.writes.pop(key, {}).values())))
+            self._counters["pruned_checkpoints"] += 1
+
+        referenced = {
+            (thread_id, checkpoint_ns, channel, version)
+            for checkpoint_id in checkpoints
+            for channel, version in self._versions.get((thread_id, checkpoint_ns, checkpoint_id), {}).items()
+        }
+        blob_keys = self._blob_keys[thread_id]
+        for key in [k for k in blob_keys if k[1] == checkpoint_ns and k not in referenced]:
+            blob_keys.discard(key)
+            self._add_bytes(thread_id, -(len(self.blobs.pop(key)[1])))
+
+    # ------------------------------------------------------------------ BaseCheckpointSaver
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._touch(thread_id)
+            try:
+                return super().get_tuple(config)
+            finally:
+                self._release(thread_id)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        if config is not None:
+            thread_ids = [config["configurable"]["thread_id"]]
+        else:
+            # spill 된 thread 도 포함해서 전부 (하나씩 올렸다가 크기 제한에 따라 다시 내보낸다)
+            with self._lock:
+                thread_ids = list(self._lru)
+                if self._spill is not None:
+                    thread_ids += [
+                        row[0] for row in self._spill.execute("SELECT thread_id FROM threads")
+                        if row[0] not in self._lru
+                    ]
+        for thread_id in thread_ids:
+            if limit is not None and limit <= 0:
+                return
+            thread_config = config or {"configurable": {"thread_id": thread_id}}
+            # 다른 thread 에서 put 이 일어나도 안전하도록 lock 안에서 결과를 모두 만든다.
+            with self._lock:
+                self._touch(thread_id)
+                try:
+                    items = [*super().list(thread_config, filter=filter, before=before, limit=limit)]
+                finally:
+                    self._release(thread_id)
+            if limit is not None:
+                limit -= len(items)
+            yield from items
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            self._touch(thread_id)
+            try:
+                if previous := self.storage[thread_id][checkpoint_ns].get(checkpoint["id"]):
+                    self._add_bytes(thread_id, -(len(previous[0][1]) + len(previous[1][1])))
+                next_config = super().put(config, checkpoint, metadata, new_versions)
+                saved, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+                self._add_bytes(thread_id, len(saved[1]) + len(saved_metadata[1]))
+                for channel, version in new_versions.items():
+                    key = (thread_id, checkpoint_ns, channel, version)
+                    if key not in self._blob_keys[thread_id]:
+                        self._blob_keys[thread_id].add(key)
+                        self._add_bytes(thread_id, len(self.blobs[key][1]))
+                self._versions[(thread_id, checkpoint_ns, checkpoint["id"])] = dict(checkpoint["channel_versions"])
+                self._prune(thread_id, checkpoint_ns)
+                # update_state (사람이 breakpoint 에서 state 를 고치는 경우) 는 재개가 아니므로 색인을 그대로 둔다.
+                if not checkpoint_ns and metadata.get("source") != "update":
+                    self._resolve(thread_id)
+                return next_config
+            finally:
+                self._release(thread_id)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+        with self._lock:
+            self._touch(thread_id)
+            try:
+                before = sum(len(w[2][1]) for w in self.writes.get(key, {}).values())
+                super().put_writes(config, writes, task_id, task_path)
+                if key in self.writes:
+                    self._write_keys[thread_id].add(key)
+                    self._add_bytes(thread_id, sum(len(w[2][1]) for w in self.writes[key].values()) - before)
+            finally:
+                self._release(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._pop_thread(thread_id)
+            if self._spill is not None:
+                self._spill.execute("DELETE FROM threads WHERE thread_id = ?", (str(thread_id),))
+                self._spill.execute("DELETE FROM interrupts WHERE thread_id = ?", (str(thread_id),))
+                self._spill.commit()
+                self._pending.discard(str(thread_id))
+
+    # ------------------------------------------------------------------ misc
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            spilled = 0
+            if self._spill is not None:
+                spilled = self._spill.execute("SELECT COUNT(*) FROM threads").fetchone()[0]
+            return {
+                "resident_threads": len(self._lru),
+                "resident_bytes": self._resident_bytes,
+                "spilled_threads": spilled,
+                "pending_interrupts": len(self._pending),
+                **self._counters,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
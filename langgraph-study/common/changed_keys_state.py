@@ -0,0 +1,138 @@
+# Pydantic 모델의 validator 로 노드가 반환한 업데이트의 key 만 검증하는 helper
+#
+# StateGraph(PydanticState) 는 노드 / 조건부 edge 를 실행할 때마다 PydanticState(**state) 로
+# state 전체를 다시 검증하고 복사한다. (노드가 key 하나만 바꿔도 필드가 많으면 매 step 이 느리다)
+#
+# ChangedKeysValidator 는 그래프 state 는 dict (TypedDict) 로 두고 검증만 Pydantic 모델에 맡긴다.
+#   - validator.node(func) 로 감싼 노드는 반환한 업데이트의 key 만, 필드별 validator (@validator / field_validator 포함) 로 검증한다.
+#   - graph 입력은 validator.validate_input(input) 으로 한 번 전체 검증하고 (기본값 포함) 넘긴다.
+# 그래서 검증 비용이 state 크기가 아니라 업데이트 크기에 비례한다. (그래프 자체의 step 비용은 StateGraph 그대로)
+#
+# 제약
+#   - 감싼 노드만 검증한다. (graph.update_state(...) 로 넣은 값이나 감싸지 않은 노드의 업데이트는 검증하지 않는다)
+#   - 노드는 모델 객체가 아니라 dict state 를 받는다. (노드의 state 인자를 Pydantic 모델로 annotate 하면
+#     langgraph 가 그 모델로 state 전체를 다시 검증하므로 TypedDict 로 annotate 하거나 annotation 을 빼야 한다)
+#   - v2 는 pydantic-core 의 validate_assignment, v1 은 ModelField.validate + root validator 순서를 그대로 따른다.
+#     (pydantic 2.x / pydantic.v1 기준)
+#
+# 사용 예시
+#   validator = ChangedKeysValidator(PydanticState)
+#   builder = StateGraph(TypedDictState)                     # 검증하지 않는 dict state
+#   builder.add_node("node_1", validator.node(node_1))       # node_1 의 업데이트만 PydanticState 로 검증
+#   graph.invoke(validator.validate_input({"name": "hyeonsang", "mode": "sad"}))
+import dataclasses
+import functools
+import inspect
+from typing import Any, Callable, Dict, Optional
+
+from pydantic import BaseModel
+from pydantic.v1 import BaseModel as BaseModelV1
+from pydantic.v1 import ValidationError as ValidationErrorV1
+from pydantic.v1.error_wrappers import ErrorWrapper
+from pydantic.v1.utils import ROOT_KEY
+from langgraph.types import Command
+
+
+class ChangedKeysValidator:
+    """
+    Pydantic state 모델로 업데이트된 key 만 검증합니다.
+
+    Args:
+        schema: pydantic (v1 / v2) BaseModel
+    """
+
+    def __init__(self, schema: type):
+        if not (isinstance(schema, type) and issubclass(schema, (BaseModel, BaseModelV1))):
+            raise TypeError("ChangedKeysValidator 는 pydantic BaseModel 에만 쓸 수 있습니다.")
+        self.schema = schema
+        self.is_v1 = issubclass(schema, BaseModelV1)
+        self.fields = schema.__fields__ if self.is_v1 else schema.model_fields
+        self.required = frozenset(
+            name for name, field in self.fields.items() if (field.required is True if self.is_v1 else field.is_required())
+        )
+
+    def validate_input(self, input: Dict[str, Any]) -> Dict[str, Any]:
+        """graph 입력을 모델 전체로 한 번 검증하고, 기본값까지 채운 dict 를 반환한다."""
+        return dict(self.schema(**input).__dict__)
+
+    def validate(self, update: Dict[str, Any], state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """update 중 모델 필드인 key 만 검증한 새 dict 를 반환한다. (state 는 다른 필드를 참조하는 validator 용)"""
+        state = update if state is None else state
+        keys = [key for key in update if key in self.fields]
+        if not keys:
+            return update
+        if 2 * len(keys) >= len(self.fields) and self.required <= (state.keys() | update.keys()):
+            # graph 입력처럼 대부분의 필드를 한 번에 쓰면 필드마다 검증하는 것보다 전체를 한 번 검증하는 게 빠르다.
+            values = self.schema(**{**state, **update}).__dict__
+            validated = {key: values[key] for key in keys}
+        elif self.is_v1:
+            validated = self._validate_v1(keys, update, state)
+        else:
+            validated = self._validate_v2(keys, update, state)
+        return {**update, **validated}
+
+    def _validate_v2(self, keys, update, state) -> Dict[str, Any]:
+        # validate_assignment 는 필드 하나만 (field_validator + model validator 포함) 검증하고
+        # 새 __dict__ 를 만들어 넣기 때문에 state dict 자체는 바뀌지 않는다.
+        shell = self.schema.__new__(self.schema)
+        object.__setattr__(shell, "__dict__", state)
+        object.__setattr__(shell, "__pydantic_fields_set__", set())
+        object.__setattr__(shell, "__pydantic_extra__", None)
+        object.__setattr__(shell, "__pydantic_private__", None)
+        validator = self.schema.__pydantic_validator__
+        for key in keys:
+            validator.validate_assignment(shell, key, update[key])
+        return {key: shell.__dict__[key] for key in keys}
+
+    def _validate_v1(self, keys, update, state) -> Dict[str, Any]:
+        # pydantic v1 의 validate_assignment 와 같은 순서 (pre root -> field -> post root)
+        values = {**state, **{key: update[key] for key in keys}}
+        errors = []
+        try:
+            for validator in self.schema.__pre_root_validators__:
+                values = validator(self.schema, values)
+        except (ValueError, TypeError, AssertionError) as exc:
+            raise ValidationErrorV1([ErrorWrapper(exc, loc=ROOT_KEY)], self.schema)
+        for key in keys:
+            # 다른 필드를 참조하는 @validator 를 위해 (v1 validate_assignment 와 같이) 자기 자신을 뺀 값을 넘긴다.
+            others = {name: value for name, value in values.items() if name != key}
+            value, error = self.fields[key].validate(values[key], others, loc=key, cls=self.schema)
+            if error:
+                errors.append(error)
+            else:
+                values[key] = value
+        if errors:
+            raise ValidationErrorV1(errors, self.schema)
+        for skip_on_failure, validator in self.schema.__post_root_validators__:
+            try:
+                values = validator(self.schema, values)
+            except (ValueError, TypeError, AssertionError) as exc:
+                raise ValidationErrorV1([ErrorWrapper(exc, loc=ROOT_KEY)], self.schema)
+        return {key: values[key] for key in keys}
+
+    def node(self, func: Callable) -> Callable:
+        """노드 함수를 감싸서 반환한 업데이트 (dict / Command / 그 list) 를 검증한다."""
+        # functools.wraps 로 원래 함수의 signature (config / store 인자) 를 그대로 보이게 한다.
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(state: Any, *args: Any, **kwargs: Any) -> Any:
+                return self._validate_result(await func(state, *args, **kwargs), state)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(state: Any, *args: Any, **kwargs: Any) -> Any:
+            return self._validate_result(func(state, *args, **kwargs), state)
+
+        return wrapper
+
+    def _validate_result(self, result: Any, state: Any) -> Any:
+        state = state if isinstance(state, dict) else {}
+        if isinstance(result, dict):
+            return self.validate(result, state)
+        if isinstance(result, Command) and isinstance(result.update, dict):
+            return dataclasses.replace(result, update=self.validate(result.update, state))
+        if isinstance(result, (list, tuple)):
+            return type(result)(self._validate_result(item, state) for item in result)
+        return result
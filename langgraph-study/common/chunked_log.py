@@ -0,0 +1,243 @@
+# Annotated[list, operator.add] 대신 쓰는 append 전용 log 리듀서
+#
+# operator.add 는 업데이트마다 리스트 전체를 복사해서 k 번 append 되는 채널의 비용이 O(k²) 이 된다.
+# ChunkedLog 는
+#   - 값을 고정 크기 chunk (tuple) 단위로 나눠 들고 있고, 이전 버전의 log 와 chunk 를 공유한다.
+#     (append 는 마지막 미완성 chunk 만 다시 만들기 때문에 O(1))
+#   - 읽기 전용 Sequence 라서 노드에서는 state["foo"][-1], len(...), for ... in ... 처럼 리스트와 같이 읽으면 된다.
+#   - ChunkedLogSerializer 를 checkpointer 의 serde 로 쓰면 checkpoint 마다 새로 생긴 chunk 만 직렬화한다.
+#     (이미 저장한 chunk 는 내용 hash 로만 참조)
+#
+# 사용 예시
+#   class State(TypedDict):
+#       foo: Annotated[list[int], append_log]          # operator.add 대신
+#
+#   graph = builder.compile(checkpointer=MemorySaver(serde=ChunkedLogSerializer()))
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator, List, MutableMapping, Optional, Tuple
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+CHUNK_SIZE = 64
+# 여러 버전이 공유하는 chunk 리스트에 동시에 append 하지 않도록
+_append_lock = threading.Lock()
+
+
+class _Chunk:
+    """가득 찬 (더 이상 바뀌지 않는) chunk. ref 는 ChunkedLogSerializer 가 저장한 뒤의 content hash"""
+
+    __slots__ = ("items", "ref", "__weakref__")
+
+    def __init__(self, items: Tuple[Any, ...], ref: Optional[str] = None):
+        self.items = items
+        self.ref = ref
+
+
+class ChunkedLog(Sequence):
+    """
+    chunk 를 공유하는 불변 append 전용 리스트입니다.
+
+    extend 는 자기 자신을 바꾸지 않고 새 ChunkedLog 를 반환한다. (이전 버전은 그대로 읽을 수 있다)
+    """
+
+    __slots__ = ("_chunks", "_nchunks", "_tail")
+
+    def __init__(self, items: Iterable[Any] = ()):
+        self._chunks: List[_Chunk] = []
+        self._nchunks = 0
+        self._tail: Tuple[Any, ...] = ()
+        if items:
+            self._append_into(self, tuple(items))
+
+    @classmethod
+    def _from_parts(cls, chunks: List[_Chunk], nchunks: int, tail: Tuple[Any, ...]) -> "ChunkedLog":
+        log = cls.__new__(cls)
+        log._chunks = chunks
+        log._nchunks = nchunks
+        log._tail = tail
+        return log
+
+    def extend(self, items: Iterable[Any]) -> "ChunkedLog":
+        items = tuple(items)
+        if not items:
+            return self
+        log = self._from_parts(self._chunks, self._nchunks, self._tail)
+        self._append_into(log, items)
+        return log
+
+    @staticmethod
+    def _append_into(log: "ChunkedLog", items: Tuple[Any, ...]) -> None:
+        tail = log._tail + items
+        if len(tail) < CHUNK_SIZE:
+            log._tail = tail
+            return
+        full = len(tail) - len(tail) % CHUNK_SIZE
+        sealed = [_Chunk(tail[i : i + CHUNK_SIZE]) for i in range(0, full, CHUNK_SIZE)]
+        with _append_lock:
+            chunks = log._chunks
+            if len(chunks) != log._nchunks:
+                # 다른 버전이 이미 이 위치 뒤에 chunk 를 붙였으면 (분기) 공유 구간까지만 복사해서 쓴다.
+                chunks = chunks[: log._nchunks]
+            chunks.extend(sealed)
+            nchunks = len(chunks)
+        log._chunks = chunks
+        log._nchunks = nchunks
+        log._tail = tail[full:]
+
+    # ------------------------------------------------------------------ Sequence
+
+    def __len__(self) -> int:
+        return self._nchunks * CHUNK_SIZE + len(self._tail)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("ChunkedLog index out of range")
+        sealed = self._nchunks * CHUNK_SIZE
+        if index >= sealed:
+            return self._tail[index - sealed]
+        return self._chunks[index // CHUNK_SIZE].items[index % CHUNK_SIZE]
+
+    def __iter__(self) -> Iterator[Any]:
+        for chunk in self._chunks[: self._nchunks]:
+            yield from chunk.items
+        yield from self._tail
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (ChunkedLog, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __add__(self, other: Iterable[Any]) -> "ChunkedLog":
+        return self.extend(other)
+
+    def __repr__(self) -> str:
+        return f"ChunkedLog({list(self)!r})"
+
+    # 기본 JsonPlusSerializer 로도 저장할 수 있게 (이 경우에는 매번 전체를 직렬화한다)
+    def _asdict(self) -> dict:
+        return {"items": list(self)}
+
+    def __reduce__(self):
+        return (ChunkedLog, (list(self),))
+
+
+def append_log(left: Optional[Sequence], right: Optional[Iterable[Any]]) -> ChunkedLog:
+    """operator.add 대신 쓰는 리듀서. 리스트 / ChunkedLog 에 새 항목들을 붙인 ChunkedLog 를 반환한다."""
+    if not isinstance(left, ChunkedLog):
+        left = ChunkedLog(left or ())
+    if right is None:
+        return left
+    return left.extend(right)
+
+
+class ChunkedLogSerializer(SerializerProtocol):
+    """
+    채널 값이 ChunkedLog 이면 아직 저장하지 않은 chunk 만 직렬화하는 serializer 입니다.
+
+    가득 찬 chunk 는 (이전 chunk key, 내용) 의 hash 를 key 로 chunk_store 에 한 번만 저장한다.
+    key 가 이전 chunk 를 가리키는 체인이라서 checkpoint 에는 마지막 chunk key 와
+    아직 가득 차지 않은 tail 만 들어간다. (log 길이와 관계없이 checkpoint 크기가 일정하다)
+
+    Args:
+        serde: ChunkedLog 가 아닌 값과 chunk 내용을 직렬화할 serializer (기본 JsonPlusSerializer)
+        chunk_store: chunk key -> (이전 chunk key, 직렬화된 chunk) 를 저장할 mapping
+            (기본은 메모리 dict, 프로세스를 넘어서 유지하려면 shelve.open(...) 같은 영속 mapping 을 넘긴다)
+        max_recent: chunk 리스트를 기억해둘 최근 log 개수
+    """
+
+    TYPE = "chunked_log"
+
+    def __init__(
+        self,
+        serde: Optional[SerializerProtocol] = None,
+        chunk_store: Optional[MutableMapping[str, Any]] = None,
+        max_recent: int = 128,
+    ):
+        self.serde = serde or JsonPlusSerializer()
+        self.chunk_store = chunk_store if chunk_store is not None else {}
+        # 같은 chunk 를 여러 번 읽어도 하나의 객체를 공유하도록 (다시 저장할 때도 직렬화가 필요 없다)
+        self._loaded: "weakref.WeakValueDictionary[str, _Chunk]" = weakref.WeakValueDictionary()
+        # 최근에 저장 / 복원한 log 의 마지막 chunk key -> (chunk 리스트, chunk 개수)
+        # 다음 checkpoint 를 읽을 때 체인 전체를 다시 따라가지 않고 새 chunk 만 읽는다.
+        self._recent: "OrderedDict[str, Tuple[List[_Chunk], int]]" = OrderedDict()
+        self.max_recent = max_recent
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.serde.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.serde.loads(data)
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        if not isinstance(obj, ChunkedLog):
+            return self.serde.dumps_typed(obj)
+        chunks = obj._chunks[: obj._nchunks]
+        # 뒤에서부터 이미 저장된 chunk 를 찾고, 그 뒤의 chunk 만 직렬화한다.
+        start = len(chunks)
+        while start > 0 and (chunks[start - 1].ref is None or chunks[start - 1].ref not in self.chunk_store):
+            start -= 1
+        prev = chunks[start - 1].ref if start else None
+        for chunk in chunks[start:]:
+            type_, data = self.serde.dumps_typed(list(chunk.items))
+            ref = hashlib.blake2b(f"{prev}\0{type_}\0".encode() + data, digest_size=16).hexdigest()
+            self.chunk_store[ref] = (prev, type_, data)
+            chunk.ref = ref
+            self._loaded[ref] = chunk
+            prev = ref
+        if prev is not None:
+            self._remember(prev, obj._chunks, len(chunks))
+        type_, data = self.serde.dumps_typed(
+            {"chunk_size": CHUNK_SIZE, "head": prev, "nchunks": len(chunks), "tail": list(obj._tail)}
+        )
+        return f"{self.TYPE}:{type_}", data
+
+    def _remember(self, head: str, chunks: List[_Chunk], nchunks: int) -> None:
+        self._recent[head] = (chunks, nchunks)
+        self._recent.move_to_end(head)
+        while len(self._recent) > self.max_recent:
+            self._recent.popitem(last=False)
+
+    def _load_chunks(self, head: Optional[str]) -> Tuple[List[_Chunk], int]:
+        newer = []
+        ref = head
+        base: List[_Chunk] = []
+        base_n = 0
+        while ref is not None:
+            if ref in self._recent:
+                base, base_n = self._recent[ref]
+                break
+            prev, type_, data = self.chunk_store[ref]
+            chunk = self._loaded.get(ref)
+            if chunk is None:
+                chunk = _Chunk(tuple(self.serde.loads_typed((type_, data))), ref)
+                self._loaded[ref] = chunk
+            newer.append(chunk)
+            ref = prev
+        if not newer:
+            return base, base_n
+        newer.reverse()
+        chunks = base[:base_n] + newer
+        self._remember(head, chunks, len(chunks))
+        return chunks, len(chunks)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if not type_.startswith(self.TYPE + ":"):
+            return self.serde.loads_typed(data)
+        value = self.serde.loads_typed((type_[len(self.TYPE) + 1 :], payload))
+        chunks, nchunks = self._load_chunks(value["head"])
+        if value["chunk_size"] != CHUNK_SIZE:
+            # CHUNK_SIZE 가 바뀐 뒤에 예전 checkpoint 를 읽는 경우
+            return ChunkedLog([item for chunk in chunks[:nchunks] for item in chunk.items] + value["tail"])
+        # chunk 리스트는 다른 log 와 공유한다. (뒤에 append 하면 ChunkedLog 가 알아서 분기한다)
+        return ChunkedLog._from_parts(chunks, nchunks, tuple(value["tail"]))
@@ -0,0 +1,137 @@
+# stream_mode="values" 대신 superstep 마다 바뀐 채널만 내보내는 "deltas" stream
+#
+# stream_mode="values" (와 output_keys) 는 step 마다 state 전체를 내보내서,
+# client 로 보낼 때 messages 리스트 전체를 매번 다시 직렬화한다. (history 가 길수록 step 마다 느려지고 커진다)
+#
+# stream_deltas / astream_deltas 는 graph 를 stream_mode="values" 로 돌리면서 (프로세스 안에서는 참조만 넘어온다)
+#   - 이전 step 과 같은 객체인 채널은 빼고 (langgraph 는 바뀌지 않은 채널 값을 그대로 둔다)
+#   - 리스트 채널 (messages 등) 은 앞에서부터 같은 객체인 부분을 건너뛰고 바뀐 뒤쪽만 보낸다.
+#     append 만 했으면 새 메시지만, RemoveMessage / 같은 id 교체가 있으면 처음 바뀐 위치부터 보낸다.
+#   - 나머지 바뀐 채널은 값을 통째로 보낸다.
+# 한 step 의 delta 는 {key: {"set": 값}} / {key: {"splice": [시작 위치, 새 항목들]}} / {key: {"delete": True}} 이고,
+# 바뀐 채널이 없는 step 은 내보내지 않는다.
+# client 는 StateRebuilder 에 delta 를 차례로 넣어서 전체 state 를 다시 만든다.
+#
+# 사용 예시
+#   state = StateRebuilder()
+#   for delta in stream_deltas(graph, {"messages": [input_message]}, config):
+#       send(dumps(delta))                      # 서버 : 바뀐 부분만 직렬화
+#       full = state.apply(delta)               # client : stream_mode="values" 와 같은 state
+from collections.abc import Sequence
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+# 이전 state 에 없던 key
+_MISSING = object()
+
+
+def _is_list(value: Any) -> bool:
+    # MessageLog 같은 읽기 전용 Sequence 도 리스트처럼 뒤쪽만 보낸다.
+    return isinstance(value, list) or (isinstance(value, Sequence) and not isinstance(value, (str, bytes, tuple)))
+
+
+class DeltaEncoder:
+    """stream_mode="values" 의 state 를 차례로 받아 이전 state 와의 차이 (delta) 를 만듭니다."""
+
+    def __init__(self):
+        self.previous: Dict[str, Any] = {}
+
+    def encode(self, values: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        delta: Dict[str, Dict[str, Any]] = {}
+        previous = self.previous
+        for key, value in values.items():
+            old = previous.get(key, _MISSING)
+            if value is old:
+                continue
+            if old is not _MISSING and _is_list(value) and _is_list(old):
+                start = self._common_prefix(old, value)
+                if start == len(old) == len(value):
+                    continue
+                delta[key] = {"splice": [start, list(value[start:])]}
+            else:
+                delta[key] = {"set": value}
+        for key in previous.keys() - values.keys():
+            delta[key] = {"delete": True}
+        self.previous = dict(values)
+        return delta
+
+    @staticmethod
+    def _common_prefix(old: Sequence, new: Sequence) -> int:
+        # 바뀌지 않은 항목은 같은 객체이므로 is 로 비교한다. (직렬화 / __eq__ 없이 포인터 비교만)
+        for i, (a, b) in enumerate(zip(old, new)):
+            if a is not b:
+                return i
+        return min(len(old), len(new))
+
+
+class StateRebuilder:
+    """delta 를 차례로 적용해서 stream_mode="values" 와 같은 전체 state 를 다시 만드는 client 쪽 helper 입니다."""
+
+    def __init__(self, state: Optional[Dict[str, Any]] = None):
+        self.state: Dict[str, Any] = dict(state or {})
+
+    def apply(self, delta: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        for key, change in delta.items():
+            if "set" in change:
+                self.state[key] = change["set"]
+            elif "splice" in change:
+                start, items = change["splice"]
+                # 이전에 돌려준 state 의 리스트는 바꾸지 않는다.
+                self.state[key] = list(self.state.get(key, [])[:start]) + list(items)
+            elif change.get("delete"):
+                self.state.pop(key, None)
+        return dict(self.state)
+
+
+def stream_deltas(
+    graph: Any,
+    input: Any,
+    config: Optional[RunnableConfig] = None,
+    **kwargs: Any,
+) -> Iterator[Any]:
+    """
+    graph.stream(..., stream_mode="values") 대신 superstep 마다 바뀐 채널만 담은 delta 를 yield 합니다.
+
+    Args:
+        graph: compile 한 graph
+        input, config, kwargs: graph.stream 에 넘기는 값 (output_keys 등, stream_mode 는 지정하지 않는다)
+            subgraphs=True 이면 (namespace, delta) 를 yield 한다.
+    """
+    encoders: Dict[Any, DeltaEncoder] = {}
+    for chunk in graph.stream(input, config, stream_mode="values", **kwargs):
+        delta = _encode(encoders, chunk)
+        if delta is not None:
+            yield delta
+
+
+async def astream_deltas(
+    graph: Any,
+    input: Any,
+    config: Optional[RunnableConfig] = None,
+    **kwargs: Any,
+) -> AsyncIterator[Any]:
+    """
+    graph.astream(..., stream_mode="values") 대신 superstep 마다 바뀐 채널만 담은 delta 를 yield 합니다.
+
+    Args: stream_deltas 와 같다.
+    """
+    encoders: Dict[Any, DeltaEncoder] = {}
+    async for chunk in graph.astream(input, config, stream_mode="values", **kwargs):
+        delta = _encode(encoders, chunk)
+        if delta is not None:
+            yield delta
+
+
+def _encode(encoders: Dict[Any, DeltaEncoder], chunk: Any) -> Any:
+    # subgraphs=True 이면 (namespace, values) 로 온다. namespace 별로 이전 state 를 따로 둔다.
+    ns, values = chunk if isinstance(chunk, tuple) and len(chunk) == 2 and isinstance(chunk[0], tuple) else (None, chunk)
+    if not isinstance(values, dict):
+        values = {"__root__": values}
+    encoder = encoders.get(ns)
+    if encoder is None:
+        encoder = encoders[ns] = DeltaEncoder()
+    delta = encoder.encode(values)
+    if not delta:
+        return None
+    return delta if ns is None else (ns, delta)
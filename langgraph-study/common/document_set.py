@@ -0,0 +1,140 @@
+# list(set(left + right)) 대신 쓰는, 순서를 유지하는 중복 제거 리듀서
+#
+# list(set(left + right)) 는
+#   - 검색된 순서를 잃어버리고
+#   - 업데이트마다 누적된 리스트 전체를 다시 hash 하고 (k 번 업데이트하면 O(k²))
+#   - hash 할 수 없는 Document 에는 쓸 수 없다.
+#
+# DocumentSet 은
+#   - 처음 들어온 순서를 유지하는 (key -> 위치) 인덱스를 가지고 있어서 새 batch 만 확인하고 붙인다.
+#   - key 는 Document 면 id, id 가 없으면 page_content + metadata 의 hash, 나머지 (str 등) 는 값 자체다.
+#     hash 할 수 없는 값 (dict, list 등) 은 JSON 으로 직렬화한 내용의 hash 다.
+#   - 이전 버전과 저장소를 공유하는 읽기 전용 Sequence 라서 노드에서는 리스트처럼 읽으면 된다.
+#
+# 사용 예시
+#   class State(TypedDict):
+#       documents: Annotated[List[Document], merge_unique_documents]   # reduce_unique_documents 대신
+import hashlib
+import json
+import threading
+from collections.abc import Sequence
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional
+
+from langchain_core.documents import Document
+
+# 여러 버전이 공유하는 저장소에 동시에 append 하지 않도록
+_append_lock = threading.Lock()
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode()
+
+
+def document_key(item: Any) -> Hashable:
+    """중복 판단에 쓰는 key. Document 는 id, 없으면 내용 hash, hash 할 수 없는 값은 직렬화한 내용의 hash"""
+    if isinstance(item, Document):
+        if item.id:
+            return ("id", item.id)
+        digest = hashlib.blake2b(
+            item.page_content.encode() + b"\0" + _dumps(item.metadata), digest_size=16
+        ).hexdigest()
+        return ("content", digest)
+    try:
+        hash(item)
+    except TypeError:
+        return ("value", hashlib.blake2b(_dumps(item), digest_size=16).hexdigest())
+    return item
+
+
+class DocumentSet(Sequence):
+    """
+    처음 들어온 순서를 유지하는 불변 중복 제거 리스트입니다.
+
+    extend 는 자기 자신을 바꾸지 않고 새 DocumentSet 을 반환한다. (이전 버전은 그대로 읽을 수 있다)
+    """
+
+    __slots__ = ("_items", "_index", "_size")
+
+    def __init__(self, items: Iterable[Any] = ()):
+        self._items: List[Any] = []
+        self._index: Dict[Hashable, int] = {}
+        self._size = 0
+        self._append_into(self, items)
+
+    def extend(self, items: Iterable[Any]) -> "DocumentSet":
+        items = list(items)
+        if not items:
+            return self
+        doc_set = DocumentSet.__new__(DocumentSet)
+        doc_set._items, doc_set._index, doc_set._size = self._items, self._index, self._size
+        self._append_into(doc_set, items)
+        return doc_set
+
+    @staticmethod
+    def _append_into(doc_set: "DocumentSet", items: Iterable[Any]) -> None:
+        with _append_lock:
+            shared, index = doc_set._items, doc_set._index
+            if len(shared) != doc_set._size:
+                # 다른 버전이 이미 이 위치 뒤에 붙였으면 (분기) 공유 구간까지만 복사해서 쓴다.
+                shared = shared[: doc_set._size]
+                index = {key: i for key, i in index.items() if i < doc_set._size}
+            for item in items:
+                key = document_key(item)
+                if key not in index:
+                    index[key] = len(shared)
+                    shared.append(item)
+            doc_set._items, doc_set._index, doc_set._size = shared, index, len(shared)
+
+    # ------------------------------------------------------------------ Sequence
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._items[: self._size][index]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("DocumentSet index out of range")
+        return self._items[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items[: self._size])
+
+    def __contains__(self, item: object) -> bool:
+        position = self._index.get(document_key(item))
+        return position is not None and position < self._size
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (DocumentSet, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __add__(self, other: Iterable[Any]) -> "DocumentSet":
+        return self.extend(other)
+
+    def __repr__(self) -> str:
+        return f"DocumentSet({list(self)!r})"
+
+    # checkpointer (JsonPlusSerializer) 가 저장 / 복원할 수 있게
+    def _asdict(self) -> dict:
+        return {"items": list(self)}
+
+    def __reduce__(self):
+        return (DocumentSet, (list(self),))
+
+
+def merge_unique_documents(left: Optional[Iterable[Any]], right: Optional[Iterable[Any]]) -> DocumentSet:
+    """
+    reduce_unique_documents 대신 쓰는 리듀서. 중복을 제거하면서 처음 들어온 순서를 유지한다.
+
+    이미 있는 문서는 새 batch 에서 한 번씩만 확인하기 때문에 업데이트 비용은 batch 크기에 비례한다.
+    """
+    if not isinstance(left, DocumentSet):
+        left = DocumentSet(left or ())
+    if not right:
+        return left
+    if isinstance(right, (str, Document)):
+        right = [right]
+    return left.extend(right)
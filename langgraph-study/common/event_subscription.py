@@ -0,0 +1,352 @@
+# graph.astream_events(..., version="v2") 대신 쓰는, 필요한 이벤트만 만드는 event stream
+#
+# astream_events 는 모든 chain / prompt / parser / model / tool 의 start / stream / end 이벤트와 token 마다 이벤트를
+# dict 로 만들고 (parent_ids 계산 포함) queue 에 넣은 뒤, include_* 필터는 그 다음에 적용한다.
+# 사용자 코드에서 node 이름으로 거르는 경우에도 이벤트는 이미 다 만들어지고 event loop 를 한 번씩 돈다.
+#
+# subscribe_events 는 구독 조건을 callback handler 안으로 내려서
+#   - run 이 시작될 때 (run 하나당 한 번) 그 run 의 어떤 이벤트를 보낼지 정해두고
+#   - 구독하지 않은 run 의 start / end / token / chunk callback 은 이벤트 dict 와 parent_ids 를 만들기 전에 바로 돌아가고
+#   - 구독한 이벤트 종류가 전혀 없는 callback 묶음 (chain / llm / tool / retriever / custom) 은
+#     handler 의 ignore_* 로 callback manager 가 아예 호출하지 않게 한다.
+#
+# 조건은 종류끼리는 AND, 한 종류 안에서는 OR 이다. (None 이면 거르지 않는다)
+#   nodes  : run 의 metadata["langgraph_node"]
+#   events : 이벤트 이름 ("on_chat_model_stream", "on_chain_end", ...)
+#   names  : run 이름 (custom event 는 event 이름)
+#   tags   : run tag 중 하나
+#
+# 제약
+#   - chain 이벤트를 구독하지 않으면 chain run 을 추적하지 않기 때문에 parent_ids 에 chain run 이 빠진다.
+#   - langchain_core 의 private class _AstreamEventsCallbackHandler 를 상속하고 내부 (_write_run_start_info, is_tapped,
+#     run_map, _get_parent_ids, send_stream, _assign_name) 와 on_*_start / on_*_end 를 덮어쓴다. langchain-core 0.3.63 기준으로 작성했고
+#     requirements.txt 에서 0.3.x 로 묶어 두었다. langchain-core 를 올리면 이 모듈을 먼저 확인해야 한다.
+#
+# 사용 예시
+#   async for event in subscribe_events(graph, inputs, config, nodes=["conversation"], events=["on_chat_model_stream"]):
+#       print(event["data"]["chunk"].content, end="", flush=True)
+import asyncio
+import contextlib
+from typing import Any, AsyncIterator, Dict, FrozenSet, Iterable, Iterator, Optional, Set, TypeVar
+from uuid import UUID, uuid4
+
+from langchain_core.callbacks.base import BaseCallbackManager
+from langchain_core.runnables import Runnable, RunnableConfig, ensure_config
+from langchain_core.runnables.schema import StandardStreamEvent
+from langchain_core.tracers.event_stream import _AstreamEventsCallbackHandler, _assign_name
+from langchain_core.utils.aiter import aclosing, py_anext
+
+T = TypeVar("T")
+
+# 이벤트 이름 앞부분 -> 그 이벤트를 보내는 callback 묶음 (BaseCallbackHandler.ignore_* 이름)
+_FAMILIES = {
+    "on_chain_": "chain",
+    "on_prompt_": "chain",
+    "on_parser_": "chain",
+    "on_chat_model_": "llm",
+    "on_llm_": "llm",
+    "on_tool_": "agent",
+    "on_retriever_": "retriever",
+    "on_custom_event": "custom_event",
+}
+
+
+def _family(event: str) -> Optional[str]:
+    for prefix, family in _FAMILIES.items():
+        if event.startswith(prefix):
+            return family
+    return None
+
+
+class _SubscribedEventsHandler(_AstreamEventsCallbackHandler):
+    """구독 조건에 맞는 run / 이벤트만 만들어서 보내는 astream_events v2 handler"""
+
+    def __init__(
+        self,
+        *,
+        nodes: Optional[Iterable[str]] = None,
+        events: Optional[Iterable[str]] = None,
+        names: Optional[Iterable[str]] = None,
+        tags: Optional[Iterable[str]] = None,
+    ) -> None:
+        super().__init__()
+        self.nodes = frozenset(nodes) if nodes is not None else None
+        self.events = frozenset(events) if events is not None else None
+        self.names = frozenset(names) if names is not None else None
+        self.tags = frozenset(tags) if tags is not None else None
+        families = {_family(event) for event in self.events} if self.events is not None else None
+        # 구독한 이벤트가 하나도 없는 callback 묶음은 callback manager 가 이 handler 를 부르지 않는다.
+        self._ignored = {
+            family: families is not None and family not in families
+            for family in ("chain", "llm", "agent", "retriever", "custom_event")
+        }
+        # run_id (str) -> 이 run 에서 보낼 이벤트 이름
+        self._wanted: Dict[str, FrozenSet[str]] = {}
+        # stream 이벤트 (token / chunk) 를 보낼 run
+        self._streaming: Set[UUID] = set()
+
+    # BaseCallbackHandler 의 ignore_* 는 property 라서 같은 이름의 property 로 덮는다.
+    @property
+    def ignore_chain(self) -> bool:
+        return self._ignored["chain"]
+
+    @property
+    def ignore_llm(self) -> bool:
+        return self._ignored["llm"]
+
+    @property
+    def ignore_chat_model(self) -> bool:
+        # chat model 의 token / end 는 llm callback 으로 오기 때문에 start 도 같이 받거나 같이 무시해야 한다.
+        return self._ignored["llm"]
+
+    @property
+    def ignore_agent(self) -> bool:
+        return self._ignored["agent"]
+
+    @property
+    def ignore_retriever(self) -> bool:
+        return self._ignored["retriever"]
+
+    @property
+    def ignore_custom_event(self) -> bool:
+        return self._ignored["custom_event"]
+
+    def _matches(self, name: str, tags: Optional[Iterable[str]], metadata: Optional[Dict[str, Any]]) -> bool:
+        if self.names is not None and name not in self.names:
+            return False
+        if self.nodes is not None and (metadata or {}).get("langgraph_node") not in self.nodes:
+            return False
+        if self.tags is not None and not any(tag in self.tags for tag in tags or ()):
+            return False
+        return True
+
+    def _write_run_start_info(self, run_id: UUID, *, tags, metadata, parent_run_id, name_, run_type, **kwargs) -> None:
+        super()._write_run_start_info(
+            run_id, tags=tags, metadata=metadata, parent_run_id=parent_run_id, name_=name_, run_type=run_type, **kwargs
+        )
+        if not self._matches(name_, tags, metadata):
+            return
+        wanted = frozenset(f"on_{run_type}_{kind}" for kind in ("start", "stream", "end"))
+        if self.events is not None:
+            wanted &= self.events
+        if wanted:
+            self._wanted[str(run_id)] = wanted
+            if f"on_{run_type}_stream" in wanted:
+                self._streaming.add(run_id)
+
+    # ------------------------------------------------------------------ start / end
+
+    def _skip_start(self, run_id: UUID, *, tags, metadata, parent_run_id, name_, run_type, **kwargs) -> bool:
+        # start 이벤트를 구독하지 않은 run 은 run 정보만 남기고 (parent_ids / end / stream 이벤트용)
+        # 이벤트 dict 와 parent_ids 는 만들지 않는다.
+        if self._matches(name_, tags, metadata) and (self.events is None or f"on_{run_type}_start" in self.events):
+            return False
+        self._write_run_start_info(
+            run_id, tags=tags, metadata=metadata, parent_run_id=parent_run_id, name_=name_, run_type=run_type, **kwargs
+        )
+        return True
+
+    def _skip_end(self, run_id: UUID) -> bool:
+        run_info = self.run_map.get(run_id)
+        wanted = self._wanted.get(str(run_id))
+        if run_info is not None and wanted is not None and f"on_{run_info['run_type']}_end" in wanted:
+            return False
+        self.run_map.pop(run_id, None)
+        self._wanted.pop(str(run_id), None)
+        return True
+
+    async def on_chain_start(self, serialized, inputs, *, run_id: UUID, tags=None, parent_run_id=None, metadata=None,
+                             run_type=None, name=None, **kwargs: Any) -> None:
+        extra = {"inputs": inputs} if inputs != {"input": ""} else {}
+        if self._skip_start(run_id, tags=tags, metadata=metadata, parent_run_id=parent_run_id,
+                            name_=_assign_name(name, serialized), run_type=run_type or "chain", **extra):
+            return
+        await super().on_chain_start(serialized, inputs, run_id=run_id, tags=tags, parent_run_id=parent_run_id,
+                                     metadata=metadata, run_type=run_type, name=name, **kwargs)
+
+    async def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        if self._skip_end(run_id):
+            return
+        await super().on_chain_end(outputs, run_id=run_id, **kwargs)
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id: UUID, tags=None, parent_run_id=None,
+                                  metadata=None, name=None, **kwargs: Any) -> None:
+        if self._skip_start(run_id, tags=tags, metadata=metadata, parent_run_id=parent_run_id,
+                            name_=_assign_name(name, serialized), run_type="chat_model", inputs={"messages": messages}):
+            return
+        await super().on_chat_model_start(serialized, messages, run_id=run_id, tags=tags, parent_run_id=parent_run_id,
+                                          metadata=metadata, name=name, **kwargs)
+
+    async def on_llm_start(self, serialized, prompts, *, run_id: UUID, tags=None, parent_run_id=None,
+                           metadata=None, name=None, **kwargs: Any) -> None:
+        if self._skip_start(run_id, tags=tags, metadata=metadata, parent_run_id=parent_run_id,
+                            name_=_assign_name(name, serialized), run_type="llm", inputs={"prompts": prompts}):
+            return
+        await super().on_llm_start(serialized, prompts, run_id=run_id, tags=tags, parent_run_id=parent_run_id,
+                                   metadata=metadata, name=name, **kwargs)
+
+    async def on_tool_start(self, serialized, input_str, *, run_id: UUID, tags=None, parent_run_id=None,
+                            metadata=None, name=None, inputs=None, **kwargs: Any) -> None:
+        if self._skip_start(run_id, tags=tags, metadata=metadata, parent_run_id=parent_run_id,
+                            name_=_assign_name(name, serialized), run_type="tool", inputs=inputs):
+            return
+        await super().on_tool_start(serialized, input_str, run_id=run_id, tags=tags, parent_run_id=parent_run_id,
+                                    metadata=metadata, name=name, inputs=inputs, **kwargs)
+
+    async def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        if self._skip_end(run_id):
+            return
+        await super().on_tool_end(output, run_id=run_id, **kwargs)
+
+    async def on_retriever_start(self, serialized, query, *, run_id: UUID, parent_run_id=None, tags=None,
+                                 metadata=None, name=None, **kwargs: Any) -> None:
+        if self._skip_start(run_id, tags=tags, metadata=metadata, parent_run_id=parent_run_id,
+                            name_=_assign_name(name, serialized), run_type="retriever", inputs={"query": query}):
+            return
+        await super().on_retriever_start(serialized, query, run_id=run_id, parent_run_id=parent_run_id, tags=tags,
+                                         metadata=metadata, name=name, **kwargs)
+
+    async def on_retriever_end(self, documents: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        if self._skip_end(run_id):
+            return
+        await super().on_retriever_end(documents, run_id=run_id, **kwargs)
+
+    def _send(self, event: StandardStreamEvent, event_type: str) -> None:
+        name = event["event"]
+        if name == "on_custom_event":
+            if (self.events is None or name in self.events) and self._matches(
+                event["name"], event.get("tags"), event.get("metadata")
+            ):
+                self.send_stream.send_nowait(event)
+            return
+        run_id = event["run_id"]
+        wanted = self._wanted.get(run_id)
+        if wanted is not None and name in wanted:
+            self.send_stream.send_nowait(event)
+        if name.endswith("_end"):
+            self._wanted.pop(run_id, None)
+
+    # ------------------------------------------------------------------ hot paths (token / chunk)
+
+    async def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        # 구독하지 않은 run 의 token 은 chunk 변환 / 이벤트 dict / parent_ids 계산 없이 버린다.
+        if run_id not in self._streaming:
+            return
+        await super().on_llm_new_token(token, run_id=run_id, **kwargs)
+
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._streaming.discard(run_id)
+        if self._skip_end(run_id):
+            return
+        await super().on_llm_end(response, run_id=run_id, **kwargs)
+
+    def _stream_event(self, run_id: UUID, tap: Any, sentinel: object) -> Optional[StandardStreamEvent]:
+        # 첫 chunk 가 나온 뒤 (run 이 시작된 뒤) 에 이 run 의 chunk 를 이벤트로 보낼지 정한다.
+        # 구독하지 않은 run 은 이벤트 dict / parent_ids 를 만들지 않고 그대로 흘려보낸다.
+        run_info = self.run_map.get(run_id)
+        if tap is not sentinel or run_info is None or run_id not in self._streaming:
+            return None
+        return {
+            "event": f"on_{run_info['run_type']}_stream",
+            "run_id": str(run_id),
+            "name": run_info["name"],
+            "tags": run_info["tags"],
+            "metadata": run_info["metadata"],
+            "data": {},
+            "parent_ids": self._get_parent_ids(run_id),
+        }
+
+    async def tap_output_aiter(self, run_id: UUID, output: AsyncIterator[T]) -> AsyncIterator[T]:
+        sentinel = object()
+        # 먼저 tap 한 쪽만 stream 이벤트를 보낸다. (token callback 쪽에서 같은 chunk 를 중복으로 보내지 않는다)
+        tap = self.is_tapped.setdefault(run_id, sentinel)
+        first = await py_anext(output, default=sentinel)
+        if first is sentinel:
+            return
+        event = self._stream_event(run_id, tap, sentinel)
+        if event is None:
+            yield first
+            async for chunk in output:
+                yield chunk
+            return
+        self._send({**event, "data": {"chunk": first}}, "")
+        yield first
+        async for chunk in output:
+            self._send({**event, "data": {"chunk": chunk}}, "")
+            yield chunk
+
+    def tap_output_iter(self, run_id: UUID, output: Iterator[T]) -> Iterator[T]:
+        sentinel = object()
+        tap = self.is_tapped.setdefault(run_id, sentinel)
+        first = next(output, sentinel)
+        if first is sentinel:
+            return
+        event = self._stream_event(run_id, tap, sentinel)
+        if event is None:
+            yield first
+            yield from output
+            return
+        self._send({**event, "data": {"chunk": first}}, "")
+        yield first
+        for chunk in output:
+            self._send({**event, "data": {"chunk": chunk}}, "")
+            yield chunk
+
+
+async def subscribe_events(
+    runnable: Runnable,
+    input: Any,
+    config: Optional[RunnableConfig] = None,
+    *,
+    nodes: Optional[Iterable[str]] = None,
+    events: Optional[Iterable[str]] = None,
+    names: Optional[Iterable[str]] = None,
+    tags: Optional[Iterable[str]] = None,
+    **kwargs: Any,
+) -> AsyncIterator[StandardStreamEvent]:
+    """
+    astream_events(version="v2") 와 같은 형식의 이벤트 중 구독 조건에 맞는 것만 만들어서 yield 합니다.
+
+    Args:
+        runnable: compile 한 graph (또는 Runnable)
+        input, config, kwargs: astream_events 와 같다.
+        nodes, events, names, tags: 구독 조건 (None 이면 거르지 않는다)
+    """
+    handler = _SubscribedEventsHandler(nodes=nodes, events=events, names=names, tags=tags)
+    config = ensure_config(config)
+    run_id = config.setdefault("run_id", uuid4())
+    callbacks = config.get("callbacks")
+    if callbacks is None:
+        config["callbacks"] = [handler]
+    elif isinstance(callbacks, list):
+        config["callbacks"] = [*callbacks, handler]
+    elif isinstance(callbacks, BaseCallbackManager):
+        callbacks = callbacks.copy()
+        callbacks.add_handler(handler, inherit=True)
+        config["callbacks"] = callbacks
+    else:
+        raise ValueError(f"Unexpected type for callbacks: {callbacks}.")
+
+    async def consume() -> None:
+        try:
+            async with aclosing(runnable.astream(input, config, **kwargs)) as stream:
+                async for _ in handler.tap_output_aiter(run_id, stream):
+                    pass
+        finally:
+            await handler.send_stream.aclose()
+
+    task = asyncio.create_task(consume())
+    root = str(run_id)
+    try:
+        async for event in handler:
+            # astream_events 와 같이 root run 의 start 이벤트에는 원래 입력을, end 이벤트에는 입력을 빼고 보낸다.
+            if event["run_id"] == root:
+                if event["event"].endswith("_start"):
+                    event["data"]["input"] = input
+                elif event["event"].endswith("_end"):
+                    event["data"].pop("input", None)
+            yield event
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
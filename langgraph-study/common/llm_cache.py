@@ -0,0 +1,256 @@
+# 모든 노드의 ChatOpenAI / AzureChatOpenAI / OpenAI 호출이 같이 쓰는 exact-match 응답 캐시 (메모리 LRU + SQLite)
+#
+# 예제들은 같은 질문 / replay / 평가를 돌릴 때마다 LLM 을 다시 호출한다.
+# TieredLLMCache 는 langchain 의 BaseCache 로 set_llm_cache 에 등록하면 모든 모델 호출에 적용되고
+#   - key 는 (모델 / 파라미터 / bind_tools 로 붙인 tools / structured output 설정) + 정규화한 메시지 리스트
+#     (메시지 id, response_metadata, usage_metadata 는 모델 입력이 아니므로 빼고 비교한다.
+#      add_messages 가 매번 새 id 를 붙여도 같은 대화면 같은 key)
+#   - 1단계 : 메모리 LRU (max_entries 개), 2단계 : SQLite 파일 (max_bytes 를 넘으면 오래 안 쓴 응답부터 지운다)
+#   - 노드 metadata 에 {"llm_cache": False} 를 주거나 bypass_nodes 에 넣은 노드는 캐시를 읽지도 쓰지도 않는다.
+#     (모델 하나만 빼려면 ChatOpenAI(cache=False))
+#   - 노드별 (metadata 의 langgraph_node) hit / miss 수를 stats() 로 볼 수 있다.
+#   - 저장할 때 응답 메시지 id 를 지운다. (hit 마다 같은 id 의 메시지가 나와서 add_messages 가 이전 메시지를 덮어쓰지 않도록)
+#
+# 사용 예시
+#   set_llm_cache(TieredLLMCache("llm_cache.db"))
+#   builder.add_node("grade", grade_documents, metadata={"llm_cache": False})     # 캐시를 쓰면 안 되는 노드
+#   get_llm_cache().stats()
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import warnings
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, Optional
+
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumpd, load
+from langchain_core.outputs import ChatGeneration, Generation
+from langchain_core.runnables.config import var_child_runnable_config
+
+# 노드 metadata 에서 캐시 사용 여부를 읽는 key
+BYPASS_KEY = "llm_cache"
+
+# 비교에서 뺄 메시지 필드 (모델에 보내지 않는 값)
+_IGNORED_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+# 디스크 용량을 넘었을 때 한 번에 읽어서 지울 오래된 응답 수
+_EVICT_BATCH = 64
+# 메모리 hit 의 사용 시각을 모았다가 디스크에 한 번에 반영하는 개수
+_TOUCH_BATCH = 256
+
+
+def _normalize(prompt: str) -> str:
+    """chat model 의 prompt (dumps(messages)) 에서 모델 입력이 아닌 필드를 뺀다. (completion 모델의 문자열 prompt 는 그대로)"""
+    if not prompt.startswith("["):
+        return prompt
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    for message in messages:
+        kwargs = message.get("kwargs") if isinstance(message, dict) else None
+        if isinstance(kwargs, dict):
+            for field in _IGNORED_FIELDS:
+                kwargs.pop(field, None)
+    return json.dumps(messages, sort_keys=True, ensure_ascii=False)
+
+
+def _serialize(return_val: RETURN_VAL_TYPE) -> str:
+    # langchain_core 의 dumps 는 Generation.text 를 빠뜨리므로 (completion 모델) 메시지만 dumpd 로 직렬화한다.
+    # chat 응답 메시지의 id 는 지운다.
+    generations = []
+    for generation in return_val:
+        if isinstance(generation, ChatGeneration):
+            message = generation.message.model_copy(update={"id": None})
+            generations.append({"message": dumpd(message), "generation_info": generation.generation_info})
+        else:
+            generations.append({"text": generation.text, "generation_info": generation.generation_info})
+    return json.dumps(generations, ensure_ascii=False)
+
+
+def _deserialize(value: str) -> RETURN_VAL_TYPE:
+    with warnings.catch_warnings():
+        # 캐시 hit 마다 load 를 부르므로 beta 경고는 띄우지 않는다.
+        warnings.filterwarnings("ignore", message="The function `load` is in beta", category=LangChainBetaWarning)
+        return [
+            ChatGeneration(message=load(generation["message"]), generation_info=generation["generation_info"])
+            if "message" in generation
+            else Generation(text=generation["text"], generation_info=generation["generation_info"])
+            for generation in json.loads(value)
+        ]
+
+
+class TieredLLMCache(BaseCache):
+    """
+    메모리 LRU + SQLite 두 단계로 된 LLM 응답 캐시입니다.
+
+    Args:
+        path: SQLite 파일 경로
+        max_entries: 메모리에 들고 있을 응답 수
+        max_bytes: SQLite 에 저장할 응답 크기 합의 상한 (넘으면 오래 안 쓴 응답부터 지운다, None 이면 제한 없음)
+        bypass_nodes: 캐시를 쓰지 않을 노드 이름
+    """
+
+    def __init__(
+        self,
+        path: str = "llm_cache.db",
+        *,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+        bypass_nodes: Iterable[str] = (),
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bypass_nodes = frozenset(bypass_nodes)
+        self._lock = threading.RLock()
+        # key -> 직렬화된 응답 (hit 마다 새 객체로 복원해서 호출한 쪽이 바꿔도 캐시는 그대로)
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        # 메모리 hit 의 key -> 사용 시각 (아직 디스크의 accessed 에 반영하지 않은 것)
+        self._touched: Dict[str, float] = {}
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0}
+        )
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed)")
+        self._conn.commit()
+        self._disk_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+    # ------------------------------------------------------------------ BaseCache
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        node, bypass = self._current_node()
+        if bypass:
+            with self._lock:
+                self._counters[node]["bypassed"] += 1
+            return None
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            # 노드별 counter 는 stats() 가 lock 안에서 복사하므로 만들고 늘리는 것도 lock 안에서 한다.
+            counters = self._counters[node]
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                counters["memory_hits"] += 1
+                # 메모리에서 자주 쓰는 응답이 디스크에서 먼저 지워지지 않도록 사용 시각을 모아서 반영한다.
+                self._touched[key] = time.time()
+                if len(self._touched) >= _TOUCH_BATCH:
+                    self._flush_touched()
+                    self._conn.commit()
+                return _deserialize(value)
+            row = self._conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                counters["misses"] += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self._remember(key, row[0])
+            counters["disk_hits"] += 1
+            return _deserialize(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if self._current_node()[1]:
+            return
+        key = self._key(prompt, llm_string)
+        value = _serialize(return_val)
+        size = len(value.encode())
+        with self._lock:
+            self._remember(key, value)
+            previous = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            self._disk_bytes += size - (previous[0] if previous else 0)
+            self._touched.pop(key, None)
+            self._evict()
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self._disk_bytes = 0
+
+    # ------------------------------------------------------------------ internals
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        # llm_string 에는 모델 파라미터와 호출 kwargs (tools, response_format, stop ...) 가 들어 있다.
+        return hashlib.sha256(f"{llm_string}\0{_normalize(prompt)}".encode()).hexdigest()
+
+    def _current_node(self):
+        # 노드 안에서 호출되면 langgraph 가 넣어준 config (metadata 에 langgraph_node) 가 context 에 있다.
+        config = var_child_runnable_config.get() or {}
+        metadata = config.get("metadata") or {}
+        node = metadata.get("langgraph_node", "")
+        return node, metadata.get(BYPASS_KEY) is False or node in self.bypass_nodes
+
+    def _remember(self, key: str, value: str) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _flush_touched(self) -> None:
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE llm_cache SET accessed = ? WHERE key = ?", [(at, key) for key, at in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self) -> None:
+        if self.max_bytes is None or self._disk_bytes <= self.max_bytes:
+            return
+        # 지울 순서를 정하기 전에 메모리 hit 의 사용 시각을 먼저 반영한다.
+        self._flush_touched()
+        # 테이블 전체를 읽지 않고 accessed index 로 오래된 응답을 _EVICT_BATCH 개씩만 읽어서 지운다.
+        while self._disk_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM llm_cache ORDER BY accessed LIMIT ?", (_EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            evicted = []
+            for key, size in rows:
+                if self._disk_bytes <= self.max_bytes:
+                    break
+                evicted.append((key,))
+                self._memory.pop(key, None)
+                self._disk_bytes -= size
+            self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", evicted)
+
+    # ------------------------------------------------------------------ misc
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": entries,
+                "disk_bytes": self._disk_bytes,
+                "nodes": {node: dict(counters) for node, counters in self._counters.items()},
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
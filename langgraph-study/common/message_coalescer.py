@@ -0,0 +1,316 @@
+# stream_mode="messages" 를 token chunk 단위가 아니라 묶음 단위로 내보내는 stream
+#
+# graph.stream(..., stream_mode="messages") 는 LLM token chunk 하나마다 item 을 하나씩 내보내고,
+# 소비하는 쪽은 보통 chunk 마다 print / socket write 를 한 번씩 한다. (token 수 만큼 write / syscall)
+# 또 langgraph 내부 queue 는 크기 제한이 없어서 소비하는 쪽이 느리면 chunk 가 끝없이 쌓인다.
+#
+# stream_coalesced / astream_coalesced 는
+#   - 노드 (task) 별로 AIMessageChunk 를 모아서, max_delay 초가 지나거나 max_bytes 가 차면 하나로 합쳐 내보내고
+#     (metadata 는 그대로, 다른 메시지 id / chunk 가 아닌 메시지가 오면 그 전에 내보낸다)
+#   - 아직 가져가지 않은 chunk 가 max_pending 개가 되면 LLM 쪽 token callback 을 기다리게 한다. (backpressure)
+#     thread 에서 도는 모델은 token callback 이 block 되고, event loop 의 async 모델은 token 사이에서 await 한다.
+#
+# 반환 형식은 stream_mode="messages" 와 같은 (message, metadata) 이다. (kwargs 는 graph.stream 에 그대로 넘긴다)
+#
+# 사용 예시
+#   for chunk_msg, metadata in stream_coalesced(graph, {"messages": ["..."]}, config, max_delay=0.05):
+#       print(chunk_msg.content, end="", flush=True)
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import AIMessageChunk, BaseMessage
+from langchain_core.messages.ai import add_ai_message_chunks
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import merge_configs
+from langgraph.pregel.messages import StreamMessagesHandler
+
+# graph 실행이 끝났다는 표시 (sink 에 마지막으로 넣는다)
+_DONE = object()
+
+
+class StreamClosed(Exception):
+    """소비하는 쪽이 stream 을 닫아서 더 이상 chunk 를 받지 않을 때 token callback 에서 발생합니다."""
+
+
+class _Sink:
+    """message handler 가 넣고 소비하는 쪽이 통째로 가져가는 크기 제한 buffer (thread / event loop 공용)"""
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self.items: deque = deque()
+        self.cond = threading.Condition()
+        self.closed = False
+        self.error: Optional[BaseException] = None
+        # astream_coalesced 에서만 쓴다.
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread: Optional[int] = None
+        self.ready: Optional[asyncio.Event] = None
+        self.space: Optional[asyncio.Event] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.loop_thread = threading.get_ident()
+        self.ready = asyncio.Event()
+        self.space = asyncio.Event()
+
+    def on_loop(self) -> bool:
+        return self.loop_thread == threading.get_ident()
+
+    def put(self, item: Any) -> None:
+        on_loop = self.on_loop()
+        with self.cond:
+            # event loop 위에서는 block 할 수 없으니 넣기만 한다. (_LoopBackpressure 가 token 사이에서 기다린다)
+            if not on_loop:
+                while len(self.items) >= self.max_pending and not self.closed:
+                    self.cond.wait()
+            if self.closed:
+                raise StreamClosed()
+            self.items.append(item)
+            self.cond.notify_all()
+        if self.loop is not None:
+            if on_loop:
+                self.ready.set()
+            else:
+                self.loop.call_soon_threadsafe(self.ready.set)
+
+    def take(self) -> List[Any]:
+        with self.cond:
+            items = list(self.items)
+            self.items.clear()
+            self.cond.notify_all()
+        if self.space is not None:
+            self.space.set()
+        return items
+
+    def wait(self, timeout: Optional[float]) -> None:
+        with self.cond:
+            if not self.items:
+                self.cond.wait(timeout)
+
+    async def await_items(self, timeout: Optional[float]) -> None:
+        self.ready.clear()
+        if self.items:
+            return
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def wait_for_space(self) -> None:
+        while len(self.items) >= self.max_pending and not self.closed:
+            self.space.clear()
+            await self.space.wait()
+
+    def close(self) -> None:
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        if self.space is not None:
+            self.space.set()
+
+
+class _CoalescingMessagesHandler(StreamMessagesHandler):
+    """stream_mode="messages" 와 같은 규칙으로 메시지를 모아 sink 에 넣는 handler"""
+
+    # 소비하는 쪽이 닫히면 StreamClosed 를 모델 호출까지 올려서 graph 실행을 멈춘다.
+    raise_error = True
+
+    def __init__(self, sink: _Sink):
+        super().__init__(sink.put)
+
+
+class _LoopBackpressure(AsyncCallbackHandler):
+    """event loop 에서 도는 모델의 token 사이에서 sink 에 자리가 날 때까지 기다리는 handler"""
+
+    raise_error = True
+
+    def __init__(self, sink: _Sink):
+        self.sink = sink
+
+    @property
+    def ignore_llm(self) -> bool:
+        # thread 에서 도는 (sync) 모델은 sink.put 에서 block 하므로 여기서는 건너뛴다. (token 마다 event loop 를 새로 만들지 않도록)
+        return not self.sink.on_loop()
+
+    # token 말고 다른 callback 은 받을 필요가 없다.
+    ignore_chat_model = True
+    ignore_chain = True
+    ignore_agent = True
+    ignore_retriever = True
+    ignore_retry = True
+    ignore_custom_event = True
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        await self.sink.wait_for_space()
+        if self.sink.closed:
+            raise StreamClosed()
+
+
+class _Coalescer:
+    """노드 (task) 별로 AIMessageChunk 를 모아 두었다가 시간 / 크기 기준으로 합쳐서 내보냅니다."""
+
+    def __init__(self, max_delay: float, max_bytes: int):
+        self.max_delay = max_delay
+        self.max_bytes = max_bytes
+        # checkpoint ns -> [chunks, metadata, 모은 byte 수, 내보낼 시각]
+        self.batches: Dict[Tuple[str, ...], list] = {}
+
+    def add(self, item: Any, now: float, out: List[Tuple[BaseMessage, Dict[str, Any]]]) -> None:
+        ns, _, (message, metadata) = item
+        batch = self.batches.get(ns)
+        if not isinstance(message, AIMessageChunk):
+            if batch is not None:
+                out.append(self._pop(ns))
+            out.append((message, metadata))
+            return
+        if batch is not None and batch[0][0].id != message.id:
+            out.append(self._pop(ns))
+            batch = None
+        if batch is None:
+            batch = self.batches[ns] = [[], metadata, 0, now + self.max_delay]
+        batch[0].append(message)
+        content = message.content
+        batch[2] += len(content.encode()) if isinstance(content, str) else len(str(content))
+        if batch[2] >= self.max_bytes:
+            out.append(self._pop(ns))
+
+    def expire(self, now: float, out: List[Tuple[BaseMessage, Dict[str, Any]]]) -> None:
+        for ns in [ns for ns, batch in self.batches.items() if batch[3] <= now]:
+            out.append(self._pop(ns))
+
+    def flush(self, out: List[Tuple[BaseMessage, Dict[str, Any]]]) -> None:
+        for ns in list(self.batches):
+            out.append(self._pop(ns))
+
+    def deadline(self) -> Optional[float]:
+        return min((batch[3] for batch in self.batches.values()), default=None)
+
+    def _pop(self, ns: Tuple[str, ...]) -> Tuple[BaseMessage, Dict[str, Any]]:
+        chunks, metadata, _, _ = self.batches.pop(ns)
+        message = chunks[0] if len(chunks) == 1 else add_ai_message_chunks(chunks[0], *chunks[1:])
+        return message, metadata
+
+    def drain(self, items: List[Any], now: float) -> Tuple[List[Tuple[BaseMessage, Dict[str, Any]]], bool]:
+        out: List[Tuple[BaseMessage, Dict[str, Any]]] = []
+        done = False
+        for item in items:
+            if item is _DONE:
+                done = True
+            else:
+                self.add(item, now, out)
+        if done:
+            self.flush(out)
+        else:
+            self.expire(now, out)
+        return out, done
+
+
+def stream_coalesced(
+    graph: Any,
+    input: Any,
+    config: Optional[RunnableConfig] = None,
+    *,
+    max_delay: float = 0.05,
+    max_bytes: int = 1024,
+    max_pending: int = 256,
+    **kwargs: Any,
+) -> Iterator[Tuple[BaseMessage, Dict[str, Any]]]:
+    """
+    graph.stream(..., stream_mode="messages") 와 같은 (message, metadata) 를 노드별로 묶어서 yield 합니다.
+
+    Args:
+        graph: compile 한 graph
+        input, config, kwargs: graph.stream 에 넘기는 값 (stream_mode 는 지정하지 않는다)
+        max_delay: 첫 chunk 가 들어온 뒤 묶음을 내보내기까지 기다리는 최대 시간 (초)
+        max_bytes: 묶음 하나의 최대 content 크기 (byte)
+        max_pending: 가져가지 않은 chunk 가 이 수만큼 쌓이면 token callback 을 기다리게 한다.
+    """
+    sink = _Sink(max_pending)
+    config = merge_configs(config, {"callbacks": [_CoalescingMessagesHandler(sink)]})
+
+    # graph 는 background thread 에서 돌리고 (state 업데이트 stream 은 버린다) 메시지는 sink 로만 받는다.
+    def drive() -> None:
+        try:
+            for _ in graph.stream(input, config, stream_mode="updates", **kwargs):
+                if sink.closed:
+                    break
+        except BaseException as e:
+            sink.error = e
+        try:
+            sink.put(_DONE)
+        except StreamClosed:
+            pass
+
+    threading.Thread(target=drive, name="stream-coalesced", daemon=True).start()
+    coalescer = _Coalescer(max_delay, max_bytes)
+    try:
+        while True:
+            items = sink.take()
+            out, done = coalescer.drain(items, time.monotonic())
+            yield from out
+            if done:
+                if sink.error is not None:
+                    raise sink.error
+                return
+            if not items:
+                deadline = coalescer.deadline()
+                sink.wait(None if deadline is None else max(deadline - time.monotonic(), 0))
+    finally:
+        sink.close()
+
+
+async def astream_coalesced(
+    graph: Any,
+    input: Any,
+    config: Optional[RunnableConfig] = None,
+    *,
+    max_delay: float = 0.05,
+    max_bytes: int = 1024,
+    max_pending: int = 256,
+    **kwargs: Any,
+) -> AsyncIterator[Tuple[BaseMessage, Dict[str, Any]]]:
+    """
+    graph.astream(..., stream_mode="messages") 와 같은 (message, metadata) 를 노드별로 묶어서 yield 합니다.
+
+    Args: stream_coalesced 와 같다.
+    """
+    sink = _Sink(max_pending)
+    sink.bind(asyncio.get_running_loop())
+    config = merge_configs(
+        config, {"callbacks": [_CoalescingMessagesHandler(sink), _LoopBackpressure(sink)]}
+    )
+
+    async def drive() -> None:
+        try:
+            async for _ in graph.astream(input, config, stream_mode="updates", **kwargs):
+                pass
+        except Exception as e:
+            sink.error = e
+        sink.put(_DONE)
+
+    task = asyncio.create_task(drive())
+    coalescer = _Coalescer(max_delay, max_bytes)
+    try:
+        while True:
+            items = sink.take()
+            out, done = coalescer.drain(items, time.monotonic())
+            for message in out:
+                yield message
+            if done:
+                if sink.error is not None:
+                    raise sink.error
+                return
+            if not items:
+                deadline = coalescer.deadline()
+                await sink.await_items(None if deadline is None else max(deadline - time.monotonic(), 0))
+    finally:
+        sink.close()
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, StreamClosed):
+            pass
@@ -0,0 +1,303 @@
+# add_messages 대신 쓰는, id 로 인덱싱된 메시지 log 리듀서
+#
+# add_messages 는 업데이트가 올 때마다
+#   - 기존 메시지 전체를 다시 변환 (convert_to_messages / message_chunk_to_message) 하고
+#   - id -> 위치 dict 를 새로 만들고, 리스트를 복사하고, RemoveMessage 가 있으면 리스트를 한 번 더 만든다.
+# 그래서 history 가 길면 업데이트 한 번이 O(history) 가 된다.
+#
+# MessageLog 는
+#   - slot 리스트 + id -> slot dict 를 유지해서 append / 교체 / 삭제가 각각 O(1) 이다.
+#   - 삭제는 slot 을 비워두는 tombstone 으로 처리하고, tombstone 이 살아있는 메시지보다 많아지면 한 번에 압축한다.
+#   - 리듀서는 이전 값을 바꾸지 않는다. 새 버전이 저장소를 넘겨받고 이전 버전에는 되돌리기 기록만 남겨서,
+#     이전 버전을 나중에 읽으면 (예: stream 으로 받아둔 값) 그때 원래 내용으로 복원한다.
+#   - 노드에서는 읽기 전용 Sequence 로 state["messages"][-1], [:-2], len(...), for ... in ... 처럼 읽으면 된다.
+#
+# 사용 예시
+#   class State(MessagesState):
+#       messages: Annotated[list[AnyMessage], add_messages_indexed]   # add_messages 대신
+import bisect
+import threading
+import uuid
+import weakref
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from typing_extensions import Annotated, TypedDict
+from langchain_core.messages import (
+    AnyMessage,
+    BaseMessage,
+    BaseMessageChunk,
+    RemoveMessage,
+    convert_to_messages,
+    message_chunk_to_message,
+)
+
+# tombstone 이 이 개수 이상이고 살아있는 메시지보다 많으면 압축한다.
+COMPACT_MIN_TOMBSTONES = 32
+
+_lock = threading.RLock()
+
+
+class _Store:
+    __slots__ = ("slots", "index", "live", "tombs")
+
+    def __init__(self, slots: List[Optional[BaseMessage]], index: Dict[str, int], live: int, tombs: List[int]):
+        self.slots = slots
+        self.index = index
+        self.live = live
+        # tombstone slot 위치 (정렬). 압축하지 않고도 n 번째 메시지를 O(log t) 로 찾기 위해 유지한다.
+        self.tombs = tombs
+
+    def copy(self) -> "_Store":
+        return _Store(self.slots.copy(), self.index.copy(), self.live, self.tombs.copy())
+
+    def append(self, message: BaseMessage) -> None:
+        self.index[message.id] = len(self.slots)
+        self.slots.append(message)
+        self.live += 1
+
+    def pop(self) -> None:
+        message = self.slots.pop()
+        if message is None:
+            self.tombs.pop()
+        else:
+            self.live -= 1
+            del self.index[message.id]
+
+    def set(self, slot: int, message: Optional[BaseMessage]) -> None:
+        current = self.slots[slot]
+        if current is not None and message is None:
+            self.live -= 1
+            del self.index[current.id]
+            bisect.insort(self.tombs, slot)
+        elif current is None and message is not None:
+            self.live += 1
+            self.index[message.id] = slot
+            del self.tombs[bisect.bisect_left(self.tombs, slot)]
+        self.slots[slot] = message
+
+    def slot_of(self, position: int) -> int:
+        """살아있는 메시지 중 position 번째의 slot 위치"""
+        if position < 0:
+            position += self.live
+        if not 0 <= position < self.live:
+            raise IndexError("MessageLog index out of range")
+        # tombs[k] - k 는 k 번째 tombstone 앞에 있는 살아있는 메시지 수 (k 에 대해 단조 증가)
+        lo, hi = 0, len(self.tombs)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.tombs[mid] - mid <= position:
+                lo = mid + 1
+            else:
+                hi = mid
+        return position + lo
+
+    def compacted(self) -> "_Store":
+        slots = [m for m in self.slots if m is not None]
+        return _Store(slots, {m.id: i for i, m in enumerate(slots)}, len(slots), [])
+
+
+class MessageLog(Sequence):
+    """
+    id -> slot 인덱스를 가진 불변 메시지 리스트입니다.
+
+    가장 최신 버전이 저장소를 직접 들고 있고, 이전 버전은 (다음 버전, 되돌리기 기록) 만 들고 있다.
+    """
+
+    __slots__ = ("_store", "_next", "_undo", "_prev", "__weakref__")
+
+    def __init__(self, messages: Any = ()):
+        messages = _coerce(messages)
+        _assign_ids(messages)
+        store = _Store([], {}, 0, [])
+        for message in messages:
+            if message.id in store.index:
+                store.slots[store.index[message.id]] = message
+            else:
+                store.append(message)
+        self._store: Optional[_Store] = store
+        self._next: Optional[MessageLog] = None
+        self._undo: Optional[List[Tuple]] = None
+        self._prev: Optional[weakref.ref] = None
+
+    # ------------------------------------------------------------------ versions
+
+    def _own(self) -> _Store:
+        """이 버전의 저장소를 반환한다. 이미 다음 버전으로 넘어간 버전이면 최신 버전에서 복원한다."""
+        with _lock:
+            if self._next is None:
+                return self._store
+            chain = []
+            node = self
+            while node._next is not None:
+                chain.append(node)
+                node = node._next
+            store = node._store.copy()
+            for version in reversed(chain):
+                for op in reversed(version._undo):
+                    if op[0] == "pop":
+                        store.pop()
+                    elif op[0] == "set":
+                        store.set(op[1], op[2])
+                    elif op[0] == "unset":
+                        for slot, message in zip(op[1], op[2]):
+                            store.set(slot, message)
+                    else:  # "restore": 압축 전 저장소
+                        store = op[1].copy()
+            self._store, self._next, self._undo = store, None, None
+            return store
+
+    def _derive(self) -> "MessageLog":
+        """저장소를 넘겨받는 다음 버전을 만든다."""
+        store = self._own()
+        log = MessageLog.__new__(MessageLog)
+        log._store, log._next, log._undo = store, None, None
+        log._prev = weakref.ref(self)
+        self._store, self._next, self._undo = None, log, []
+        return log
+
+    def _compact(self) -> _Store:
+        """tombstone 을 없앤다. 이전 버전이 살아있으면 압축 전 저장소를 되돌리기 기록에 남긴다."""
+        store = self._store
+        prev = self._prev() if self._prev is not None else None
+        if prev is not None and prev._next is self:
+            prev._undo.append(("restore", store))
+        self._store = store.compacted()
+        return self._store
+
+    # ------------------------------------------------------------------ update
+
+    def _apply(self, updates: List[BaseMessage]) -> None:
+        """add_messages 와 같은 규칙으로 updates 를 반영한다. (_derive 로 만든 최신 버전에서만 호출)"""
+        store = self._store
+        prev = self._prev()
+        undo = prev._undo if prev is not None else None
+        pending_removes: Dict[str, int] = {}
+        for message in updates:
+            slot = store.index.get(message.id)
+            if isinstance(message, RemoveMessage):
+                if slot is None:
+                    raise ValueError(f"Attempting to delete a message with an ID that doesn't exist ('{message.id}')")
+                pending_removes[message.id] = slot
+            elif slot is not None:
+                pending_removes.pop(message.id, None)
+                if undo is not None:
+                    undo.append(("set", slot, store.slots[slot]))
+                store.slots[slot] = message
+            else:
+                if undo is not None:
+                    undo.append(("pop",))
+                store.append(message)
+        if len(pending_removes) < 16:
+            for slot in pending_removes.values():
+                if undo is not None:
+                    undo.append(("set", slot, store.slots[slot]))
+                store.set(slot, None)
+        elif pending_removes:
+            # 한 번에 많이 지우면 tombstone 을 하나씩 정렬 삽입하지 않고 모아서 합치고,
+            # 되돌리기 기록도 메시지마다 남기지 않고 한 번에 남긴다.
+            slots = list(pending_removes.values())
+            if undo is not None:
+                undo.append(("unset", slots, [store.slots[slot] for slot in slots]))
+            for message_id, slot in pending_removes.items():
+                store.slots[slot] = None
+                del store.index[message_id]
+            store.live -= len(slots)
+            store.tombs = sorted(store.tombs + slots)
+        tombstones = len(store.slots) - store.live
+        if tombstones >= COMPACT_MIN_TOMBSTONES and tombstones > store.live:
+            self._compact()
+
+    # ------------------------------------------------------------------ Sequence
+
+    def __len__(self) -> int:
+        return self._own().live
+
+    def __getitem__(self, index):
+        store = self._own()
+        if not store.tombs:
+            return store.slots[index]
+        if isinstance(index, slice):
+            # slice 는 어차피 O(n) 이라 이때 압축해둔다.
+            with _lock:
+                return self._compact().slots[index]
+        return store.slots[store.slot_of(index)]
+
+    def __iter__(self) -> Iterator[BaseMessage]:
+        for message in list(self._own().slots):
+            if message is not None:
+                yield message
+
+    def __contains__(self, message: object) -> bool:
+        store = self._own()
+        slot = store.index.get(getattr(message, "id", None))
+        return slot is not None and store.slots[slot] == message
+
+    def get(self, message_id: str) -> Optional[BaseMessage]:
+        """id 로 메시지를 O(1) 로 찾는다."""
+        store = self._own()
+        slot = store.index.get(message_id)
+        return store.slots[slot] if slot is not None else None
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (MessageLog, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __add__(self, other: Any) -> List[BaseMessage]:
+        return list(self) + list(other)
+
+    def __radd__(self, other: Any) -> List[BaseMessage]:
+        # [sys_msg] + state["messages"] 처럼 쓰는 코드를 위해 리스트를 반환한다.
+        return list(other) + list(self)
+
+    def __repr__(self) -> str:
+        return f"MessageLog({list(self)!r})"
+
+    # checkpointer (JsonPlusSerializer) 가 저장 / 복원할 수 있게
+    def _asdict(self) -> dict:
+        return {"messages": list(self)}
+
+    def __reduce__(self):
+        return (MessageLog, (list(self),))
+
+
+def _coerce(messages: Any) -> List[BaseMessage]:
+    if isinstance(messages, MessageLog):
+        return list(messages)
+    if not isinstance(messages, (list, tuple)):
+        messages = [messages]
+    # 대부분은 이미 메시지 객체라서 변환이 필요한 항목 (tuple / dict / str / chunk) 만 변환한다.
+    return [
+        m if isinstance(m, BaseMessage) and not isinstance(m, BaseMessageChunk)
+        else message_chunk_to_message(convert_to_messages([m])[0])
+        for m in messages
+    ]
+
+
+def _assign_ids(messages: List[BaseMessage]) -> None:
+    for message in messages:
+        if message.id is None:
+            message.id = str(uuid.uuid4())
+
+
+def add_messages_indexed(left: Any, right: Any) -> MessageLog:
+    """
+    add_messages 와 같은 규칙 (id 가 같으면 교체, RemoveMessage 는 삭제, 나머지는 append) 의 리듀서.
+
+    이전 값 (left) 은 바꾸지 않고, 새 메시지 수에 비례하는 시간만 쓴다.
+    """
+    if not isinstance(left, MessageLog):
+        left = MessageLog(left or ())
+    updates = _coerce(right)
+    _assign_ids(updates)
+    with _lock:
+        log = left._derive()
+        log._apply(updates)
+    return log
+
+
+class IndexedMessagesState(TypedDict):
+    """MessagesState 와 같지만 messages 채널이 MessageLog 인 state"""
+
+    messages: Annotated[list[AnyMessage], add_messages_indexed]
@@ -0,0 +1,256 @@
+# 구글 뉴스 RSS 를 connection pool / 조건부 요청 / URL 별 캐시로 가져오는 fetcher
+#
+# part4/example4.py 의 GoogleNews 는 tool 호출마다 새로 만들어지고 feedparser.parse(url) 로
+# 매번 새 연결을 열어 feed 전체를 받아 전부 parse 한 뒤 앞의 k 개만 쓴다. (timeout 도 없다)
+#
+# AsyncNewsFetcher 는
+#   - aiohttp ClientSession 하나 (keep-alive connection pool) 를 전용 event loop thread 에서 계속 쓰고
+#     (sync 메서드 / async 메서드 / 여러 thread 에서 불러도 같은 pool 을 쓴다)
+#   - URL 별로 ETag / Last-Modified 와 결과를 기억해 두었다가
+#     fresh_for 초 안이면 요청 없이 돌려주고, 그 뒤에는 If-None-Match / If-Modified-Since 로 물어서 304 면 그대로 쓴다.
+#   - 응답을 받는 대로 XMLPullParser 로 parse 하다가 k 개를 채우면 parse 를 멈춘다.
+#     남은 body 가 _DRAIN_LIMIT 안이면 읽어서 버려 connection 을 재사용하고, 더 길면 connection 을 닫아 나머지를 받지 않는다.
+#     (작은 feed 는 재연결 비용을, 큰 feed 는 대역폭을 아낀다)
+#     XML 이 깨진 feed 는 feedparser 로 다시 parse 한다.
+#   - 여러 키워드를 동시에 검색할 수 있다. (search_many)
+# 반환 형식은 GoogleNews 와 같은 [{"url": ..., "content": 제목}] 이다.
+#
+# 사용 예시
+#   news = AsyncNewsFetcher(timeout=10)
+#   news.search_by_keyword("노벨 문학상", k=5)
+#   news.search_many(["미국 대선", "노벨 문학상"], k=5)        # {"미국 대선": [...], "노벨 문학상": [...]}
+#   await news.asearch_by_keyword("노벨 문학상", k=5)
+import asyncio
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import quote
+
+import aiohttp
+import feedparser
+
+# 한 번에 읽는 body 크기
+_CHUNK_SIZE = 16 * 1024
+# k 개를 채운 뒤 connection 재사용을 위해 더 읽어서 버릴 body 크기의 상한
+_DRAIN_LIMIT = 64 * 1024
+
+
+async def _discard_rest(response: aiohttp.ClientResponse) -> None:
+    """남은 body 를 parse 하지 않고 버린다. 짧으면 읽어서 connection 을 pool 로 돌려주고, 길면 connection 을 닫는다."""
+    drained = 0
+    while drained <= _DRAIN_LIMIT:
+        chunk = await response.content.read(_CHUNK_SIZE)
+        if not chunk:
+            return
+        drained += len(chunk)
+    response.close()
+
+
+class _FeedCache:
+    """URL 하나의 마지막 응답 (검증용 header 와 parse 한 결과)"""
+
+    __slots__ = ("etag", "last_modified", "items", "complete", "checked")
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], items: List[Dict[str, str]], complete: bool):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.items = items
+        # feed 끝까지 parse 했는지 (아니면 items 보다 많은 k 는 다시 받아야 한다)
+        self.complete = complete
+        self.checked = time.monotonic()
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _item(element: ET.Element) -> Dict[str, str]:
+    title = link = ""
+    for child in element:
+        name = _local(child.tag)
+        if name == "title":
+            title = (child.text or "").strip()
+        elif name == "link" and not link:
+            # RSS 는 <link>url</link>, Atom 은 <link href="url"/>
+            link = (child.get("href") or child.text or "").strip()
+    return {"url": link, "content": title}
+
+
+class AsyncNewsFetcher:
+    """
+    구글 뉴스 RSS 를 pool / 조건부 요청 / 캐시로 가져오는 fetcher 입니다.
+
+    Args:
+        base_url: RSS 주소
+        timeout: 요청 하나의 전체 timeout (초)
+        fresh_for: 이 시간 (초) 안에 다시 부르면 서버에 묻지 않고 캐시를 쓴다.
+        max_urls: 캐시할 URL 수 (LRU)
+        max_connections: connection pool 크기
+    """
+
+    def __init__(
+        self,
+        base_url: str = "https://news.google.com/rss",
+        *,
+        timeout: float = 10.0,
+        fresh_for: float = 60.0,
+        max_urls: int = 256,
+        max_connections: int = 16,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.fresh_for = fresh_for
+        self.max_urls = max_urls
+        self.max_connections = max_connections
+        self._cache: "OrderedDict[str, _FeedCache]" = OrderedDict()
+        self._counters = {"requests": 0, "not_modified": 0, "fresh_hits": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    # ------------------------------------------------------------------ URL
+
+    def latest_url(self) -> str:
+        return f"{self.base_url}?hl=ko&gl=KR&ceid=KR:ko"
+
+    def keyword_url(self, keyword: Optional[str]) -> str:
+        if not keyword:
+            return self.latest_url()
+        return f"{self.base_url}/search?q={quote(keyword)}&hl=ko&gl=KR&ceid=KR:ko"
+
+    # ------------------------------------------------------------------ async
+
+    async def afetch(self, url: str, k: int = 3, timeout: Optional[float] = None) -> List[Dict[str, str]]:
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._fetch(url, k, timeout), self._ensure_loop()))
+
+    async def asearch_latest(self, k: int = 3, timeout: Optional[float] = None) -> List[Dict[str, str]]:
+        return await self.afetch(self.latest_url(), k, timeout)
+
+    async def asearch_by_keyword(self, keyword: Optional[str] = None, k: int = 3, timeout: Optional[float] = None) -> List[Dict[str, str]]:
+        return await self.afetch(self.keyword_url(keyword), k, timeout)
+
+    async def asearch_many(self, keywords: Sequence[str], k: int = 3) -> Dict[str, List[Dict[str, str]]]:
+        results = await asyncio.gather(*(self.asearch_by_keyword(keyword, k) for keyword in keywords))
+        return dict(zip(keywords, results))
+
+    # ------------------------------------------------------------------ sync (tool / 일반 함수에서)
+
+    def fetch(self, url: str, k: int = 3, timeout: Optional[float] = None) -> List[Dict[str, str]]:
+        return asyncio.run_coroutine_threadsafe(self._fetch(url, k, timeout), self._ensure_loop()).result()
+
+    def search_latest(self, k: int = 3, timeout: Optional[float] = None) -> List[Dict[str, str]]:
+        return self.fetch(self.latest_url(), k, timeout)
+
+    def search_by_keyword(self, keyword: Optional[str] = None, k: int = 3, timeout: Optional[float] = None) -> List[Dict[str, str]]:
+        return self.fetch(self.keyword_url(keyword), k, timeout)
+
+    def search_many(self, keywords: Sequence[str], k: int = 3) -> Dict[str, List[Dict[str, str]]]:
+        async def gather():
+            return await asyncio.gather(*(self._fetch(self.keyword_url(keyword), k) for keyword in keywords))
+
+        results = asyncio.run_coroutine_threadsafe(gather(), self._ensure_loop()).result()
+        return dict(zip(keywords, results))
+
+    # ------------------------------------------------------------------ internals
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        # session (connection pool) 은 event loop 하나에 묶이므로 전용 loop thread 하나에서만 요청한다.
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="news-fetcher", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def _fetch(self, url: str, k: int, timeout: Optional[float] = None) -> List[Dict[str, str]]:
+        cached = self._cache.get(url)
+        if cached is not None:
+            self._cache.move_to_end(url)
+        usable = cached is not None and (cached.complete or len(cached.items) >= k)
+        if usable and time.monotonic() - cached.checked < self.fresh_for:
+            self._counters["fresh_hits"] += 1
+            return cached.items[:k]
+
+        headers = {}
+        if usable:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        self._counters["requests"] += 1
+        try:
+            # timeout 을 주면 (예: 실행 예산의 남은 시간) 이번 요청만 더 짧게 끊는다.
+            options = {} if timeout is None else {"timeout": aiohttp.ClientTimeout(total=min(timeout, self.timeout))}
+            async with self._get_session().get(url, headers=headers, **options) as response:
+                if response.status == 304 and usable:
+                    self._counters["not_modified"] += 1
+                    cached.checked = time.monotonic()
+                    return cached.items[:k]
+                response.raise_for_status()
+                items, complete = await self._parse(response, k)
+                entry = _FeedCache(response.headers.get("ETag"), response.headers.get("Last-Modified"), items, complete)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self._counters["errors"] += 1
+            # 서버에 닿지 않으면 전에 받아 둔 결과라도 돌려준다.
+            if cached is not None and cached.items:
+                return cached.items[:k]
+            raise
+
+        self._cache[url] = entry
+        while len(self._cache) > self.max_urls:
+            self._cache.popitem(last=False)
+        return items[:k]
+
+    @staticmethod
+    async def _parse(response: aiohttp.ClientResponse, k: int):
+        """body 를 받는 대로 parse 하다가 item 을 k 개 모으면 멈춘다. -> (items, feed 끝까지 parse 했는지)"""
+        parser = ET.XMLPullParser(events=("end",))
+        items: List[Dict[str, str]] = []
+        body: List[bytes] = []
+        try:
+            async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+                body.append(chunk)
+                parser.feed(chunk)
+                for _, element in parser.read_events():
+                    if _local(element.tag) in ("item", "entry"):
+                        items.append(_item(element))
+                        element.clear()
+                if len(items) >= k:
+                    await _discard_rest(response)
+                    return items[:k], False
+            parser.close()
+            return items, True
+        except ET.ParseError:
+            # 잘못된 XML (HTML entity 등) 은 feedparser 로 전체를 다시 parse 한다.
+            async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+                body.append(chunk)
+            feed = feedparser.parse(b"".join(body))
+            return [{"url": entry.get("link", ""), "content": entry.get("title", "")} for entry in feed.entries], True
+
+    # ------------------------------------------------------------------ misc
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "cached_urls": len(self._cache)}
+
+    def close(self) -> None:
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            if self._session is not None:
+                await self._session.close()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = self._session = None
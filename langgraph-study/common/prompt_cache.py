@@ -0,0 +1,184 @@
+# 매 턴마다 [sys_msg] + state["messages"] 로 prompt 를 새로 만들고 전부 다시 직렬화하지 않기 위한 모듈
+#
+# 노드에서 llm.invoke([sys_msg] + state["messages"]) 를 하면
+#   - 새 리스트를 만들고 (history 길이만큼 복사)
+#   - ChatOpenAI 가 모든 메시지를 OpenAI 형식의 dict 로 다시 변환한다.
+# 그래서 한 턴이 O(history), 대화 전체는 O(n²) 이 된다.
+#
+# PromptAssembler 는 thread 마다 (system 메시지 + 이미 보낸 메시지) prefix 와 그 직렬화 결과(dict)를 들고 있고,
+# 새로 추가된 메시지만 prefix 뒤에 붙이고 새 메시지만 직렬화한다.
+# history 가 바뀐 경우 (RemoveMessage / 요약 / update_state 로 기존 메시지 수정, system 메시지 변경) 에는 prefix 를 다시 만든다.
+# (history 전체를 비교하지 않고 메시지 수와 처음 / 마지막으로 보낸 메시지만 확인한다. verify=True 면 전체를 비교해서 확인)
+#
+# ChatOpenAI 의 private 메서드 _get_request_payload 를 덮어쓰고 _convert_message_to_dict 를 쓰기 때문에
+# requirements.txt 에서 langchain-openai 를 0.2.x 로 묶어 두었다. (올리면 이 모듈을 먼저 확인해야 한다)
+#
+# 사용 예시
+#   assembler = PromptAssembler(sys_msg)
+#   llm = CachedPrefixChatOpenAI(model="gpt-4o", prompt_assembler=assembler)
+#
+#   def assistant(state: MessagesState, config: RunnableConfig):
+#       return {"messages": [llm_with_tools.invoke(assembler.assemble(state["messages"], config))]}
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import BaseMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_openai import AzureChatOpenAI, ChatOpenAI
+from langchain_openai.chat_models.base import _convert_message_to_dict
+from pydantic import Field
+
+
+class _Prefix:
+    __slots__ = ("system", "messages", "dicts", "history")
+
+    def __init__(self, system: Optional[SystemMessage]):
+        self.system = system
+        # 모델에 넘기는 리스트 (system + history). 새 메시지는 이 리스트 뒤에 append 한다.
+        self.messages: List[BaseMessage] = [system] if system is not None else []
+        # messages 의 앞에서부터 직렬화가 끝난 dict (모델이 payload 를 만들 때 채운다)
+        self.dicts: List[dict] = []
+        self.history = 0
+
+
+class PromptAssembler:
+    """
+    thread 별로 이미 만든 prompt prefix 를 재사용해서 새 메시지만 붙이는 prompt 조립기입니다.
+
+    Args:
+        system_message: 모든 prompt 앞에 붙일 system 메시지 (assemble 에서 thread 마다 다르게 줄 수도 있다)
+        max_threads: prefix 를 들고 있을 최대 thread 수 (넘으면 가장 오래 쓰지 않은 thread 부터 버린다)
+        verify: prefix 를 재사용할 때마다 history 전체를 비교해서 확인한다. (디버그용, 턴마다 O(history))
+    """
+
+    def __init__(self, system_message: Optional[SystemMessage] = None, max_threads: int = 1024, verify: bool = False):
+        self.system_message = system_message
+        self.max_threads = max_threads
+        self.verify = verify
+        self._lock = threading.Lock()
+        self._prefixes: "OrderedDict[str, _Prefix]" = OrderedDict()
+        # 조립해서 돌려준 리스트의 마지막 메시지 id(obj) -> prefix (모델 쪽에서 직렬화 결과를 찾을 때 사용)
+        self._by_tail: Dict[int, _Prefix] = {}
+        self._stats = {"assembled": 0, "rebuilt": 0, "appended": 0, "serialized": 0, "reused": 0}
+
+    def assemble(
+        self,
+        messages: Sequence[BaseMessage],
+        config: Optional[RunnableConfig] = None,
+        system: Optional[SystemMessage] = None,
+    ) -> List[BaseMessage]:
+        """
+        system 메시지 + messages 를 모델에 넘길 리스트로 만든다.
+
+        반환하는 리스트는 다음 턴에도 재사용되기 때문에 읽기 전용으로 다뤄야 한다.
+        config 에 thread_id 가 없으면 캐시하지 않고 새 리스트를 만든다.
+        """
+        system = system if system is not None else self.system_message
+        thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+        if thread_id is None:
+            return ([system] if system is not None else []) + list(messages)
+
+        with self._lock:
+            self._stats["assembled"] += 1
+            prefix = self._prefixes.get(thread_id)
+            if prefix is None or not self._extends(prefix, system, messages):
+                if prefix is not None:
+                    self._forget_tail(prefix)
+                prefix = _Prefix(system)
+                self._stats["rebuilt"] += 1
+            else:
+                self._forget_tail(prefix)
+
+            new = messages[prefix.history:]
+            prefix.messages.extend(new)
+            prefix.history = len(messages)
+            self._stats["appended"] += len(new)
+
+            self._prefixes[thread_id] = prefix
+            self._prefixes.move_to_end(thread_id)
+            if prefix.messages:
+                self._by_tail[id(prefix.messages[-1])] = prefix
+            while len(self._prefixes) > self.max_threads:
+                _, evicted = self._prefixes.popitem(last=False)
+                self._forget_tail(evicted)
+            return prefix.messages
+
+    def _extends(self, prefix: _Prefix, system: Optional[SystemMessage], messages: Sequence[BaseMessage]) -> bool:
+        """messages 가 prefix 에 들어있는 history 뒤에 메시지를 덧붙인 것인지 확인한다."""
+        if len(messages) < prefix.history:
+            return False
+        if system is not prefix.system and (
+            system is None or prefix.system is None or system.content != prefix.system.content
+        ):
+            return False
+        if prefix.history == 0:
+            return True
+        offset = len(prefix.messages) - prefix.history
+        # 처음 / 마지막으로 보낸 메시지만 비교한다. 같은 run 안에서는 같은 객체이고,
+        # checkpoint 에서 다시 읽은 경우에는 id 와 내용이 같다. (중간 메시지를 같은 id 로 덮어썼으면 invalidate 를 부른다)
+        extends = _same(prefix.messages[offset], messages[0]) and _same(prefix.messages[-1], messages[prefix.history - 1])
+        if extends and self.verify:
+            assert list(messages[: prefix.history]) == prefix.messages[offset:], "prefix 가 history 와 다릅니다."
+        return extends
+
+    def _forget_tail(self, prefix: _Prefix) -> None:
+        if prefix.messages:
+            self._by_tail.pop(id(prefix.messages[-1]), None)
+
+    def serialize(self, messages: Sequence[BaseMessage]) -> List[dict]:
+        """
+        messages 를 OpenAI 형식의 dict 리스트로 변환한다.
+
+        assemble 이 돌려준 리스트면 이전 턴에 변환해둔 prefix 를 재사용하고 새 메시지만 변환한다.
+        """
+        with self._lock:
+            prefix = self._by_tail.get(id(messages[-1])) if messages else None
+            if prefix is None or len(prefix.messages) != len(messages) or prefix.messages[-1] is not messages[-1]:
+                return [_convert_message_to_dict(m) for m in messages]
+            done = len(prefix.dicts)
+            prefix.dicts.extend(_convert_message_to_dict(m) for m in prefix.messages[done:])
+            self._stats["serialized"] += len(messages) - done
+            self._stats["reused"] += done
+            return list(prefix.dicts)
+
+    def invalidate(self, thread_id: str) -> None:
+        with self._lock:
+            prefix = self._prefixes.pop(thread_id, None)
+            if prefix is not None:
+                self._forget_tail(prefix)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"threads": len(self._prefixes), **self._stats}
+
+
+def _same(old: BaseMessage, new: BaseMessage) -> bool:
+    if old is new:
+        return True
+    return old.id is not None and old.id == new.id and old.type == new.type and old.content == new.content
+
+
+class _CachedPrefixMixin:
+    """_get_request_payload 에서 메시지 직렬화를 PromptAssembler 에 맡긴다."""
+
+    def _get_request_payload(self, input_: Any, *, stop: Optional[List[str]] = None, **kwargs: Any) -> dict:
+        if self.prompt_assembler is None:
+            return super()._get_request_payload(input_, stop=stop, **kwargs)
+        # _generate 에서 호출될 때는 이미 메시지 리스트다.
+        messages = input_ if isinstance(input_, list) else self._convert_input(input_).to_messages()
+        payload = super()._get_request_payload([], stop=stop, **kwargs)
+        payload["messages"] = self.prompt_assembler.serialize(messages)
+        return payload
+
+
+class CachedPrefixChatOpenAI(_CachedPrefixMixin, ChatOpenAI):
+    """PromptAssembler 의 직렬화된 prefix 를 재사용하는 ChatOpenAI"""
+
+    prompt_assembler: Optional[PromptAssembler] = Field(default=None, exclude=True)
+
+
+class CachedPrefixAzureChatOpenAI(_CachedPrefixMixin, AzureChatOpenAI):
+    """PromptAssembler 의 직렬화된 prefix 를 재사용하는 AzureChatOpenAI"""
+
+    prompt_assembler: Optional[PromptAssembler] = Field(default=None, exclude=True)
@@ -0,0 +1,261 @@
+# 실행 (run) 하나에 쓸 수 있는 LLM token / tool 호출 / 시간 / step 예산
+#
+# part4 예제들은 RunnableConfig(recursion_limit=10) 에만 기대고 있어서
+# 한도를 넘으면 GraphRecursionError 로 실행이 깨지고, token 이나 시간은 제한할 수 없다.
+#
+# RunBudget 을 config 에 붙이면 (budget.attach(config)) callback 으로 사용량을 세다가 예산을 넘는 순간
+# BudgetExceeded (NodeInterrupt) 를 낸다. langgraph 는 이것을 interrupt 로 처리하므로
+#   - 같은 superstep 의 다른 노드는 끝까지 돌고, 그 결과까지 checkpoint 에 저장된 채로 실행이 멈춘다. (에러가 아니다)
+#   - 멈춘 이유는 budget.reason 과 graph.get_state(config).tasks[..].interrupts 에 같은 dict 로 남는다.
+#     {"reason": "tokens" | "tool_calls" | "deadline" | "steps", "limit": ..., "used": ..., "node": ..., "step": ...}
+#   - 예산을 늘린 새 RunBudget 으로 graph.invoke(None, new_budget.attach(config)) 하면 멈춘 노드부터 이어서 돈다.
+#
+# 예산을 확인하는 시점
+#   - 노드 시작 : 시간 / token / step
+#   - 모델 호출 시작 : 시간 / token,  stream 중인 모델은 token 마다 : 시간 / token (진행 중인 응답을 끊는다)
+#   - tool 호출 시작 : 시간 / tool 호출 수
+# 이미 보낸 (stream 이 아닌) 요청은 중간에 끊을 수 없으니, 노드에서 남은 시간을 요청 timeout 으로 넘긴다.
+#   llm.invoke(messages, **RunBudget.from_config().timeout_options())
+#   (ChatOpenAI 는 timeout 이 나면 max_retries 번 다시 보내므로 deadline 을 꼭 지켜야 하면 max_retries 를 줄인다)
+#
+# 사용 예시
+#   budget = RunBudget(max_tokens=4000, max_tool_calls=3, deadline=30, max_steps=10)
+#   for event in graph.stream(input, budget.attach(config)):
+#       ...
+#   if budget.reason:
+#       print(budget.reason)          # {"reason": "tool_calls", "limit": 3, "used": 3, "node": "tools", "step": 5}
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import merge_configs, var_child_runnable_config
+from langgraph.constants import START
+from langgraph.errors import NodeInterrupt
+
+# config["configurable"] 에 budget 을 넣는 key
+BUDGET_KEY = "run_budget"
+
+
+class BudgetExceeded(NodeInterrupt):
+    """예산을 다 써서 실행을 멈출 때 발생합니다. (langgraph 는 interrupt 로 처리한다)"""
+
+    def __init__(self, reason: Dict[str, Any]):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class _SuppressBudgetWarnings(logging.Filter):
+    # callback 에서 낸 예외는 langchain 이 warning 으로 한 번 더 찍는다. 예산 초과는 의도한 중단이라 찍지 않는다.
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not record.getMessage().startswith("Error in _BudgetCallbackHandler.")
+
+
+_log_filter_installed = False
+
+
+def _install_log_filter() -> None:
+    # RunBudget 을 처음 쓸 때 한 번만 붙인다. (import 만 해서는 langchain 의 logger 를 건드리지 않는다)
+    global _log_filter_installed
+    if not _log_filter_installed:
+        logging.getLogger("langchain_core.callbacks.manager").addFilter(_SuppressBudgetWarnings())
+        _log_filter_installed = True
+
+
+class RunBudget:
+    """
+    실행 하나의 LLM token / tool 호출 / 시간 / superstep 예산입니다. (None 이면 제한 없음)
+
+    Args:
+        max_tokens: LLM 입력 + 출력 token 합계
+        max_tool_calls: tool 호출 수
+        deadline: 실행을 시작한 뒤 쓸 수 있는 시간 (초)
+        max_steps: superstep 수 (recursion_limit 대신 에러 없이 멈춘다)
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        max_tool_calls: Optional[int] = None,
+        deadline: Optional[float] = None,
+        max_steps: Optional[int] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.max_tool_calls = max_tool_calls
+        self.deadline = deadline
+        self.max_steps = max_steps
+        self.tokens = 0
+        self.tool_calls = 0
+        self.steps = 0
+        self.reason: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+        self._first_step: Optional[int] = None
+        # stream 중인 모델 호출별로 지금까지 받은 token 수 (끝나면 실제 usage 로 바꾼다)
+        self._streaming: Dict[UUID, int] = {}
+
+    @classmethod
+    def from_config(cls, config: Optional[RunnableConfig] = None) -> Optional["RunBudget"]:
+        """config (없으면 지금 실행 중인 노드 / tool 의 config) 에 붙은 budget 을 돌려줍니다."""
+        config = config or var_child_runnable_config.get() or {}
+        return (config.get("configurable") or {}).get(BUDGET_KEY)
+
+    def attach(self, config: Optional[RunnableConfig] = None) -> RunnableConfig:
+        """budget 을 세는 callback 과 budget 자신을 넣은 새 config 를 돌려줍니다."""
+        _install_log_filter()
+        return merge_configs(
+            config,
+            {"callbacks": [_BudgetCallbackHandler(self)], "configurable": {BUDGET_KEY: self}},
+        )
+
+    # ------------------------------------------------------------------ 조회
+
+    def elapsed(self) -> float:
+        return 0.0 if self._started is None else time.monotonic() - self._started
+
+    def remaining(self) -> Optional[float]:
+        """deadline 까지 남은 시간 (초), deadline 이 없으면 None"""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - self.elapsed(), 0.0)
+
+    def timeout_options(self) -> Dict[str, float]:
+        """모델 / HTTP 호출에 넘길 {"timeout": 남은 시간}. deadline 이 없으면 빈 dict (timeout=None 은 "제한 없음" 이라 넘기지 않는다)"""
+        remaining = self.remaining()
+        return {} if remaining is None else {"timeout": remaining}
+
+    def used_tokens(self) -> int:
+        with self._lock:
+            return self.tokens + sum(self._streaming.values())
+
+    def usage(self) -> Dict[str, Any]:
+        return {
+            "tokens": self.used_tokens(),
+            "tool_calls": self.tool_calls,
+            "steps": self.steps,
+            "elapsed": round(self.elapsed(), 3),
+            "reason": self.reason,
+        }
+
+    # ------------------------------------------------------------------ 확인 (callback 에서 부른다)
+
+    def _start(self) -> None:
+        if self._started is None:
+            self._started = time.monotonic()
+
+    def _exceed(self, reason: str, limit: Any, used: Any, metadata: Optional[Dict[str, Any]]) -> None:
+        metadata = metadata or {}
+        with self._lock:
+            # 처음 넘은 이유만 남긴다. (병렬 노드가 동시에 넘어도 같은 이유로 멈춘다)
+            if self.reason is None:
+                self.reason = {
+                    "reason": reason,
+                    "limit": limit,
+                    "used": used,
+                    "node": metadata.get("langgraph_node"),
+                    "step": metadata.get("langgraph_step"),
+                }
+            reason_value = self.reason
+        raise BudgetExceeded(reason_value)
+
+    def _check(self, metadata: Optional[Dict[str, Any]], *, tokens: bool = True) -> None:
+        if self.reason is not None:
+            raise BudgetExceeded(self.reason)
+        if self.deadline is not None and self.elapsed() >= self.deadline:
+            self._exceed("deadline", self.deadline, round(self.elapsed(), 3), metadata)
+        if tokens and self.max_tokens is not None:
+            used = self.used_tokens()
+            if used >= self.max_tokens:
+                self._exceed("tokens", self.max_tokens, used, metadata)
+
+    def _check_step(self, metadata: Dict[str, Any]) -> None:
+        step = metadata.get("langgraph_step")
+        if step is not None:
+            # step 수는 max_steps 가 없어도 usage() 에 보이도록 항상 센다.
+            with self._lock:
+                if self._first_step is None:
+                    self._first_step = step
+                self.steps = max(self.steps, step - self._first_step + 1)
+            if self.max_steps is not None and self.steps > self.max_steps:
+                self._exceed("steps", self.max_steps, self.steps - 1, metadata)
+        self._check(metadata)
+
+    def _count_tool_call(self, metadata: Optional[Dict[str, Any]]) -> None:
+        self._check(metadata, tokens=False)
+        with self._lock:
+            allowed = self.max_tool_calls is None or self.tool_calls < self.max_tool_calls
+            if allowed:
+                self.tool_calls += 1
+        if not allowed:
+            self._exceed("tool_calls", self.max_tool_calls, self.tool_calls, metadata)
+
+
+def _total_tokens(response: LLMResult) -> int:
+    total = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(generation.message, "usage_metadata", None) if isinstance(generation, ChatGeneration) else None
+            if usage:
+                total += usage.get("total_tokens", 0)
+    if not total and response.llm_output:
+        # completion 모델 (OpenAI) 은 llm_output 에 합계가 있다.
+        total = (response.llm_output.get("token_usage") or {}).get("total_tokens", 0)
+    return total
+
+
+class _BudgetCallbackHandler(BaseCallbackHandler):
+    """사용량을 세고 예산을 넘으면 BudgetExceeded 를 내는 handler"""
+
+    # 예외를 호출한 쪽 (노드 / 모델 / tool) 으로 올려야 하고, async 실행에서도 같은 task 안에서 바로 불려야 한다.
+    raise_error = True
+    run_inline = True
+
+    def __init__(self, budget: RunBudget):
+        self.budget = budget
+
+    def on_chain_start(
+        self, serialized: Any, inputs: Any, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> None:
+        self.budget._start()
+        metadata = metadata or {}
+        # 노드 실행 (run 이름 == 노드 이름) 이 시작될 때만 확인한다. (노드 안의 chain 은 건너뛴다)
+        node = metadata.get("langgraph_node")
+        if node is not None and node != START and kwargs.get("name") == node:
+            self.budget._check_step(metadata)
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        self.budget._start()
+        self.budget._check(metadata)
+
+    def on_llm_start(self, serialized: Any, prompts: Any, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        self.budget._start()
+        self.budget._check(metadata)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        budget = self.budget
+        with budget._lock:
+            budget._streaming[run_id] = budget._streaming.get(run_id, 0) + 1
+        # token callback 에는 metadata 가 없어서 노드 / step 은 실행 중인 config 에서 읽는다.
+        config = var_child_runnable_config.get() or {}
+        budget._check(config.get("metadata"))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        budget = self.budget
+        tokens = _total_tokens(response)
+        with budget._lock:
+            streamed = budget._streaming.pop(run_id, 0)
+            budget.tokens += tokens or streamed
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        # 중간에 끊긴 stream 도 받은 만큼은 쓴 것으로 센다.
+        budget = self.budget
+        with budget._lock:
+            budget.tokens += budget._streaming.pop(run_id, 0)
+
+    def on_tool_start(self, serialized: Any, input_str: str, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        self.budget._start()
+        self.budget._count_tool_call(metadata)
@@ -0,0 +1,212 @@
+# 검색 도구 (TavilySearch / TavilySearchResults ...) 를 감싸서 같은 query 를 한 번만 보내는 tool
+#
+# 예제의 검색 도구는 tool call 마다 검색 API 를 부른다.
+# 병렬 branch / 여러 thread 가 같은 질문을 동시에 검색해도 요청이 query 수만큼 나간다.
+#
+# SingleFlightSearchTool 은 감싼 도구와 이름 / 설명 / args_schema 가 같아서 bind_tools / ToolNode 에 그대로 넣을 수 있고
+#   - 같은 query (공백 정리 후 같은 tool args) 가 이미 검색 중이면 새로 보내지 않고 그 결과를 같이 받는다. (single-flight)
+#     sync (thread) 호출과 async 호출이 섞여 있어도 하나로 합친다.
+#     검색하던 쪽이 취소되면 (CancelledError / KeyboardInterrupt) 기다리던 호출 중 하나가 다시 검색한다. (취소는 넘기지 않는다)
+#   - 결과는 ttl 초 동안 메모리에 두고 (max_entries 개, LRU) 다시 쓴다.
+#     실패한 결과 (예외, Tavily 처럼 예외를 (repr(e), {}) 로 돌려주는 경우) 는 저장하지 않는다.
+#   - query 별 호출 수 / 실제 검색 수 / 합쳐진 수 / 캐시 hit 수 / 검색 지연을 stats() 로 볼 수 있다.
+#
+# 사용 예시
+#   tool = SingleFlightSearchTool(TavilySearch(max_results=3), ttl=300)
+#   llm_with_tools = llm.bind_tools([tool])
+#   graph_builder.add_node("tools", ToolNode(tools=[tool]))
+#   tool.stats()
+import asyncio
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain_core.tools import BaseTool
+from pydantic import PrivateAttr
+
+
+def _normalize(value: Any) -> Any:
+    # query 문자열 앞뒤 / 중복 공백은 같은 검색으로 본다.
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def _failed(result: Any) -> bool:
+    # Tavily 도구는 검색 API 예외를 잡아서 (repr(e), {}) 를 돌려준다.
+    return isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], str) and result[1] == {}
+
+
+# leader 가 취소되어 검색을 끝내지 못했을 때 기다리던 쪽에 넘기는 값 (다시 _join 한다)
+_ABANDONED = object()
+
+
+class SingleFlightSearchTool(BaseTool):
+    """
+    같은 query 의 동시 검색을 하나로 합치고 결과를 TTL 동안 재사용하는 검색 도구 wrapper 입니다.
+
+    Args:
+        tool: 감쌀 검색 도구
+        ttl: 결과를 재사용하는 시간 (초)
+        max_entries: 메모리에 들고 있을 결과 / query 통계 수
+    """
+
+    tool: BaseTool
+    ttl: float = 300.0
+    max_entries: int = 1024
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    # key -> (만료 시각, 결과)
+    _cache: "OrderedDict[str, Tuple[float, Any]]" = PrivateAttr(default_factory=OrderedDict)
+    # key -> 검색 중인 결과 (thread / event loop 어디서든 기다릴 수 있도록 concurrent.futures.Future)
+    _inflight: Dict[str, Future] = PrivateAttr(default_factory=dict)
+    _stats: "OrderedDict[str, Dict[str, Any]]" = PrivateAttr(default_factory=OrderedDict)
+
+    def __init__(self, tool: BaseTool, **kwargs: Any):
+        kwargs.setdefault("name", tool.name)
+        kwargs.setdefault("description", tool.description)
+        kwargs.setdefault("args_schema", tool.args_schema)
+        kwargs.setdefault("response_format", tool.response_format)
+        super().__init__(tool=tool, **kwargs)
+
+    # ------------------------------------------------------------------ BaseTool
+
+    def _run(self, *args: Any, run_manager: Optional[CallbackManagerForToolRun] = None, **kwargs: Any) -> Any:
+        key, query = self._key(args, kwargs)
+        future, leader = self._join(key, query)
+        while not leader:
+            result = future.result()
+            if result is not _ABANDONED:
+                return result
+            future, leader = self._join(key, query, retry=True)
+        start = time.perf_counter()
+        try:
+            result = self._call(self.tool._run, args, kwargs, run_manager)
+        except Exception as e:
+            self._finish(key, future, start, error=e)
+            raise
+        except BaseException:
+            self._abandon(key, future)
+            raise
+        self._finish(key, future, start, result=result)
+        return result
+
+    async def _arun(
+        self, *args: Any, run_manager: Optional[AsyncCallbackManagerForToolRun] = None, **kwargs: Any
+    ) -> Any:
+        key, query = self._key(args, kwargs)
+        future, leader = self._join(key, query)
+        while not leader:
+            # shield: 기다리던 쪽이 취소되어도 다른 호출이 같이 기다리는 Future 는 취소하지 않는다.
+            result = await asyncio.shield(asyncio.wrap_future(future))
+            if result is not _ABANDONED:
+                return result
+            future, leader = self._join(key, query, retry=True)
+        start = time.perf_counter()
+        try:
+            result = await self._call(self.tool._arun, args, kwargs, run_manager)
+        except Exception as e:
+            self._finish(key, future, start, error=e)
+            raise
+        except BaseException:
+            self._abandon(key, future)
+            raise
+        self._finish(key, future, start, result=result)
+        return result
+
+    # ------------------------------------------------------------------ internals
+
+    def _key(self, args: tuple, kwargs: Dict[str, Any]) -> Tuple[str, str]:
+        args = [_normalize(arg) for arg in args]
+        kwargs = {name: _normalize(value) for name, value in kwargs.items()}
+        query = kwargs.get("query", args[0] if args else "")
+        key = json.dumps([args, kwargs], sort_keys=True, ensure_ascii=False, default=str)
+        return key, str(query)
+
+    @staticmethod
+    def _call(method: Any, args: tuple, kwargs: Dict[str, Any], run_manager: Any) -> Any:
+        # 감싼 도구의 _run / _arun 이 run_manager 를 받을 때만 넘긴다. (BaseTool.run 과 같은 규칙)
+        if run_manager is not None and "run_manager" in inspect.signature(method).parameters:
+            kwargs = {**kwargs, "run_manager": run_manager}
+        return method(*args, **kwargs)
+
+    def _join(self, key: str, query: str, retry: bool = False) -> Tuple[Future, bool]:
+        """캐시에 있으면 끝난 Future, 검색 중이면 그 Future, 없으면 새 Future 와 함께 leader=True 를 돌려준다."""
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {
+                    "query": query, "calls": 0, "searches": 0, "coalesced": 0, "cache_hits": 0,
+                    "last_ms": None, "total_ms": 0.0,
+                }
+                while len(self._stats) > self.max_entries:
+                    self._stats.popitem(last=False)
+            if not retry:
+                stats["calls"] += 1
+
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > now:
+                self._cache.move_to_end(key)
+                stats["cache_hits"] += 1
+                future: Future = Future()
+                future.set_result(cached[1])
+                return future, False
+            if cached is not None:
+                del self._cache[key]
+
+            future = self._inflight.get(key)
+            if future is not None:
+                stats["coalesced"] += 1
+                return future, False
+            future = self._inflight[key] = Future()
+            stats["searches"] += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future, start: float, result: Any = None, error: Optional[Exception] = None) -> None:
+        elapsed = (time.perf_counter() - start) * 1e3
+        with self._lock:
+            self._inflight.pop(key, None)
+            stats = self._stats.get(key)
+            if stats is not None:
+                stats["last_ms"] = elapsed
+                stats["total_ms"] += elapsed
+            if error is None and not _failed(result):
+                self._cache[key] = (time.monotonic() + self.ttl, result)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        # 기다리는 쪽에는 같은 결과 / 예외를 넘긴다. (실패한 결과도 이번에 합쳐진 호출까지는 같이 받는다)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _abandon(self, key: str, future: Future) -> None:
+        # 취소된 검색은 캐시하지 않고 in-flight 에서 빼서, 기다리던 호출 중 하나가 새 leader 로 다시 검색하게 한다.
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        future.set_result(_ABANDONED)
+
+    # ------------------------------------------------------------------ misc
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queries = [dict(stats) for stats in self._stats.values()]
+            return {
+                "cached": len(self._cache),
+                "inflight": len(self._inflight),
+                "calls": sum(stats["calls"] for stats in queries),
+                "searches": sum(stats["searches"] for stats in queries),
+                "queries": queries,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,301 @@
+# trim_messages(..., token_counter=ChatOpenAI(model="gpt-4o")) 대신 쓰는 token 계산 / trim 모듈
+#
+# ChatOpenAI 를 token_counter 로 넘기면
+#   - token 을 세기 위해 모델 객체를 만들어야 하고 (AzureChatOpenAI 는 model 이름을 몰라서 NotImplementedError)
+#   - trim_messages 가 이진 탐색을 하면서 history 전체를 여러 번 다시 tokenize 한다. (매 턴 O(n log n) tokenize)
+#
+# MessageTokenCounter 는
+#   - 메시지 하나의 token 수를 (id, 내용 hash) 로 캐시하고 (ChatOpenAI.get_num_tokens_from_messages 와 같은 계산식)
+#   - thread 마다 history 의 prefix sum (누적 token 수) 을 들고 있어서 새 메시지만 더한다.
+#     (checkpoint 에서 다시 읽은 history 도 메시지 id 로 맞춰 보기 때문에 턴마다 처음부터 다시 세지 않는다)
+#   - trim 은 prefix sum 위에서 이진 탐색을 하기 때문에 warm-up 뒤에는 O(log n) 이다.
+#   - model / encoding 이름만 있으면 되기 때문에 Azure deployment 에서도 그대로 쓸 수 있다.
+#   - 메시지 dict 변환에 langchain_openai 의 private 함수 _convert_message_to_dict 를 쓴다. (requirements.txt 에서 0.2.x 로 묶어 둠)
+#
+# 사용 예시
+#   token_counter = MessageTokenCounter(model="gpt-4o")
+#
+#   def chat_model_node(state: MessagesState, config: RunnableConfig):
+#       messages = token_counter.trim(state["messages"], config, max_tokens=100, strategy="last")
+#       return {"messages": [model.invoke(messages)]}
+#
+#   trim_messages(messages, max_tokens=100, token_counter=token_counter)   # trim_messages 의 token_counter 로도 쓸 수 있다.
+import bisect
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Type, Union
+
+from langchain_core.messages import BaseMessage, SystemMessage, trim_messages
+from langchain_core.runnables import RunnableConfig
+from langchain_openai.chat_models.base import _convert_message_to_dict
+
+# ChatOpenAI.get_num_tokens_from_messages 와 같은 값 (gpt-3.5-turbo / gpt-4 / gpt-4o 계열)
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_NAME = 1
+TOKENS_PER_TOOL_CALL_ID = 3
+# 모델 응답 앞에 붙는 token (메시지 리스트마다 한 번)
+TOKENS_PER_REPLY = 3
+
+MessageTypes = Union[str, Type[BaseMessage], Sequence[Union[str, Type[BaseMessage]]]]
+
+
+class _Ledger:
+    """thread 하나의 history 와 누적 token 수. prefix[i] 는 messages[:i] 의 token 합 (reply token 제외)"""
+
+    __slots__ = ("messages", "prefix")
+
+    def __init__(self):
+        self.messages: List[BaseMessage] = []
+        self.prefix: List[int] = [0]
+
+
+class MessageTokenCounter:
+    """
+    메시지별 token 수를 캐시하고 thread 별 누적 합으로 trim 하는 token counter 입니다.
+
+    Args:
+        model: tiktoken encoding 을 고를 모델 이름 (Azure 는 deployment 이름이 아니라 실제 모델 이름)
+        encoding: tiktoken encoding 이름 (주면 model 대신 사용)
+        count_text: 문자열의 token 수를 세는 함수 (주면 tiktoken 대신 사용)
+        max_entries: 메시지별 token 수를 캐시할 최대 개수 (0 이면 캐시하지 않는다)
+        max_threads: 누적 합을 들고 있을 최대 thread 수
+    """
+
+    def __init__(
+        self,
+        model: str = "gpt-4o",
+        encoding: Optional[str] = None,
+        count_text: Optional[Callable[[str], int]] = None,
+        max_entries: int = 100_000,
+        max_threads: int = 1024,
+    ):
+        self.model = model
+        self.encoding = encoding
+        self._count_text = count_text
+        self.max_entries = max_entries
+        self.max_threads = max_threads
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._ledgers: "OrderedDict[str, _Ledger]" = OrderedDict()
+        self._stats = {"tokenized": 0, "cache_hits": 0, "appended": 0, "resynced": 0}
+
+    # ------------------------------------------------------------------ per message
+
+    def _text_counter(self) -> Callable[[str], int]:
+        if self._count_text is None:
+            import tiktoken
+
+            if self.encoding is not None:
+                enc = tiktoken.get_encoding(self.encoding)
+            else:
+                try:
+                    enc = tiktoken.encoding_for_model(self.model)
+                except KeyError:
+                    enc = tiktoken.get_encoding("o200k_base")
+            self._count_text = lambda text: len(enc.encode(text))
+        return self._count_text
+
+    def _tokenize(self, message: BaseMessage) -> int:
+        """ChatOpenAI.get_num_tokens_from_messages 에서 메시지 하나에 해당하는 부분 (이미지 제외)"""
+        count_text = self._text_counter()
+        tokens = TOKENS_PER_MESSAGE
+        for key, value in _convert_message_to_dict(message).items():
+            if key == "tool_call_id":
+                tokens += TOKENS_PER_TOOL_CALL_ID
+                continue
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, str):
+                        tokens += count_text(item)
+                    elif item.get("type") == "text":
+                        tokens += count_text(item["text"])
+                    elif item.get("type") == "function":
+                        tokens += count_text(item["function"]["arguments"]) + count_text(item["function"]["name"])
+            elif value:
+                tokens += count_text(str(value))
+            if key == "name":
+                tokens += TOKENS_PER_NAME
+        return tokens
+
+    @staticmethod
+    def _key(message: BaseMessage) -> Hashable:
+        content = message.content if isinstance(message.content, str) else repr(message.content)
+        # pydantic 모델에서 없는 속성을 getattr 로 찾으면 느리기 때문에 __dict__ 에서 찾는다.
+        fields = message.__dict__
+        tool_calls = fields.get("tool_calls")
+        return (
+            message.type,
+            message.id,
+            message.name,
+            hash(content),
+            repr(tool_calls) if tool_calls else None,
+            fields.get("tool_call_id"),
+        )
+
+    def count_message(self, message: BaseMessage) -> int:
+        """메시지 하나의 token 수 (id + 내용 hash 로 캐시)"""
+        if self.max_entries <= 0:
+            self._stats["tokenized"] += 1
+            return self._tokenize(message)
+        key = self._key(message)
+        with self._lock:
+            tokens = self._cache.get(key)
+            if tokens is not None:
+                self._cache.move_to_end(key)
+                self._stats["cache_hits"] += 1
+                return tokens
+        tokens = self._tokenize(message)
+        with self._lock:
+            self._stats["tokenized"] += 1
+            self._cache[key] = tokens
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return tokens
+
+    def __call__(self, messages: Sequence[BaseMessage]) -> int:
+        """trim_messages 의 token_counter 로 쓸 수 있는 형태 (메시지 리스트 전체 token 수)"""
+        return sum(self.count_message(m) for m in messages) + TOKENS_PER_REPLY
+
+    # ------------------------------------------------------------------ per thread
+
+    def _sync(self, messages: Sequence[BaseMessage], config: Optional[RunnableConfig]) -> _Ledger:
+        """thread 의 누적 합을 messages 에 맞춘다. (뒤에 붙은 메시지만 더한다)"""
+        thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+        with self._lock:
+            ledger = self._ledgers.get(thread_id) if thread_id is not None else None
+            if ledger is None:
+                ledger = _Ledger()
+            if thread_id is not None:
+                self._ledgers[thread_id] = ledger
+                self._ledgers.move_to_end(thread_id)
+                while len(self._ledgers) > self.max_threads:
+                    self._ledgers.popitem(last=False)
+        known = len(ledger.messages)
+        if not (
+            known
+            and len(messages) >= known
+            and _same(ledger.messages[-1], messages[known - 1])
+            and _same(ledger.messages[0], messages[0])
+        ):
+            # 뒤에 덧붙인 history 가 아니면 (RemoveMessage / 요약 등) 앞에서부터 같은 메시지인 구간까지만 남기고 다시 센다.
+            # (다시 세는 메시지도 대부분 캐시에 있다)
+            same = 0
+            for old, new in zip(ledger.messages, messages):
+                if not _same(old, new):
+                    break
+                same += 1
+            if same < known:
+                del ledger.messages[same:]
+                del ledger.prefix[same + 1 :]
+                self._stats["resynced"] += 1
+            known = same
+        for message in messages[known:]:
+            ledger.messages.append(message)
+            ledger.prefix.append(ledger.prefix[-1] + self.count_message(message))
+        self._stats["appended"] += len(messages) - known
+        return ledger
+
+    def count(self, messages: Sequence[BaseMessage], config: Optional[RunnableConfig] = None) -> int:
+        """messages 전체의 token 수 (thread 의 누적 합을 사용)"""
+        return self._sync(messages, config).prefix[-1] + TOKENS_PER_REPLY
+
+    def trim(
+        self,
+        messages: Sequence[BaseMessage],
+        config: Optional[RunnableConfig] = None,
+        *,
+        max_tokens: int,
+        strategy: str = "last",
+        include_system: bool = False,
+        start_on: Optional[MessageTypes] = None,
+        end_on: Optional[MessageTypes] = None,
+        allow_partial: bool = False,
+    ) -> List[BaseMessage]:
+        """
+        trim_messages 와 같은 결과를 prefix sum 이진 탐색으로 만든다.
+
+        strategy="last" 는 max_tokens 안에 들어가는 가장 긴 suffix, "first" 는 가장 긴 prefix 를 남긴다.
+        allow_partial 인 경우 잘리는 경계의 메시지 하나만 trim_messages 로 넘겨서 일부를 남긴다.
+        """
+        if strategy not in ("first", "last"):
+            raise ValueError(f"Unrecognized strategy {strategy}")
+        messages = list(messages) if not isinstance(messages, list) else messages
+        ledger = self._sync(messages, config)
+        prefix = ledger.prefix
+        n = len(messages)
+
+        if strategy == "first":
+            # prefix[k] + reply <= max_tokens 인 가장 큰 k
+            k = bisect.bisect_right(prefix, max_tokens - TOKENS_PER_REPLY) - 1
+            if k < 0:
+                return []
+            result = messages[:k]
+            if allow_partial and k < n:
+                result = trim_messages(
+                    messages[: k + 1], max_tokens=max_tokens, strategy="first",
+                    token_counter=self, allow_partial=True,
+                )
+            if end_on:
+                while result and not _is_type(result[-1], end_on):
+                    result = result[:-1]
+            return result
+
+        end = n
+        if end_on:
+            while end > 0 and not _is_type(messages[end - 1], end_on):
+                end -= 1
+        if end == 0:
+            # trim_messages 처럼 end_on 으로 system 메시지까지 지워진 경우
+            return []
+        lo = 0
+        budget = max_tokens - TOKENS_PER_REPLY
+        system = None
+        if include_system and isinstance(messages[0], SystemMessage):
+            system = messages[0]
+            lo = 1
+            # trim_messages 와 같이 system 메시지는 따로 센다. (system 메시지 + reply token)
+            budget -= prefix[1] + TOKENS_PER_REPLY
+        # prefix[end] - prefix[i] <= budget 인 가장 작은 i  (즉 prefix[i] >= prefix[end] - budget)
+        start = min(max(bisect.bisect_left(prefix, prefix[end] - budget, lo, end + 1), lo), end)
+        if allow_partial and start > lo:
+            window = messages[start - 1 : end]
+            result = trim_messages(
+                ([system] if system is not None else []) + window, max_tokens=max_tokens, strategy="last",
+                token_counter=self, allow_partial=True, include_system=system is not None,
+            )
+            body = result[1:] if system is not None else result
+        else:
+            body = messages[start:end]
+        if start_on:
+            skip = 0
+            while skip < len(body) and not _is_type(body[skip], start_on):
+                skip += 1
+            body = body[skip:]
+        return ([system] if system is not None else []) + body
+
+    def invalidate(self, thread_id: str) -> None:
+        with self._lock:
+            self._ledgers.pop(thread_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "cached_messages": len(self._cache), "threads": len(self._ledgers)}
+
+
+def _same(old: BaseMessage, new: BaseMessage) -> bool:
+    """ledger 의 메시지와 같은 메시지인지. checkpointer 는 턴마다 메시지 객체를 새로 만들기 때문에 객체가 아니라 id 로 비교한다."""
+    if old is new:
+        return True
+    # id 가 같아도 내용이 바뀐 메시지 (같은 id 로 덮어쓴 경우) 는 다른 메시지로 본다.
+    return old.id is not None and old.id == new.id and old.type == new.type and old.content == new.content
+
+
+def _is_type(message: BaseMessage, types: MessageTypes) -> bool:
+    if isinstance(types, (str, type)):
+        types = [types]
+    for t in types:
+        if isinstance(t, str) and message.type == t:
+            return True
+        if isinstance(t, type) and isinstance(message, t):
+            return True
+    return False
@@ -10,8 +10,15 @@ from langchain_community.tools.tavily_search import TavilySearchResults
 from langgraph.prebuilt import ToolNode, tools_condition
 from langchain_experimental.utilities import PythonREPL
 from langchain_core.tools import tool
-
-web_search = TavilySearchResults(max_results=2)
+import os
+import sys
+# 스터디 루트의 common 패키지 (BoundedMemorySaver, SingleFlightSearchTool) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import SingleFlightSearchTool
+
+# web_search = TavilySearchResults(max_results=2)
+# 같은 검색어를 동시에 / 다시 검색하면 한 번만 요청하고 10분 동안 결과를 재사용한다.
+web_search = SingleFlightSearchTool(TavilySearchResults(max_results=2), ttl=600)
 repl = PythonREPL()
 
 @tool
@@ -53,6 +60,7 @@ from langgraph.graph import StateGraph, START, END
 from langgraph.prebuilt import tools_condition
 from langgraph.graph import StateGraph
 from langgraph.checkpoint.memory import MemorySaver
+from common import BoundedMemorySaver
 
 workflow = StateGraph(State)
 
@@ -78,46 +86,55 @@ workflow.add_conditional_edges(
 workflow.add_edge("tool", "agent")
 
 # Set up memory
-memory = MemorySaver()
+# memory = MemorySaver()
+# tool 호출 전에 멈춘 thread 는 spill 파일로 내보내고, graph.stream(None, ...) 으로 재개할 때 그 thread 만 다시 올린다.
+memory = BoundedMemorySaver(spill_path="parked_threads.db")
 
 graph = workflow.compile(checkpointer=memory, interrupt_before=["tool"]) # tool 호출 전에 멈추기
 
 initial_input = {"messages": [HumanMessage(content="미국의 최근 5개년(~2023) GDP 차트를 그려줄래?")]}
 thread = {"configurable": {"thread_id": "13"}}
-for chunk in graph.stream(initial_input,thread, stream_mode="updates"):
-    for node, values in chunk.items():
-        print(f"Receiving update from node: '{node}'")
-        print(values)
-        print("\n\n")
+# 이전 실행에서 spill 파일에 남은 같은 thread 를 지우고 시작한다.
+memory.delete_thread("13")
+with memory.park_on_interrupt(graph, thread):
+    for chunk in graph.stream(initial_input,thread, stream_mode="updates"):
+        for node, values in chunk.items():
+            print(f"Receiving update from node: '{node}'")
+            print(values)
+            print("\n\n")
 
 print("---------------------------------------------------------------------------------------------")
 
-for chunk in graph.stream(None,thread, stream_mode="updates"):
-    for node, values in chunk.items():
-        print(f"Receiving update from node: '{node}'")
-        print(values)
-        print("\n\n")
+with memory.park_on_interrupt(graph, thread):
+    for chunk in graph.stream(None,thread, stream_mode="updates"):
+        for node, values in chunk.items():
+            print(f"Receiving update from node: '{node}'")
+            print(values)
+            print("\n\n")
 
 print("---------------------------------------------------------------------------------------------")
 
-for chunk in graph.stream(None,thread, stream_mode="updates"):
-    for node, values in chunk.items():
-        print(f"Receiving update from node: '{node}'")
-        print(values)
-        print("\n\n")
+with memory.park_on_interrupt(graph, thread):
+    for chunk in graph.stream(None,thread, stream_mode="updates"):
+        for node, values in chunk.items():
+            print(f"Receiving update from node: '{node}'")
+            print(values)
+            print("\n\n")
 
 print("---------------------------------------------------------------------------------------------")
 
-for chunk in graph.stream(None,thread, stream_mode="updates"):
-    for node, values in chunk.items():
-        print(f"Receiving update from node: '{node}'")
-        print(values)
-        print("\n\n")
+with memory.park_on_interrupt(graph, thread):
+    for chunk in graph.stream(None,thread, stream_mode="updates"):
+        for node, values in chunk.items():
+            print(f"Receiving update from node: '{node}'")
+            print(values)
+            print("\n\n")
 
 print("---------------------------------------------------------------------------------------------")
 
-for chunk in graph.stream(None,thread, stream_mode="updates"):
-    for node, values in chunk.items():
-        print(f"Receiving update from node: '{node}'")
-        print(values)
-        print("\n\n")
\ No newline at end of file
+with memory.park_on_interrupt(graph, thread):
+    for chunk in graph.stream(None,thread, stream_mode="updates"):
+        for node, values in chunk.items():
+            print(f"Receiving update from node: '{node}'")
+            print(values)
+            print("\n\n")
\ No newline at end of file
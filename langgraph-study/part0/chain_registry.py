@@ -0,0 +1,96 @@
+# 노드마다 매번 ChatOpenAI / PromptTemplate / OutputParser / 체인을 새로 만들지 않도록
+# 설정값을 key로 한 번만 만들어서 프로세스 전체(여러 노드, 여러 thread)에서 재사용하는 레지스트리
+import threading
+from typing import Any, Callable, Hashable, Optional
+
+from langchain_core.prompts import PromptTemplate
+
+
+def _freeze(value: Any) -> Hashable:
+    """dict / list 같은 설정값을 key로 쓸 수 있도록 hashable 하게 바꿔준다."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+class ChainRegistry:
+    """
+    모델, 프롬프트, 파서, 체인을 설정별로 한 번만 생성해서 캐싱하는 클래스입니다.
+
+    LangGraph는 노드를 thread pool에서 실행하기 때문에 생성 부분은 lock으로 보호합니다.
+    이미 만들어진 객체를 꺼내는 경로는 lock 없이 dict 조회만 합니다.
+    그래서 hits 도 lock 없이 세며, 여러 thread 에서 동시에 꺼내면 조금 덜 셀 수 있는 대략적인 값입니다. (builds 는 정확)
+    """
+
+    def __init__(self):
+        self._items: dict = {}
+        # 체인 factory 안에서 다시 model() / prompt() 를 부르기 때문에 재진입 가능한 lock 사용
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.builds = 0
+
+    def get_or_build(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        item = self._items.get(key)
+        if item is not None:
+            self.hits += 1
+            return item
+        with self._lock:
+            # lock을 기다리는 동안 다른 thread가 먼저 만들었을 수 있음
+            item = self._items.get(key)
+            if item is None:
+                item = factory()
+                self._items[key] = item
+                self.builds += 1
+            else:
+                self.hits += 1
+        return item
+
+    def model(self, model_cls: type, **kwargs) -> Any:
+        # ChatOpenAI(model="gpt-4o") 처럼 클래스 + 생성 인자가 같으면 같은 클라이언트(HTTP 커넥션 풀)를 공유
+        key = ("model", model_cls, _freeze(kwargs))
+        return self.get_or_build(key, lambda: model_cls(**kwargs))
+
+    def prompt(
+        self,
+        template: str,
+        input_variables: list,
+        partial_variables: Optional[dict] = None,
+    ) -> PromptTemplate:
+        key = ("prompt", template, _freeze(input_variables), _freeze(partial_variables or {}))
+        return self.get_or_build(
+            key,
+            lambda: PromptTemplate(
+                template=template,
+                input_variables=input_variables,
+                partial_variables=partial_variables or {},
+            ),
+        )
+
+    def parser(self, parser_cls: type, **kwargs) -> Any:
+        key = ("parser", parser_cls, _freeze(kwargs))
+        return self.get_or_build(key, lambda: parser_cls(**kwargs))
+
+    def chain(self, name: str, factory: Callable[[], Any]) -> Any:
+        # 체인은 구성 요소가 다양해서 호출하는 쪽에서 이름을 key로 넘겨준다.
+        return self.get_or_build(("chain", name), factory)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.builds = 0
+
+    def stats(self) -> dict:
+        return {"items": len(self._items), "builds": self.builds, "hits": self.hits}
+
+
+# 프로세스 전체에서 공유하는 기본 레지스트리
+registry = ChainRegistry()
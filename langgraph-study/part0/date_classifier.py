@@ -0,0 +1,136 @@
+# "날짜와 관련된 질문인가?" 를 매 turn 마다 gpt-4o 로 판별하지 않도록
+# 정규식 + 작은 키워드 모델로 먼저 판별하고, 확신이 낮을 때만 LLM 을 호출하는 라우팅 단계
+import math
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+# 날짜 / 요일이 직접 들어있으면 거의 확실하게 날짜 질문
+_STRONG_PATTERNS = [
+    re.compile(r"\d{1,5}\s*년\s*\d{1,2}\s*월(\s*\d{1,2}\s*일)?"),
+    re.compile(r"\d{1,2}\s*월\s*\d{1,2}\s*일"),
+    re.compile(r"[월화수목금토일]요일|무슨\s*요일|몇\s*요일"),
+    re.compile(r"\b\d{4}[-./]\d{1,2}[-./]\d{1,2}\b"),
+    re.compile(r"\b\d{1,2}/\d{1,2}/\d{2,4}\b"),
+    re.compile(r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b"),
+    re.compile(
+        r"\b(jan(uary)?|feb(ruary)?|mar(ch)?|apr(il)?|may|jun(e)?|jul(y)?|aug(ust)?|sep(tember)?|oct(ober)?|nov(ember)?|dec(ember)?)"
+        r"\.?\s+\d{1,2}(st|nd|rd|th)?\b"
+    ),
+    re.compile(r"\bwhat\s+day\b|\bday\s+of\s+the\s+week\b"),
+]
+
+# 키워드 모델: (정규식, 가중치). 점수 합을 sigmoid 에 넣어서 확률로 사용한다.
+_KEYWORD_WEIGHTS = [
+    (re.compile(r"날짜|며칠|달력|윤년|기념일|공휴일"), 2.5),
+    (re.compile(r"\b(date|calendar|weekday|leap\s+year|holiday)s?\b"), 2.5),
+    (re.compile(r"오늘|내일|어제|모레|그제|언제|몇\s*일|\d+\s*일\s*(후|뒤|전)"), 1.5),
+    (re.compile(r"\b(today|tomorrow|yesterday|when|days?\s+(after|before|ago))\b"), 1.5),
+    (re.compile(r"\d+\s*(년|월)|\b(month|year)s?\b"), 1.0),
+    (re.compile(r"이름|질문|기억|추천|날씨|\b(name|question|remember|recommend|weather)\b"), -1.5),
+]
+
+_STRONG_WEIGHT = 6.0
+# 아무 단서가 없는 질문은 날짜 질문이 아닐 확률이 높다. (sigmoid(-2) ~= 0.12)
+_BIAS = -2.0
+
+_PUNCT = re.compile(r"[\s?!.,~]+")
+
+
+def normalize_query(query: str) -> str:
+    query = unicodedata.normalize("NFKC", query).casefold()
+    return _PUNCT.sub(" ", query).strip()
+
+
+def score_query(query: str) -> float:
+    """정규화된 query 가 날짜 질문일 확률을 반환한다."""
+    z = _BIAS
+    if any(p.search(query) for p in _STRONG_PATTERNS):
+        z += _STRONG_WEIGHT
+    for pattern, weight in _KEYWORD_WEIGHTS:
+        if pattern.search(query):
+            z += weight
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+class DateQuestionRouter:
+    """
+    로컬 분류기로 먼저 판별하고, 확신이 threshold 보다 낮을 때만 llm_classify 를 호출합니다.
+
+    판별 결과는 정규화된 query 를 key 로 LRU 캐시에 저장합니다.
+    노드가 thread pool 에서 동시에 불러도 되도록 캐시와 통계 counter 는 같은 lock 안에서 바꿉니다.
+
+    Args:
+        llm_classify: query 문자열을 받아 날짜 질문이면 True 를 반환하는 함수 (LLM 체인)
+        threshold: 로컬 분류기 결과를 그대로 쓰기 위한 최소 확신도 (max(p, 1 - p))
+        cache_size: 캐시에 저장할 최대 query 수
+    """
+
+    def __init__(
+        self,
+        llm_classify: Callable[[str], bool],
+        threshold: float = 0.85,
+        cache_size: int = 4096,
+    ):
+        self.llm_classify = llm_classify
+        self.threshold = threshold
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, bool]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.cache_hits = 0
+        self.fast_path = 0
+        self.llm_calls = 0
+
+    def classify_local(self, query: str) -> Tuple[bool, float]:
+        """(판별 결과, 확신도) 를 반환한다."""
+        p = score_query(normalize_query(query))
+        return p >= 0.5, max(p, 1.0 - p)
+
+    def _cached(self, key: str) -> Optional[bool]:
+        with self._lock:
+            self.calls += 1
+            verdict = self._cache.get(key)
+            if verdict is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+            return verdict
+
+    def _remember(self, key: str, verdict: bool) -> None:
+        with self._lock:
+            self._cache[key] = verdict
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def __call__(self, query: str) -> bool:
+        key = normalize_query(query)
+        verdict = self._cached(key)
+        if verdict is not None:
+            return verdict
+
+        p = score_query(key)
+        if max(p, 1.0 - p) >= self.threshold:
+            with self._lock:
+                self.fast_path += 1
+            verdict = p >= 0.5
+        else:
+            with self._lock:
+                self.llm_calls += 1
+            verdict = bool(self.llm_classify(query))
+        self._remember(key, verdict)
+        return verdict
+
+    def stats(self) -> dict:
+        # LLM 을 거치지 않은 비율 = (캐시 적중 + 로컬 판별) / 전체
+        with self._lock:
+            local = self.cache_hits + self.fast_path
+            return {
+                "calls": self.calls,
+                "cache_hits": self.cache_hits,
+                "fast_path": self.fast_path,
+                "llm_calls": self.llm_calls,
+                "fast_path_hit_rate": local / self.calls if self.calls else 0.0,
+            }
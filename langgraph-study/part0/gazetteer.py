@@ -0,0 +1,96 @@
+# 지명 사전(gazetteer)을 Aho-Corasick 오토마톤으로 한 번만 컴파일해두고
+# 쿼리를 한 번만 훑어서 "New York" 같은 여러 단어 지명도 찾아내는 모듈
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+class Gazetteer:
+    """
+    별칭(alias) -> 대표 지명(canonical) 사전을 문자 단위 Aho-Corasick 오토마톤으로 만든 클래스입니다.
+
+    영문 지명은 단어 경계에서만 매칭되고("Parish" 안의 "Paris"는 무시),
+    한국어 지명은 뒤에 조사가 붙어도 매칭됩니다("런던의 날씨").
+    여러 지명이 겹치면 가장 왼쪽, 그 중 가장 긴 지명을 선택합니다.
+    """
+
+    def __init__(self, aliases: Dict[str, str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # 각 상태에서 끝나는 (별칭 길이, 대표 지명) 목록. fail 링크를 따라간 결과까지 미리 합쳐둔다.
+        self._out: List[List[Tuple[int, str]]] = [[]]
+
+        for alias, canonical in aliases.items():
+            self._add(alias.lower(), canonical)
+        self._build_fail_links()
+
+    @classmethod
+    def from_names(cls, names: Iterable[str], aliases: Optional[Dict[str, str]] = None) -> "Gazetteer":
+        table = {name: name for name in names}
+        table.update(aliases or {})
+        return cls(table)
+
+    def _add(self, alias: str, canonical: str) -> None:
+        state = 0
+        for ch in alias:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(alias), canonical))
+
+    def _build_fail_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                candidate = self._goto[fail].get(ch, 0)
+                # 루트의 자식은 자기 자신이 candidate 가 되므로 루트로 보낸다.
+                self._fail[nxt] = candidate if candidate != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """text 안의 모든 지명을 (start, end, canonical) 목록으로 반환한다."""
+        lowered = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        state = 0
+        for i, ch in enumerate(lowered):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            end = i + 1
+            for length, canonical in out[state]:
+                start = end - length
+                # 영문 단어 중간에서 시작하거나 끝나는 매칭은 버린다.
+                if start > 0 and _is_word_char(lowered[start - 1]) and _is_word_char(lowered[start]):
+                    continue
+                if end < len(lowered) and _is_word_char(lowered[end]) and _is_word_char(lowered[end - 1]):
+                    continue
+                matches.append((start, end, canonical))
+        return matches
+
+    def extract(self, text: str) -> Optional[str]:
+        """가장 왼쪽에 있는 지명(겹치면 가장 긴 것)의 대표 이름을 반환한다."""
+        best = None
+        for start, end, canonical in self.find_all(text):
+            if best is None or start < best[0] or (start == best[0] and end > best[1]):
+                best = (start, end, canonical)
+        return best[2] if best else None
+
+    def extract_batch(self, texts: Iterable[str]) -> List[Optional[str]]:
+        extract = self.extract
+        return [extract(text) for text in texts]
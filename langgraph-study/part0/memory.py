@@ -2,12 +2,17 @@ from typing import Literal, Optional, TypedDict , Annotated
 from langgraph.graph import StateGraph, END
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langgraph.graph.message import add_messages
 from operator import itemgetter
 from langchain_core.messages import RemoveMessage
 from langchain.schema import HumanMessage, AIMessage
+from chain_registry import registry
+import os
+import sys
+# 스터디 루트의 common 패키지 (stream_coalesced) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import stream_coalesced
 load_dotenv()
 
 
@@ -69,9 +74,7 @@ def clarify_location(state: WeatherState):
 
 
 # 날씨 템플릿
-def generate_response(state: WeatherState):
-    # response = format_weather_response(state["location"], state["forecast"])
-    template_str = """당신은 유저의 질문과 제공되는 정보를 가지고 유저가 원하는 답변을 생성해주는 AI 입니다.
+GENERATE_RESPONSE_TEMPLATE = """당신은 유저의 질문과 제공되는 정보를 가지고 유저가 원하는 답변을 생성해주는 AI 입니다.
     
     유저 입력:
     {input}
@@ -82,11 +85,15 @@ def generate_response(state: WeatherState):
 
     한국어로 답변하세요.
     """
-    model = ChatOpenAI(model="gpt-4o")
-    prompt = PromptTemplate(
-        template=template_str, input_variables=["input", "location", "forecast"]
+
+
+# 체인은 처음 호출될 때 한 번만 만들고 이후에는 레지스트리에서 꺼내 쓴다.
+def build_generate_response_chain():
+    model = registry.model(ChatOpenAI, model="gpt-4o")
+    prompt = registry.prompt(
+        GENERATE_RESPONSE_TEMPLATE, input_variables=["input", "location", "forecast"]
     )
-    chain = (
+    return (
         {
             "input": itemgetter("messages"),
             "location": itemgetter("location"),
@@ -94,8 +101,13 @@ def generate_response(state: WeatherState):
         }
         | prompt
         | model
-        | StrOutputParser()
+        | registry.parser(StrOutputParser)
     )
+
+
+def generate_response(state: WeatherState):
+    # response = format_weather_response(state["location"], state["forecast"])
+    chain = registry.chain("memory.generate_response", build_generate_response_chain)
     response = chain.invoke(state)
     return {"messages": AIMessage(response)}
 
@@ -148,7 +160,9 @@ for event in output["messages"]:
     print(event.content)
 
 #마지막 응답만 출력
-for chunk_msg, metadata in graph.stream({"messages": ["거기 날씨가 뭐라고?"]}, config, stream_mode="messages"):
+# for chunk_msg, metadata in graph.stream({"messages": ["거기 날씨가 뭐라고?"]}, config, stream_mode="messages"):
+# token chunk 를 노드별로 50ms / 1KB 단위로 묶어서 받는다. (print 횟수가 token 수가 아니라 묶음 수)
+for chunk_msg, metadata in stream_coalesced(graph, {"messages": ["거기 날씨가 뭐라고?"]}, config, max_delay=0.05, max_bytes=1024):
     if metadata["langgraph_node"] == "generate_response":
         if chunk_msg.content:
             print(chunk_msg.content, end="", flush=True)
@@ -1,14 +1,41 @@
-from typing import Literal, Optional, TypedDict
+from typing import List, Literal, Optional, TypedDict
 from langgraph.graph import StateGraph, END , START
+from gazetteer import Gazetteer
 
 
-# 쿼리에서 "in" 다음에 오는 단어를 찾는 기능
+# 간단한 모의 날씨 데이터 (모듈 로드 시 한 번만 생성)
+WEATHER_DATA = {
+    "New York": "Sunny, 25°C",
+    "London": "Rainy, 15°C",
+    "Tokyo": "Cloudy, 20°C",
+    "Paris": "Partly cloudy, 22°C",
+}
+
+# 별칭 -> 대표 지명
+LOCATION_ALIASES = {
+    "NYC": "New York",
+    "뉴욕": "New York",
+    "런던": "London",
+    "도쿄": "Tokyo",
+    "파리": "Paris",
+}
+
+# 지명 사전은 한 번만 컴파일해두고 모든 쿼리에서 재사용
+GAZETTEER = Gazetteer.from_names(WEATHER_DATA, aliases=LOCATION_ALIASES)
+
+
+# 쿼리에서 지명을 찾는 기능
+# 사전에 있는 지명(여러 단어 포함)을 먼저 찾고, 없으면 "in" 다음에 오는 단어를 사용
 def extract_location(query: str) -> Optional[str]:
+    return GAZETTEER.extract(query) or word_after_in(query)
+
+
+def word_after_in(query: str) -> Optional[str]:
     words = query.split()
     if "in" in words:
         index = words.index("in")
         if index + 1 < len(words):
-            return words[index + 1]
+            return words[index + 1].strip("?!.,")
     return None
 
 
@@ -18,15 +45,8 @@ def is_ambiguous(location: str) -> bool:
     return len(location) < 3
 
 
-# 간단한 모의 날씨 데이터
 def fetch_weather_data(location: str) -> str:
-    weather_data = {
-        "New York": "Sunny, 25°C",
-        "London": "Rainy, 15°C",
-        "Tokyo": "Cloudy, 20°C",
-        "Paris": "Partly cloudy, 22°C",
-    }
-    return weather_data.get(location, "Weather data not available")
+    return WEATHER_DATA.get(location, "Weather data not available")
 
 
 def generate_location_clarification(location: str) -> str:
@@ -79,6 +99,24 @@ def check_location(state: WeatherState) -> Literal["valid", "invalid", "ambiguou
         return "valid"
 
 
+
+# 여러 쿼리를 한 번에 라우팅 (LLM 호출 없이 graph 를 거치지 않고 바로 처리)
+def parse_query_batch(queries: List[str]) -> List[WeatherState]:
+    results = []
+    for query, location in zip(queries, GAZETTEER.extract_batch(queries)):
+        if location is None:
+            location = word_after_in(query)
+        state = {"query": query, "location": location, "forecast": None, "response": None}
+        route = check_location(state)
+        if route == "valid":
+            state["forecast"] = fetch_weather_data(location)
+            state["response"] = format_weather_response(location, state["forecast"])
+        elif route == "ambiguous":
+            state["query"] = generate_location_clarification(location)
+        results.append(state)
+    return results
+
+
 from langgraph.graph import StateGraph, START, END
 
 graph_builder = StateGraph(WeatherState)
@@ -102,3 +140,19 @@ graph = graph_builder.compile()
 
 print(graph.invoke({"query": "What's the weather in London?" }))
 
+# 배치 라우팅 처리량 확인
+import time
+
+queries = [
+    "What's the weather in New York today?",
+    "뉴욕의 날씨 알려줘",
+    "How about in LA?",
+    "Is it raining in London?",
+    "Hello there",
+] * 2000
+
+start = time.perf_counter()
+routed = parse_query_batch(queries)
+elapsed = time.perf_counter() - start
+print(routed[:5])
+print(f"{len(queries)} queries routed in {elapsed:.3f}s ({len(queries) / elapsed:,.0f} queries/s)")
@@ -4,12 +4,18 @@ from langgraph.graph import START, END, StateGraph
 from typing import Literal, Optional, TypedDict, Annotated
 from langgraph.graph.message import add_messages
 from langchain_openai import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser, PydanticOutputParser
 from langchain.schema import HumanMessage, AIMessage
 from pydantic import BaseModel, Field
 from operator import itemgetter
 from dotenv import load_dotenv
+from chain_registry import registry
+from date_classifier import DateQuestionRouter
+import os
+import sys
+# 스터디 루트의 common 패키지 (stream_coalesced) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import stream_coalesced
 
 load_dotenv()
 
@@ -28,35 +34,79 @@ class State(TypedDict):
     weather: Optional[str]
     lock: bool
 
-def check_location(state: State) -> Literal["weather_tool", "generate_response"]:
-    class QuestionFilterResult(BaseModel):
-        result: bool = Field(
-            description="Whether the question is about datetime or not"
-        )
+class QuestionFilterResult(BaseModel):
+    result: bool = Field(
+        description="Whether the question is about datetime or not"
+    )
 
-    output_parser = PydanticOutputParser(pydantic_object=QuestionFilterResult)
 
-    template_str = """당신은 유저의 입력을 보고 날짜와 관련된 질문인지 아닌지 판별해주는 AI입니다.
+CHECK_LOCATION_TEMPLATE = """당신은 유저의 입력을 보고 날짜와 관련된 질문인지 아닌지 판별해주는 AI입니다.
     
     유저 입력:
     {input}
 
     {format_instruction}
     """
-    model = ChatOpenAI(model="gpt-4o")
-    prompt = PromptTemplate(
-        template=template_str,
+
+WEATHER_RESPONSE_TEMPLATE = """당신은 유저가 한 질문에 최대한 친절하고 정확하게 답변을 해주는 AI입니다.
+    다음 정보들을 보고 유저의 질문에 답을 해주세요.
+    
+    유저 입력:
+    {input}
+
+    날짜 정보:
+    {weather}"""
+
+RESPONSE_TEMPLATE = """당신은 유저가 한 질문에 최대한 친절하고 정확하게 답변을 해주는 AI입니다.
+    다음 정보들을 보고 유저의 질문에 답을 해주세요.
+    유저의 질문을 절대 출력하지마세요.
+    
+    유저 입력:
+    {input}"""
+
+
+# 체인 생성 함수: 레지스트리에서 처음 한 번만 호출되고 결과는 모든 노드 / thread 에서 공유된다.
+def build_check_location_chain():
+    output_parser = registry.parser(PydanticOutputParser, pydantic_object=QuestionFilterResult)
+    prompt = registry.prompt(
+        CHECK_LOCATION_TEMPLATE,
         input_variables=["input"],
         partial_variables={
             "format_instruction": output_parser.get_format_instructions()
         },
     )
+    return prompt | registry.model(ChatOpenAI, model="gpt-4o") | output_parser
+
+
+def build_weather_response_chain():
+    prompt = registry.prompt(WEATHER_RESPONSE_TEMPLATE, input_variables=["input", "weather"])
+    return (
+        prompt
+        | registry.model(ChatOpenAI, model="gpt-4o")
+        | registry.parser(StrOutputParser)
+    )
+
+
+def build_response_chain():
+    prompt = registry.prompt(RESPONSE_TEMPLATE, input_variables=["input"])
+    return (
+        prompt
+        | registry.model(ChatOpenAI, model="gpt-4o")
+        | registry.parser(StrOutputParser)
+    )
 
-    chain = prompt | model | output_parser
 
-    response = chain.invoke({"input": state["messages"][-1]})
+def llm_is_date_question(query: str) -> bool:
+    chain = registry.chain("sqlite_memory.check_location", build_check_location_chain)
+    return chain.invoke({"input": query}).result
 
-    return {"lock" : response.result}
+
+# 로컬 분류기(정규식 + 키워드 모델)로 먼저 판별하고 애매할 때만 gpt-4o 를 호출
+date_router = DateQuestionRouter(llm_is_date_question)
+
+
+def check_location(state: State) -> Literal["weather_tool", "generate_response"]:
+    return {"lock" : date_router(state["messages"][-1].content)}
 
 
 def state_func1(state: State):
@@ -71,25 +121,7 @@ def weather_tool(state: State):
 
 
 def weather_generate_response(state: State):
-    template_str = """당신은 유저가 한 질문에 최대한 친절하고 정확하게 답변을 해주는 AI입니다.
-    다음 정보들을 보고 유저의 질문에 답을 해주세요.
-    
-    유저 입력:
-    {input}
-
-    날짜 정보:
-    {weather}"""
-    model = ChatOpenAI(model="gpt-4o")
-    prompt = PromptTemplate(
-        template=template_str,
-        input_variables=["input", "weather"],
-    )
-
-    chain = (
-        prompt
-        | model
-        | StrOutputParser()
-    )
+    chain = registry.chain("sqlite_memory.weather_generate_response", build_weather_response_chain)
 
     response = chain.invoke({"input": state["messages"] , "weather" : state["weather"]})
 
@@ -97,23 +129,7 @@ def weather_generate_response(state: State):
 
 
 def generate_response(state: State):
-    template_str = """당신은 유저가 한 질문에 최대한 친절하고 정확하게 답변을 해주는 AI입니다.
-    다음 정보들을 보고 유저의 질문에 답을 해주세요.
-    유저의 질문을 절대 출력하지마세요.
-    
-    유저 입력:
-    {input}"""
-    model = ChatOpenAI(model="gpt-4o")
-    prompt = PromptTemplate(
-        template=template_str,
-        input_variables=["input"],
-    )
-
-    chain = (
-        prompt
-        | model
-        | StrOutputParser()
-    )
+    chain = registry.chain("sqlite_memory.generate_response", build_response_chain)
 
     response = chain.invoke({"input" : state["messages"]})
     return {"messages": [AIMessage(response)]}
@@ -151,8 +167,12 @@ for event in graph.stream(
     for value in event.values():
         value["messages"][-1].pretty_print()
 
-for chunk_msg, metadata in graph.stream(
-    {"messages": ["내가 무슨 질문을 했었지?"]}, config = config, stream_mode="messages"
+# for chunk_msg, metadata in graph.stream(
+#     {"messages": ["내가 무슨 질문을 했었지?"]}, config = config, stream_mode="messages"
+# ):
+# token chunk 를 노드별로 50ms / 1KB 단위로 묶어서 받는다. (print 횟수가 token 수가 아니라 묶음 수)
+for chunk_msg, metadata in stream_coalesced(
+    graph, {"messages": ["내가 무슨 질문을 했었지?"]}, config, max_delay=0.05, max_bytes=1024
 ):  
     # if metadata["langgraph_node"] == "weather_generate_response":
     #     if chunk_msg.content:
@@ -161,3 +181,6 @@ for chunk_msg, metadata in graph.stream(
     if metadata["langgraph_node"] == "generate_response":
         if chunk_msg.content:
             print(chunk_msg.content, end="", flush=True)
+
+print()
+print("date router :", date_router.stats())
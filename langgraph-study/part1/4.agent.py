@@ -1,13 +1,19 @@
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph import MessagesState
-from langgraph.prebuilt import ToolNode
 from langgraph.prebuilt import tools_condition
+from parallel_tool_node import ParallelToolNode
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from typing import TypedDict, Annotated
 from langchain_core.messages import AnyMessage
 from langgraph.graph.message import add_messages
+from langchain_core.runnables import RunnableConfig
 from dotenv import load_dotenv
+import os
+import sys
+# 스터디 루트의 common 패키지 (PromptAssembler) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import CachedPrefixChatOpenAI, PromptAssembler
 
 load_dotenv()
 
@@ -50,7 +56,14 @@ def divide(a: int, b: int) -> float:
    """
     return a / b
 
-llm = ChatOpenAI(model="gpt-4o")
+sys_msg = SystemMessage(content="You are a helpful assistant tasked with performing arithmetic on a set of inputs.")
+
+# [sys_msg] + state["messages"] 를 매번 새로 만들고 전부 직렬화하는 대신,
+# thread 마다 이미 보낸 prefix 를 재사용하고 새 메시지만 붙인다.
+prompt_assembler = PromptAssembler(sys_msg)
+
+# llm = ChatOpenAI(model="gpt-4o")
+llm = CachedPrefixChatOpenAI(model="gpt-4o", prompt_assembler=prompt_assembler)
 
 tools = [divide, add , multiply]
 
@@ -59,23 +72,22 @@ llm_with_tools = llm.bind_tools(tools)
 from langgraph.graph import MessagesState
 from langchain_core.messages import HumanMessage, SystemMessage
 
-sys_msg = SystemMessage(content="You are a helpful assistant tasked with performing arithmetic on a set of inputs.")
-
-def assistant(state: MessagesState):
+def assistant(state: MessagesState, config: RunnableConfig):
     return {
-        "messages": [llm_with_tools.invoke([sys_msg] + state["messages"])]
+        "messages": [llm_with_tools.invoke(prompt_assembler.assemble(state["messages"], config))]
     }
 
 from langgraph.graph import START, StateGraph
 from langgraph.prebuilt import tools_condition
-from langgraph.prebuilt import ToolNode
 
 # Graph
 builder = StateGraph(MessagesState)
 
 # Define nodes: these do the work
 builder.add_node("assistant", assistant)
-builder.add_node("tools", ToolNode(tools))
+# builder.add_node("tools", ToolNode(tools))
+# 여러 개의 tool call 을 동시에 실행 (sync tool 은 thread pool, async tool 은 coroutine)
+builder.add_node("tools", ParallelToolNode(tools))
 
 # Define edges: these determine how the control flow moves
 builder.add_edge(START, "assistant")
@@ -87,7 +99,8 @@ builder.add_edge("tools", "assistant")
 react_graph = builder.compile()
 
 messages = [HumanMessage(content="Add 3 and 4. Multiply the output by 2. Divide the output by 5")]
-messages = react_graph.invoke({"messages" : messages})
+# prefix 는 thread_id 별로 캐시된다.
+messages = react_graph.invoke({"messages" : messages}, {"configurable": {"thread_id": "1"}})
 
 for m in messages['messages']:
     m.pretty_print()
@@ -1,7 +1,7 @@
 from langgraph.graph import StateGraph, START
 from langgraph.graph import MessagesState
-from langgraph.prebuilt import ToolNode
 from langgraph.prebuilt import tools_condition
+from parallel_tool_node import ParallelToolNode
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 from dotenv import load_dotenv
@@ -65,14 +65,15 @@ def assistant(state: MessagesState):
 
 from langgraph.graph import START, StateGraph
 from langgraph.prebuilt import tools_condition
-from langgraph.prebuilt import ToolNode
 
 # Graph
 builder = StateGraph(MessagesState)
 
 # Define nodes: these do the work
 builder.add_node("assistant", assistant)
-builder.add_node("tools", ToolNode(tools))
+# builder.add_node("tools", ToolNode(tools))
+# 여러 개의 tool call 을 동시에 실행 (sync tool 은 thread pool, async tool 은 coroutine)
+builder.add_node("tools", ParallelToolNode(tools))
 
 # Define edges: these determine how the control flow moves
 builder.add_edge(START, "assistant")
@@ -84,8 +85,15 @@ builder.add_edge("tools", "assistant")
 
 #memory 추가
 from langgraph.checkpoint.memory import MemorySaver
-
-memory = MemorySaver()
+import os
+import sys
+# 스터디 루트의 common 패키지 (BoundedMemorySaver) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import BoundedMemorySaver
+
+# memory = MemorySaver()
+# thread 마다 최신 checkpoint 10개만 남기고, 전체 64MB 를 넘으면 오래 안 쓴 thread 부터 내보낸다.
+memory = BoundedMemorySaver(max_bytes=64 * 1024 * 1024, max_checkpoints=10)
 
 react_graph = builder.compile(checkpointer=memory)
 
@@ -0,0 +1,48 @@
+from langgraph.graph import StateGraph, START
+from langgraph.graph import MessagesState
+from langgraph.prebuilt import tools_condition
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import AIMessage, HumanMessage
+from dotenv import load_dotenv
+from arithmetic_plan import ArithmeticPlanNode, plan_sys_msg, plan_tools
+
+load_dotenv()
+
+# 4.agent.py 는 연산 하나마다 assistant -> tools -> assistant 를 반복해서
+# "Add 3 and 4. Multiply the output by 2. Divide the output by 5" 에 LLM 호출이 4번 필요하다.
+# plan 모드에서는 assistant 가 세 개의 tool call 을 한 번에 만들고 ("$1", "$2" 로 앞의 결과를 참조),
+# ArithmeticPlanNode 가 로컬에서 한 번에 계산하기 때문에 LLM 호출이 2번으로 줄어든다.
+
+llm = ChatOpenAI(model="gpt-4o")
+
+llm_with_tools = llm.bind_tools(plan_tools)
+
+def assistant(state: MessagesState):
+    return {
+        "messages": [llm_with_tools.invoke([plan_sys_msg] + state["messages"])]
+    }
+
+# Graph
+builder = StateGraph(MessagesState)
+
+# Define nodes: these do the work
+builder.add_node("assistant", assistant)
+builder.add_node("tools", ArithmeticPlanNode())
+
+# Define edges: these determine how the control flow moves
+builder.add_edge(START, "assistant")
+builder.add_conditional_edges(
+"assistant",
+tools_condition,
+)
+builder.add_edge("tools", "assistant")
+react_graph = builder.compile()
+
+messages = [HumanMessage(content="Add 3 and 4. Multiply the output by 2. Divide the output by 5")]
+messages = react_graph.invoke({"messages" : messages})
+
+for m in messages['messages']:
+    m.pretty_print()
+
+# AIMessage 개수 = LLM 호출 횟수
+print("LLM calls :", sum(isinstance(m, AIMessage) for m in messages['messages']))
@@ -0,0 +1,156 @@
+# "Add 3 and 4. Multiply the output by 2. Divide the output by 5" 같은 요청을
+# assistant -> tools -> assistant 를 연산 개수만큼 반복하지 않고 한 번의 tools 단계에서 끝내기 위한 모듈
+#
+# plan 모드에서는 assistant 가 add / multiply / divide 호출을 한 메시지에 모두 만들고,
+# 앞선 호출의 결과는 "$1", "$2" ... (같은 메시지 안에서 몇 번째 tool call 인지, 1부터 시작) 로 참조한다.
+# ArithmeticPlanNode 가 참조 관계를 따라 로컬에서 순서대로 계산하기 때문에
+# 3단계 계산도 LLM 호출은 2번 (계획 1번 + 최종 답변 1번) 이면 된다.
+import operator
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from langchain_core.messages import AIMessage, SystemMessage, ToolCall, ToolMessage
+from langchain_core.tools import tool
+
+Operand = Union[float, str]
+
+OPERATIONS: Dict[str, Callable[[float, float], float]] = {
+    "add": operator.add,
+    "multiply": operator.mul,
+    "divide": operator.truediv,
+}
+
+plan_sys_msg = SystemMessage(
+    content=(
+        "You are a helpful assistant tasked with performing arithmetic on a set of inputs. "
+        "When a task needs several arithmetic steps, emit ALL the tool calls in a single message. "
+        'To use the result of an earlier tool call in the same message, pass "$1", "$2", ... '
+        "(the 1-based position of that tool call) instead of a number."
+    )
+)
+
+
+# plan 모드에서 모델에 바인딩할 tool 들. 인자로 숫자 또는 "$N" 참조를 받는다.
+@tool
+def add(a: Operand, b: Operand) -> float:
+    """Adds two numbers.
+
+    Args:
+        a: first number, or "$N" for the result of the N-th tool call in this message
+        b: second number, or "$N" for the result of the N-th tool call in this message
+    """
+    return OPERATIONS["add"](float(a), float(b))
+
+
+@tool
+def multiply(a: Operand, b: Operand) -> float:
+    """Multiplies two numbers.
+
+    Args:
+        a: first number, or "$N" for the result of the N-th tool call in this message
+        b: second number, or "$N" for the result of the N-th tool call in this message
+    """
+    return OPERATIONS["multiply"](float(a), float(b))
+
+
+@tool
+def divide(a: Operand, b: Operand) -> float:
+    """Divides a by b.
+
+    Args:
+        a: dividend, or "$N" for the result of the N-th tool call in this message
+        b: divisor, or "$N" for the result of the N-th tool call in this message
+    """
+    return OPERATIONS["divide"](float(a), float(b))
+
+
+plan_tools = [add, multiply, divide]
+
+
+class PlanError(Exception):
+    pass
+
+
+def evaluate_plan(tool_calls: List[ToolCall]) -> List[Union[float, Exception]]:
+    """
+    tool call 목록을 참조 관계에 따라 계산해서 호출 순서대로 결과(또는 예외)를 반환한다.
+
+    참조는 앞/뒤 어느 위치든 가능하고, 순환 참조는 PlanError 로 처리한다.
+    """
+    results: Dict[int, Union[float, Exception]] = {}
+    visiting = set()
+
+    def operand(value: Any, index: int) -> float:
+        if isinstance(value, str) and value.strip().startswith("$"):
+            ref = int(value.strip()[1:]) - 1
+            if not 0 <= ref < len(tool_calls) or ref == index:
+                raise PlanError(f"invalid reference {value!r}")
+            result = run(ref)
+            if isinstance(result, Exception):
+                raise PlanError(f"depends on failed call {value}: {result!r}")
+            return result
+        return float(value)
+
+    def run(index: int) -> Union[float, Exception]:
+        if index in results:
+            return results[index]
+        if index in visiting:
+            raise PlanError(f"circular reference at ${index + 1}")
+        visiting.add(index)
+        call = tool_calls[index]
+        try:
+            op = OPERATIONS.get(call["name"])
+            if op is None:
+                raise PlanError(f"{call['name']} is not an arithmetic tool")
+            args = call["args"]
+            results[index] = op(operand(args["a"], index), operand(args["b"], index))
+        except Exception as e:
+            results[index] = e
+        finally:
+            visiting.discard(index)
+        return results[index]
+
+    return [run(i) for i in range(len(tool_calls))]
+
+
+class ArithmeticPlanNode:
+    """
+    마지막 AIMessage 의 arithmetic tool call 들을 한 번에 로컬에서 계산하는 tools 노드입니다.
+
+    Args:
+        fallback: add / multiply / divide 가 아닌 tool call 이 섞여 있을 때 나머지를 실행할 노드 (예: ToolNode)
+    """
+
+    def __init__(self, fallback: Optional[Any] = None):
+        self.fallback = fallback
+
+    def __call__(self, state: dict) -> dict:
+        message = state["messages"][-1]
+        if not isinstance(message, AIMessage):
+            raise ValueError("No AIMessage found in input")
+        tool_calls = message.tool_calls
+
+        if self.fallback is not None and any(c["name"] not in OPERATIONS for c in tool_calls):
+            others = [c for c in tool_calls if c["name"] not in OPERATIONS]
+            arithmetic = [c for c in tool_calls if c["name"] in OPERATIONS]
+            other_output = self.fallback.invoke({"messages": [AIMessage(content="", tool_calls=others)]})
+            by_id = {m.tool_call_id: m for m in other_output["messages"]}
+            by_id.update({m.tool_call_id: m for m in self._evaluate(arithmetic)})
+            return {"messages": [by_id[c["id"]] for c in tool_calls]}
+
+        return {"messages": self._evaluate(tool_calls)}
+
+    def _evaluate(self, tool_calls: List[ToolCall]) -> List[ToolMessage]:
+        messages = []
+        for call, result in zip(tool_calls, evaluate_plan(tool_calls)):
+            if isinstance(result, Exception):
+                messages.append(
+                    ToolMessage(
+                        content=f"Error: {result!r}\n Please fix your mistakes.",
+                        name=call["name"],
+                        tool_call_id=call["id"],
+                        status="error",
+                    )
+                )
+            else:
+                messages.append(ToolMessage(content=str(result), name=call["name"], tool_call_id=call["id"]))
+        return messages
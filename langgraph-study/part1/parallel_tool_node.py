@@ -0,0 +1,172 @@
+# 모델이 한 turn 에 여러 개의 독립적인 tool call 을 만들었을 때 동시에 실행하는 ToolNode
+#   - sync tool  : 프로세스 전체에서 공유하는 크기 제한 thread pool 에서 실행
+#   - async tool : coroutine 으로 실행 (sync graph 에서도 이벤트 루프 하나에서 함께 실행)
+#   - 결과 ToolMessage 는 원래 tool_call 순서대로 합친다.
+#   - tool call 마다 걸린 시간을 ToolMessage.response_metadata["elapsed_ms"] 와 stats() 로 제공
+# tools 단계의 시간이 "모든 tool 시간의 합" 이 아니라 "가장 느린 tool 의 시간" 이 된다.
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from langchain_core.messages import AIMessage, ToolCall, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langchain_core.tools import BaseTool
+from langchain_core.tools import tool as create_tool
+from langgraph.errors import GraphBubbleUp
+from langgraph.utils.runnable import RunnableCallable
+
+
+class ParallelToolNode(RunnableCallable):
+    """
+    마지막 AIMessage 의 tool_calls 를 동시에 실행하는 노드입니다. ToolNode 대신 그대로 사용할 수 있습니다.
+
+    Args:
+        tools: 실행할 tool 목록 (함수 또는 BaseTool)
+        max_workers: sync tool 을 실행할 thread pool 크기 (모든 thread / run 이 공유)
+        name: 노드 이름
+        messages_key: state 에서 메시지 목록이 들어있는 key
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[Union[BaseTool, Callable]],
+        *,
+        max_workers: int = 8,
+        name: str = "tools",
+        messages_key: str = "messages",
+    ) -> None:
+        super().__init__(self._func, self._afunc, name=name, trace=False)
+        self.tools_by_name: Dict[str, BaseTool] = {}
+        for tool_ in tools:
+            if not isinstance(tool_, BaseTool):
+                tool_ = create_tool(tool_)
+            self.tools_by_name[tool_.name] = tool_
+        self.messages_key = messages_key
+        self.max_workers = max_workers
+        # tools 단계마다 pool 을 새로 만들지 않고 재사용한다. (context 를 복사해서 callback / tracing 유지)
+        self._pool = ContextThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+
+    # ------------------------------------------------------------------ helpers
+
+    def _tool_calls(self, input: Any) -> List[ToolCall]:
+        if isinstance(input, list):
+            messages = input
+        elif isinstance(input, dict):
+            messages = input.get(self.messages_key, [])
+        else:
+            messages = getattr(input, self.messages_key, [])
+        if not messages or not isinstance(messages[-1], AIMessage):
+            raise ValueError("No AIMessage found in input")
+        return messages[-1].tool_calls
+
+    def _is_async(self, call: ToolCall) -> bool:
+        tool_ = self.tools_by_name.get(call["name"])
+        return getattr(tool_, "coroutine", None) is not None
+
+    def _invalid_tool(self, call: ToolCall) -> ToolMessage:
+        return ToolMessage(
+            content=f"Error: {call['name']} is not a valid tool, try one of [{', '.join(self.tools_by_name)}].",
+            name=call["name"],
+            tool_call_id=call["id"],
+            status="error",
+        )
+
+    def _error(self, call: ToolCall, e: Exception) -> ToolMessage:
+        return ToolMessage(
+            content=f"Error: {repr(e)}\n Please fix your mistakes.",
+            name=call["name"],
+            tool_call_id=call["id"],
+            status="error",
+        )
+
+    def _record(self, message: ToolMessage, name: str, elapsed: float) -> ToolMessage:
+        elapsed_ms = elapsed * 1000
+        message.response_metadata = {**message.response_metadata, "elapsed_ms": elapsed_ms}
+        with self._stats_lock:
+            stat = self._stats[name]
+            stat["calls"] += 1
+            stat["total_ms"] += elapsed_ms
+            stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+        return message
+
+    def _run_one(self, call: ToolCall, config: RunnableConfig) -> ToolMessage:
+        if call["name"] not in self.tools_by_name:
+            return self._invalid_tool(call)
+        start = time.perf_counter()
+        try:
+            message = self.tools_by_name[call["name"]].invoke({**call, "type": "tool_call"}, config)
+        except GraphBubbleUp:
+            raise
+        except Exception as e:
+            message = self._error(call, e)
+        return self._record(message, call["name"], time.perf_counter() - start)
+
+    async def _arun_one(self, call: ToolCall, config: RunnableConfig) -> ToolMessage:
+        if call["name"] not in self.tools_by_name:
+            return self._invalid_tool(call)
+        start = time.perf_counter()
+        try:
+            message = await self.tools_by_name[call["name"]].ainvoke({**call, "type": "tool_call"}, config)
+        except GraphBubbleUp:
+            raise
+        except Exception as e:
+            message = self._error(call, e)
+        return self._record(message, call["name"], time.perf_counter() - start)
+
+    # ------------------------------------------------------------------ node
+
+    def _func(self, input: Any, config: RunnableConfig) -> Any:
+        tool_calls = self._tool_calls(input)
+        outputs: List[Optional[ToolMessage]] = [None] * len(tool_calls)
+
+        futures = {
+            i: self._pool.submit(self._run_one, call, config)
+            for i, call in enumerate(tool_calls)
+            if not self._is_async(call)
+        }
+        # async tool 은 현재 thread 에서 이벤트 루프 하나로 모아서 실행 (sync tool 은 pool 에서 동시에 진행 중)
+        async_calls = [(i, call) for i, call in enumerate(tool_calls) if self._is_async(call)]
+        if async_calls:
+
+            async def run_async():
+                return await asyncio.gather(*(self._arun_one(call, config) for _, call in async_calls))
+
+            try:
+                asyncio.get_running_loop()
+                in_loop = True
+            except RuntimeError:
+                in_loop = False
+            if in_loop:
+                # 이미 이벤트 루프가 돌고 있는 thread 면 (예: 노트북) pool thread 에서 실행
+                messages = self._pool.submit(asyncio.run, run_async()).result()
+            else:
+                messages = asyncio.run(run_async())
+            for (i, _), message in zip(async_calls, messages):
+                outputs[i] = message
+        for i, future in futures.items():
+            outputs[i] = future.result()
+
+        return outputs if isinstance(input, list) else {self.messages_key: outputs}
+
+    async def _afunc(self, input: Any, config: RunnableConfig) -> Any:
+        tool_calls = self._tool_calls(input)
+        loop = asyncio.get_running_loop()
+
+        def run(call: ToolCall):
+            if self._is_async(call):
+                return self._arun_one(call, config)
+            # sync tool 은 기본 executor 가 아니라 크기가 제한된 공유 pool 로 보낸다.
+            return loop.run_in_executor(self._pool, self._run_one, call, config)
+
+        outputs = await asyncio.gather(*(run(call) for call in tool_calls))
+        return list(outputs) if isinstance(input, list) else {self.messages_key: list(outputs)}
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """tool 이름별 호출 수 / 총 시간 / 최대 시간 (ms)"""
+        with self._stats_lock:
+            return {name: dict(stat) for name, stat in self._stats.items()}
@@ -69,3 +69,34 @@ try:
     state = PydanticState(name="hyeonsang", mode="hahaha")
 except ValidationError as e:
     print("Validation Error:", e)
+
+# -------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Pydantic state 를 그대로 StateGraph 에 쓰면 노드를 실행할 때마다 PydanticState(**state) 로 state 전체를 다시 검증한다.
+# ChangedKeysValidator 는 state 는 TypedDict 로 두고, 노드가 반환한 key 만 PydanticState 의 validator (@validator 포함) 로 검증한다.
+import os
+import sys
+# 스터디 루트의 common 패키지 (ChangedKeysValidator) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import ChangedKeysValidator
+
+validator = ChangedKeysValidator(PydanticState)
+
+# builder = StateGraph(PydanticState)
+builder = StateGraph(TypeDictState)
+builder.add_node("node_1", validator.node(node_1))
+builder.add_node("node_2", validator.node(node_2))
+builder.add_node("node_3", validator.node(node_3))
+
+builder.add_edge(START, "node_1")
+builder.add_conditional_edges("node_1", decide_mode)
+builder.add_edge("node_2", END)
+builder.add_edge("node_3", END)
+
+graph = builder.compile()
+
+# 입력은 한 번 전체 검증해서 넘긴다. (잘못된 입력은 그래프를 실행하기 전에 ValidationError)
+print(graph.invoke(validator.validate_input({"name": "hyeonsang", "mode": "sad"})))
+try:
+    graph.invoke(validator.validate_input({"name": "hyeonsang", "mode": "hahaha"}))
+except ValidationError as e:
+    print("Validation Error:", e)
@@ -38,10 +38,17 @@ graph = builder.compile()
 #------------------------------------------------------------------------------------------------------------------------------------------------
 from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
-from operator import add
+# from operator import add
 from typing import Annotated
+import os
+import sys
+# 스터디 루트의 common 패키지 (append_log) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import append_log
 class State(TypedDict):
-    foo: Annotated[list[int] , add]
+    # foo: Annotated[list[int] , add]
+    # operator.add 는 업데이트마다 리스트 전체를 복사한다. append_log 는 chunk 를 공유하면서 O(1) 로 붙인다.
+    foo: Annotated[list[int] , append_log]
 
 def node_1(state):
     print("---Node 1---")
@@ -67,10 +74,17 @@ graph = builder.compile()
 #---------------------------------------------------------------------------------------------------------------------------------
 from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
-from operator import add
+# from operator import add
 from typing import Annotated
+import os
+import sys
+# 스터디 루트의 common 패키지 (append_log) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import append_log
 class State(TypedDict):
-    foo: Annotated[list[int] , add]
+    # foo: Annotated[list[int] , add]
+    # operator.add 는 업데이트마다 리스트 전체를 복사한다. append_log 는 chunk 를 공유하면서 O(1) 로 붙인다.
+    foo: Annotated[list[int] , append_log]
 
 def node_1(state):
     print("---Node 1---")
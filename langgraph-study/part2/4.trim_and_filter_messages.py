@@ -51,18 +51,30 @@ graph = builder.compile()
 
 #---------------------------------------------------------------------------------------------------------------------------------------------------------------
 from langchain_core.messages import RemoveMessage
+from typing import Annotated
+from langchain_core.messages import AnyMessage
+import sys
+# 스터디 루트의 common 패키지 (add_messages_indexed) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import add_messages_indexed
+
+# add_messages 는 RemoveMessage 가 올 때마다 전체 리스트를 다시 만든다.
+# add_messages_indexed 는 id 인덱스로 지우고 (tombstone) 필요할 때 한 번에 압축한다.
+class FilterState(MessagesState):
+    messages: Annotated[list[AnyMessage], add_messages_indexed]
 
 # Nodes
-def filter_messages(state: MessagesState):
+def filter_messages(state: FilterState):
     # Delete all but the 2 most recent messages
     delete_messages = [RemoveMessage(id=m.id) for m in state["messages"][:-2]]
     return {"messages": delete_messages}
 
-def chat_model_node(state: MessagesState):
-    return {"messages": [model.invoke(state["messages"])]}
+def chat_model_node(state: FilterState):
+    return {"messages": [model.invoke(list(state["messages"]))]}
 
 # Build graph
-builder = StateGraph(MessagesState)
+# builder = StateGraph(MessagesState)
+builder = StateGraph(FilterState)
 builder.add_node("filter", filter_messages)
 builder.add_node("chat_model", chat_model_node)
 builder.add_edge(START, "filter")
@@ -93,13 +105,27 @@ messages.append(HumanMessage("Tell me more about Narwhals!", name="Lance"))
 #---------------------------------------------------------------------------------------Add trim
 from langchain_core.messages import trim_messages
 from langchain_openai import ChatOpenAI
+from langchain_core.runnables import RunnableConfig
+from common import MessageTokenCounter
+
+# token 수를 세려고 매 턴 ChatOpenAI 를 만들고 history 전체를 다시 tokenize 하지 않도록
+# 메시지별 token 수를 캐시하고 thread 별 누적 합 위에서 이진 탐색으로 trim 한다. (Azure deployment 에서도 동작)
+token_counter = MessageTokenCounter(model="gpt-4o")
+
 # Node
-def chat_model_node(state: MessagesState):
-    messages = trim_messages(
+def chat_model_node(state: MessagesState, config: RunnableConfig):
+    # messages = trim_messages(
+    #     state["messages"],
+    #     max_tokens=100,
+    #     strategy="last",
+    #     token_counter=ChatOpenAI(model="gpt-4o"),
+    #     allow_partial=True,
+    # )
+    messages = token_counter.trim(
         state["messages"],
+        config,
         max_tokens=100,
         strategy="last",
-        token_counter=ChatOpenAI(model="gpt-4o"),
         allow_partial=True,
     )
     return {"messages": [model.invoke(messages)]}
@@ -118,4 +144,5 @@ for m in trim_output['messages']:
     m.pretty_print()
 
 #trim을 사용하면 삭제되었던 메시지도 다시 다 출력된다.
-#trim 사용할 때 주의할 점은 AzureChatOpenAI는 지원하지 않는다.
\ No newline at end of file
+#trim 사용할 때 주의할 점은 AzureChatOpenAI는 지원하지 않는다.
+#(AzureChatOpenAI 를 token_counter 로 넘기는 경우. MessageTokenCounter 는 모델 이름으로 tiktoken encoding 을 골라서 Azure 에서도 쓸 수 있다.)
\ No newline at end of file
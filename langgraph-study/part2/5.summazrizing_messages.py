@@ -4,24 +4,38 @@ from langchain_openai import AzureChatOpenAI
 from langgraph.graph import MessagesState
 from langchain_core.messages import SystemMessage, HumanMessage, RemoveMessage
 from langgraph.graph import StateGraph, START, END
+from langchain_core.runnables import RunnableConfig
+import sys
+# 스터디 루트의 common 패키지 (BoundedMemorySaver, PromptAssembler) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import BackgroundSummarizer, BoundedMemorySaver, CachedPrefixAzureChatOpenAI, PromptAssembler, add_messages_indexed
+from typing import Annotated
+from langchain_core.messages import AnyMessage
 
 api_key = os.getenv('AZURE_OPENAI_API_KEY')
 endpoint = os.getenv('AZURE_OPENAI_ENDPOINT')
 str_apiversion = os.getenv("OPENAI_API_VERSION")
 
-model = AzureChatOpenAI(
+# 요약 전까지는 thread 마다 이미 보낸 prefix 를 재사용하고 새 메시지만 붙인다.
+# (요약으로 메시지가 지워지거나 summary 가 바뀌면 prefix 를 다시 만든다.)
+prompt_assembler = PromptAssembler()
+
+model = CachedPrefixAzureChatOpenAI(
     azure_deployment="gpt-4o",
     azure_endpoint = endpoint,
     api_key = api_key,
     api_version =str_apiversion,
     temperature=0.2,
+    prompt_assembler=prompt_assembler,
 )
 
 class State(MessagesState):
+    # summarize_conversation 이 최근 2개만 남기고 지우기 때문에 id 인덱스로 지우는 리듀서를 쓴다.
+    messages: Annotated[list[AnyMessage], add_messages_indexed]
     summary : str 
 
 # Define the logic to call the model
-def call_model(state: State):
+def call_model(state: State, config: RunnableConfig):
 
     # Get summary if it exists
     summary = state.get("summary", "")
@@ -33,10 +47,11 @@ def call_model(state: State):
         system_message = f"Summary of conversation earlier: {summary}"
 
         # Append summary to any newer messages
-        messages = [SystemMessage(content=system_message)] + state["messages"]
+        # messages = [SystemMessage(content=system_message)] + state["messages"]
+        messages = prompt_assembler.assemble(state["messages"], config, system=SystemMessage(content=system_message))
 
     else:
-        messages = state["messages"]
+        messages = prompt_assembler.assemble(state["messages"], config)
 
     response = model.invoke(messages)
     return {"messages": response}
@@ -91,42 +106,63 @@ workflow.add_node(summarize_conversation)
 # Set the entrypoint as conversation
 workflow.add_edge(START, "conversation")
 
-workflow.add_conditional_edges("conversation", should_continue)
+# workflow.add_conditional_edges("conversation", should_continue)
+# 요약은 응답을 돌려준 뒤 BackgroundSummarizer 가 background 에서 실행한다. (요약 노드는 update_state 의 as_node 로만 쓴다)
+workflow.add_edge("conversation", END)
 workflow.add_edge("summarize_conversation", END)
 
 # Compile
-memory = MemorySaver()
+# memory = MemorySaver()
+# 최신 checkpoint 10개만 남기고, 1시간 동안 대화가 없는 thread 는 파일로 내보냈다가 다시 접근하면 불러온다.
+# (spill 파일은 실행 위치와 상관없이 이 파일 옆 state_db 에 만든다. .gitignore 에 등록되어 있다)
+spill_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "state_db", "spill.db")
+memory = BoundedMemorySaver(max_checkpoints=10, ttl=3600, spill_path=spill_path)
 graph = workflow.compile(checkpointer=memory)
 
+# 턴이 끝나면 메시지가 6개를 넘었는지 보고 background 에서 요약 + 메시지 삭제를 checkpoint 하나로 반영한다.
+summarizer = BackgroundSummarizer(
+    graph,
+    summarize_conversation,
+    should_summarize=lambda state: should_continue(state) == "summarize_conversation",
+)
+
 # Create a thread
 config = {"configurable": {"thread_id": "1"}}
 
 # Start conversation
 input_message = HumanMessage(content="hi! I'm Lance")
-output = graph.invoke({"messages": [input_message]}, config)
+with summarizer.turn(config):
+    output = graph.invoke({"messages": [input_message]}, config)
 for m in output['messages'][-1:]:
     m.pretty_print()
 
 input_message = HumanMessage(content="what's my name?")
-output = graph.invoke({"messages": [input_message]}, config)
+with summarizer.turn(config):
+    output = graph.invoke({"messages": [input_message]}, config)
 for m in output['messages'][-1:]:
     m.pretty_print()
 
 input_message = HumanMessage(content="i like the 49ers!")
-output = graph.invoke({"messages": [input_message]}, config)
+with summarizer.turn(config):
+    output = graph.invoke({"messages": [input_message]}, config)
 for m in output['messages'][-1:]:
     m.pretty_print()
 
+summarizer.wait(config)  # background 요약이 끝난 뒤의 summary 를 본다.
 output = graph.get_state(config).values.get("summary" ,"")
 
 print("1.output :", output)
 
 input_message = HumanMessage(content="i like Nick Bosa, isn't he the highest paid defensive player?")
-output = graph.invoke({"messages": [input_message]}, config)
+with summarizer.turn(config):
+    output = graph.invoke({"messages": [input_message]}, config)
 for m in output['messages'][-1:]:
     m.pretty_print()
 
 
+summarizer.wait(config)  # background 요약이 끝난 뒤의 summary 를 본다.
 output = graph.get_state(config).values.get("summary" ,"")
 
-print("2.output :", output)
\ No newline at end of file
+print("2.output :", output)
+
+summarizer.close()
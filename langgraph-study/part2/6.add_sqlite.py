@@ -1,14 +1,18 @@
-import sqlite3
-# In memory
-conn = sqlite3.connect(":memory:")
-
-# Saved to local db
-db_path = "state_db/example.db"
-conn = sqlite3.connect(db_path, check_same_thread=False)
+import os
+import sys
+# 스터디 루트의 common 패키지 (BackgroundSummarizer) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import BackgroundSummarizer
 
 # Here is our checkpointer
-from langgraph.checkpoint.sqlite import SqliteSaver
-memory = SqliteSaver(conn)
+# memory = SqliteSaver(conn)
+
+# checkpoint 마다 전체 history 를 다시 쓰지 않고 부모 대비 바뀐 채널만 (메시지는 내용 hash 로 한 번만) 저장한다.
+# DeltaSqliteSaver 는 db 에 delta_checkpoints / blobs 테이블을 추가하기 때문에 커밋된 state_db/example.db 는 건드리지 않고
+# 이 파일 옆의 state_db/delta_example.db (gitignore) 를 쓴다.
+from delta_sqlite_saver import DeltaSqliteSaver
+db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "state_db", "delta_example.db")
+memory = DeltaSqliteSaver(db_path, snapshot_every=50)
 
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage, RemoveMessage
@@ -85,29 +89,47 @@ workflow.add_node(summarize_conversation)
 # Set the entrypoint as conversation
 workflow.add_edge(START, "conversation")
 
-workflow.add_conditional_edges("conversation", should_continue)
+# workflow.add_conditional_edges("conversation", should_continue)
+# 요약은 응답을 돌려준 뒤 background 에서 실행한다.
+workflow.add_edge("conversation", END)
 workflow.add_edge("summarize_conversation", END)
 
 # Compile
 graph = workflow.compile(checkpointer=memory)
 
+# 요약 LLM 호출을 사용자 턴에서 빼고, 요약 + 메시지 삭제는 sqlite checkpoint 하나로 반영한다.
+summarizer = BackgroundSummarizer(
+    graph,
+    summarize_conversation,
+    should_summarize=lambda state: should_continue(state) == "summarize_conversation",
+)
+
 # Create a thread
 config = {"configurable": {"thread_id": "1"}}
 
 # Start conversation
 input_message = HumanMessage(content="hi! I'm Lance")
-output = graph.invoke({"messages": [input_message]}, config)
+with summarizer.turn(config):
+    output = graph.invoke({"messages": [input_message]}, config)
 for m in output['messages'][-1:]:
     m.pretty_print()
 
 input_message = HumanMessage(content="what's my name?")
-output = graph.invoke({"messages": [input_message]}, config)
+with summarizer.turn(config):
+    output = graph.invoke({"messages": [input_message]}, config)
 for m in output['messages'][-1:]:
     m.pretty_print()
 
 input_message = HumanMessage(content="i like the 49ers!")
-output = graph.invoke({"messages": [input_message]}, config)
+with summarizer.turn(config):
+    output = graph.invoke({"messages": [input_message]}, config)
 for m in output['messages'][-1:]:
     m.pretty_print()
 
+summarizer.close()
 
+# 오래된 checkpoint 정리 (필요할 때만 주석을 풀어서 실행)
+# thread 마다 최신 checkpoint + 20 개만 남긴다. (ttl 을 주면 그 시간 동안 쓰이지 않은 thread 는 통째로 지운다)
+# from checkpoint_compactor import CheckpointCompactor
+# with CheckpointCompactor(db_path, keep_history=20) as compactor:
+#     print(compactor.compact())
@@ -0,0 +1,403 @@
+# SqliteSaver / PooledSqliteSaver / DeltaSqliteSaver 의 db 파일 (sqlite.db, part0/sqlite.db, state_db/example.db) 은
+# super-step 마다 checkpoint 가 쌓이기만 하고 지워지지 않는다.
+#
+# CheckpointCompactor 는 그래프가 계속 쓰고 있는 db 를 작은 트랜잭션 단위로 정리한다.
+#   - (thread, checkpoint_ns) 마다 최신 checkpoint + keep_history 개만 남긴다. (지운 checkpoint 의 pending write 도 같이)
+#   - ttl 초 동안 새 checkpoint 가 없는 thread 는 통째로 지운다. (checkpoint_id 의 uuid6 시각 기준)
+#   - checkpoint 가 없는 pending write (orphan) 를 지운다.
+#   - DeltaSqliteSaver 테이블이 있으면 지워지는 부모를 참조하는 delta 를 snapshot 으로 바꾸고,
+#     어떤 checkpoint 도 참조하지 않는 blob 을 지운다.
+#   - auto_vacuum=INCREMENTAL 인 db 는 빈 페이지를 vacuum_pages 개씩 나눠서 파일에서 돌려준다.
+#     (기존 db 는 enable_incremental_vacuum() 로 한 번 전체 VACUUM 해야 한다. 그동안은 쓰기가 막힌다)
+#
+# 트랜잭션 하나는 batch_size 개의 row 만 지우고 끝나기 때문에 (BEGIN IMMEDIATE ~ COMMIT 이 짧다)
+# 그 사이사이에 그래프의 checkpoint 쓰기가 끼어들 수 있다.
+#
+# 사용 예시
+#   compactor = CheckpointCompactor("state_db/example.db", keep_history=20, ttl=7 * 24 * 3600)
+#   compactor.compact()                   # 한 번 정리하고 통계를 반환
+#   compactor.start(interval=600)         # background thread 에서 주기적으로 정리 (stop() 으로 종료)
+#
+#   python checkpoint_compactor.py state_db/example.db ../part0/sqlite.db ../../sqlite.db --keep 20 --ttl 604800
+import argparse
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set
+
+from langgraph.checkpoint.base.id import UUID
+
+from delta_sqlite_saver import DeltaSqliteSaver
+
+logger = logging.getLogger(__name__)
+
+# uuid (v1 / v6) 의 시각 기준 (1582-10-15) 에서 unix epoch 까지의 100ns 단위 수
+_UUID_EPOCH = 0x01B21DD213814000
+_CHECKPOINT_TABLES = ("checkpoints", "delta_checkpoints")
+
+
+def checkpoint_time(checkpoint_id: str) -> float:
+    """checkpoint_id (uuid6) 가 만들어진 unix 시각"""
+    return (UUID(checkpoint_id).time - _UUID_EPOCH) / 1e7
+
+
+def _placeholders(values: Sequence[Any]) -> str:
+    return ",".join("?" * len(values))
+
+
+def _hashes(channels: str) -> Iterator[str]:
+    """delta / snapshot 이 참조하는 blob hash"""
+    delta = json.loads(channels)
+    yield from delta.get("set", {}).values()
+    for _, tail in delta.get("lists", {}).values():
+        yield from tail
+
+
+class CheckpointCompactor:
+    """
+    SQLite checkpoint db 의 오래된 checkpoint / write / blob 을 온라인으로 정리합니다.
+
+    Args:
+        path: SQLite 파일 경로
+        keep_history: (thread, checkpoint_ns) 마다 최신 checkpoint 외에 더 남길 checkpoint 수
+        ttl: 이 시간(초) 동안 새 checkpoint 가 없는 thread 를 지운다 (None 이면 지우지 않는다)
+        batch_size: 트랜잭션 하나에서 지울 최대 row 수
+        pause: 트랜잭션 사이에 쉬는 시간(초). 그래프의 쓰기가 lock 을 잡을 틈을 준다.
+        vacuum_pages: incremental vacuum 한 번에 돌려줄 페이지 수
+        busy_timeout: 쓰기 lock 을 기다릴 최대 시간(초)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        keep_history: int = 10,
+        ttl: Optional[float] = None,
+        batch_size: int = 200,
+        pause: float = 0.005,
+        vacuum_pages: int = 256,
+        busy_timeout: float = 5.0,
+    ) -> None:
+        if keep_history < 0:
+            raise ValueError("keep_history must be >= 0")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.path = path
+        self.keep_history = keep_history
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.pause = pause
+        self.vacuum_pages = vacuum_pages
+        # isolation_level=None: 트랜잭션은 직접 짧게 연다.
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------ helpers
+
+    def _tables(self) -> Set[str]:
+        return {name for (name,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+    @contextmanager
+    def _transaction(self, stats: Dict[str, int]) -> Iterator[sqlite3.Cursor]:
+        cur = self.conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            yield cur
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        else:
+            cur.execute("COMMIT")
+            stats["transactions"] += 1
+        finally:
+            cur.close()
+        if self.pause:
+            time.sleep(self.pause)
+
+    # ------------------------------------------------------------------ compaction
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """모든 정리 작업을 한 번 실행하고 지운 개수를 반환한다."""
+        stats: Dict[str, int] = defaultdict(int)
+        # background thread 와 직접 호출이 겹쳐도 connection 하나를 동시에 쓰지 않도록
+        with self._lock:
+            tables = self._tables()
+            if self.ttl is not None:
+                self._expire_threads(tables, time.time() if now is None else now, stats)
+            self._prune_history(tables, stats)
+            if "writes" in tables:
+                self._drop_orphan_writes(tables, stats)
+            if "blobs" in tables:
+                self._collect_blobs(stats)
+            self._vacuum(stats)
+        return dict(stats)
+
+    def _expire_threads(self, tables: Set[str], now: float, stats: Dict[str, int]) -> None:
+        cutoff = now - self.ttl
+        latest: Dict[str, str] = {}
+        for table in _CHECKPOINT_TABLES:
+            if table in tables:
+                for thread_id, checkpoint_id in self.conn.execute(
+                    f"SELECT thread_id, MAX(checkpoint_id) FROM {table} GROUP BY thread_id"
+                ):
+                    latest[thread_id] = max(latest.get(thread_id, ""), checkpoint_id)
+        for thread_id, checkpoint_id in latest.items():
+            if checkpoint_time(checkpoint_id) < cutoff and self._delete_thread(tables, thread_id, cutoff, stats):
+                stats["threads_expired"] += 1
+
+    def _delete_thread(self, tables: Set[str], thread_id: str, cutoff: float, stats: Dict[str, int]) -> bool:
+        for table in [t for t in _CHECKPOINT_TABLES if t in tables] + (["writes"] if "writes" in tables else []):
+            while True:
+                with self._transaction(stats) as cur:
+                    if table != "writes":
+                        # 지우는 도중에 thread 가 다시 쓰이기 시작했으면 멈춘다.
+                        (newest,) = cur.execute(
+                            f"SELECT MAX(checkpoint_id) FROM {table} WHERE thread_id = ?", (thread_id,)
+                        ).fetchone()
+                        if newest is not None and checkpoint_time(newest) >= cutoff:
+                            return False
+                    # 최신 checkpoint 부터 지워서, 남아 있는 delta 가 항상 자기 snapshot 까지 따라갈 수 있게 한다.
+                    order = "ORDER BY checkpoint_id DESC" if table == "delta_checkpoints" else ""
+                    cur.execute(
+                        f"DELETE FROM {table} WHERE rowid IN "
+                        f"(SELECT rowid FROM {table} WHERE thread_id = ? {order} LIMIT ?)",
+                        (thread_id, self.batch_size),
+                    )
+                    deleted = cur.rowcount
+                stats[f"{table}_deleted"] += deleted
+                if deleted < self.batch_size:
+                    break
+        return True
+
+    def _prune_history(self, tables: Set[str], stats: Dict[str, int]) -> None:
+        keep = self.keep_history + 1
+        present = [table for table in _CHECKPOINT_TABLES if table in tables]
+        if not present:
+            return
+        # 기존 checkpoints 테이블과 delta 테이블에 나눠 저장된 thread 도 합쳐서 최신 keep 개를 남긴다.
+        union = " UNION ALL ".join(
+            f"SELECT thread_id, checkpoint_ns, checkpoint_id, '{table}' AS tbl FROM {table}" for table in present
+        )
+        groups = self.conn.execute(
+            f"SELECT thread_id, checkpoint_ns FROM ({union}) GROUP BY thread_id, checkpoint_ns HAVING COUNT(*) > ?",
+            (keep,),
+        ).fetchall()
+        for thread_id, checkpoint_ns in groups:
+            # 지울 checkpoint (최신 keep 개 다음부터). 새 것부터 지운다.
+            doomed: Dict[str, List[str]] = defaultdict(list)
+            for checkpoint_id, table in self.conn.execute(
+                f"SELECT checkpoint_id, tbl FROM ({union}) WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+                (thread_id, checkpoint_ns, keep),
+            ):
+                doomed[table].append(checkpoint_id)
+            for table, checkpoint_ids in doomed.items():
+                for start in range(0, len(checkpoint_ids), self.batch_size):
+                    batch = checkpoint_ids[start : start + self.batch_size]
+                    with self._transaction(stats) as cur:
+                        if table == "delta_checkpoints":
+                            stats["rebased"] += self._rebase_children(cur, thread_id, checkpoint_ns, batch)
+                        cur.execute(
+                            f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? "
+                            f"AND checkpoint_id IN ({_placeholders(batch)})",
+                            (thread_id, checkpoint_ns, *batch),
+                        )
+                        stats[f"{table}_deleted"] += cur.rowcount
+                        if "writes" in tables:
+                            cur.execute(
+                                f"DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? "
+                                f"AND checkpoint_id IN ({_placeholders(batch)})",
+                                (thread_id, checkpoint_ns, *batch),
+                            )
+                            stats["writes_deleted"] += cur.rowcount
+
+    def _rebase_children(self, cur: sqlite3.Cursor, thread_id: str, checkpoint_ns: str, batch: List[str]) -> int:
+        """batch 를 부모로 하는 (batch 밖의) delta 를 snapshot 으로 바꾼다. 부모 체인이 아직 남아 있을 때 해야 한다."""
+        children = cur.execute(
+            f"SELECT checkpoint_id FROM delta_checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND depth > 0 "
+            f"AND parent_checkpoint_id IN ({_placeholders(batch)}) AND checkpoint_id NOT IN ({_placeholders(batch)})",
+            (thread_id, checkpoint_ns, *batch, *batch),
+        ).fetchall()
+        for (checkpoint_id,) in children:
+            manifest = self._manifest(cur, thread_id, checkpoint_ns, checkpoint_id)
+            cur.execute(
+                "UPDATE delta_checkpoints SET depth = 0, channels = ? "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (
+                    json.dumps(DeltaSqliteSaver._diff(None, manifest), separators=(",", ":")),
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint_id,
+                ),
+            )
+        return len(children)
+
+    @staticmethod
+    def _manifest(cur: sqlite3.Cursor, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> Dict[str, Any]:
+        chain = []
+        while True:
+            row = cur.execute(
+                "SELECT parent_checkpoint_id, depth, channels FROM delta_checkpoints "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"checkpoint {checkpoint_id} (delta 의 부모) 가 없습니다.")
+            chain.append(row[2])
+            if row[1] == 0:
+                break
+            checkpoint_id = row[0]
+        manifest = None
+        for channels in reversed(chain):
+            manifest = DeltaSqliteSaver._apply(manifest, json.loads(channels))
+        return manifest
+
+    def _drop_orphan_writes(self, tables: Set[str], stats: Dict[str, int]) -> None:
+        exists = " AND ".join(
+            f"NOT EXISTS (SELECT 1 FROM {table} c WHERE c.thread_id = w.thread_id "
+            "AND c.checkpoint_ns = w.checkpoint_ns AND c.checkpoint_id = w.checkpoint_id)"
+            for table in _CHECKPOINT_TABLES
+            if table in tables
+        )
+        while True:
+            with self._transaction(stats) as cur:
+                cur.execute(
+                    f"DELETE FROM writes WHERE rowid IN (SELECT w.rowid FROM writes w WHERE {exists} LIMIT ?)",
+                    (self.batch_size,),
+                )
+                deleted = cur.rowcount
+            stats["orphan_writes_deleted"] += deleted
+            if deleted < self.batch_size:
+                return
+
+    def _collect_blobs(self, stats: Dict[str, int]) -> None:
+        # mark: 읽기 트랜잭션 하나 (같은 시점의 snapshot) 에서 참조되는 hash 와 전체 blob 을 읽는다.
+        cur = self.conn.cursor()
+        try:
+            cur.execute("BEGIN")
+            (marked,) = cur.execute("SELECT COALESCE(MAX(rowid), 0) FROM delta_checkpoints").fetchone()
+            referenced: Set[str] = set()
+            for (channels,) in cur.execute("SELECT channels FROM delta_checkpoints"):
+                referenced.update(_hashes(channels))
+            candidates = [digest for (digest,) in cur.execute("SELECT hash FROM blobs") if digest not in referenced]
+            cur.execute("COMMIT")
+        finally:
+            cur.close()
+        # sweep: 그 사이에 새로 쓰인 checkpoint (rowid > marked) 가 참조하는 hash 는 빼고 지운다.
+        for start in range(0, len(candidates), self.batch_size):
+            batch = candidates[start : start + self.batch_size]
+            with self._transaction(stats) as cur:
+                for (channels,) in cur.execute(
+                    "SELECT channels FROM delta_checkpoints WHERE rowid > ?", (marked,)
+                ).fetchall():
+                    referenced.update(_hashes(channels))
+                (marked,) = cur.execute("SELECT COALESCE(MAX(rowid), ?) FROM delta_checkpoints", (marked,)).fetchone()
+                batch = [digest for digest in batch if digest not in referenced]
+                if batch:
+                    cur.execute(f"DELETE FROM blobs WHERE hash IN ({_placeholders(batch)})", batch)
+                    stats["blobs_deleted"] += cur.rowcount
+
+    def _vacuum(self, stats: Dict[str, int]) -> None:
+        (mode,) = self.conn.execute("PRAGMA auto_vacuum").fetchone()
+        (free,) = self.conn.execute("PRAGMA freelist_count").fetchone()
+        if mode != 2:
+            # incremental 이 아니면 빈 페이지는 파일 안에서 재사용만 된다.
+            stats["free_pages"] = free
+            return
+        while free > 0:
+            # incremental_vacuum 은 결과 row 를 끝까지 읽어야 요청한 페이지를 모두 돌려준다.
+            self.conn.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})").fetchall()
+            (left,) = self.conn.execute("PRAGMA freelist_count").fetchone()
+            if left >= free:
+                break
+            stats["pages_freed"] += free - left
+            free = left
+            if self.pause:
+                time.sleep(self.pause)
+        # WAL 이면 checkpoint 를 해야 줄어든 페이지가 db 파일에 반영된다. (PASSIVE 는 다른 connection 을 기다리지 않는다)
+        (journal,) = self.conn.execute("PRAGMA journal_mode").fetchone()
+        if journal == "wal":
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+
+    def enable_incremental_vacuum(self) -> None:
+        """기존 db 를 auto_vacuum=INCREMENTAL 로 바꾼다. 전체 VACUUM 을 하기 때문에 한 번만, 쓰기가 없을 때 실행한다."""
+        with self._lock:
+            self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self.conn.execute("VACUUM")
+
+    # ------------------------------------------------------------------ background
+
+    def start(self, interval: float = 600.0) -> None:
+        """interval 초마다 compact() 를 실행하는 background thread 를 띄운다."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop() -> None:
+            while not self._stop.is_set():
+                try:
+                    stats = self.compact()
+                    logger.info("checkpoint compaction %s: %s", self.path, stats)
+                except Exception:
+                    # 정리에 실패해도 (lock timeout 등) 다음 주기에 다시 시도한다.
+                    logger.exception("checkpoint compaction failed for %s", self.path)
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=loop, name="checkpoint-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self) -> None:
+        self.stop()
+        self.conn.close()
+
+    def __enter__(self) -> "CheckpointCompactor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQLite checkpoint db compaction / retention")
+    parser.add_argument("paths", nargs="+", help="정리할 SQLite 파일")
+    parser.add_argument("--keep", type=int, default=10, help="thread 마다 최신 checkpoint 외에 남길 개수")
+    parser.add_argument("--ttl", type=float, default=None, help="이 시간(초) 동안 쓰이지 않은 thread 를 지운다")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--enable-incremental-vacuum", action="store_true", help="한 번 전체 VACUUM 해서 incremental 로 바꾼다")
+    parser.add_argument("--loop", type=float, default=None, help="이 간격(초)으로 계속 실행")
+    args = parser.parse_args()
+
+    compactors = [
+        CheckpointCompactor(path, keep_history=args.keep, ttl=args.ttl, batch_size=args.batch_size)
+        for path in args.paths
+    ]
+    if args.enable_incremental_vacuum:
+        for compactor in compactors:
+            compactor.enable_incremental_vacuum()
+    try:
+        while True:
+            for compactor in compactors:
+                print(compactor.path, compactor.compact())
+            if args.loop is None:
+                break
+            time.sleep(args.loop)
+    finally:
+        for compactor in compactors:
+            compactor.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,517 @@
+# SqliteSaver / PooledSqliteSaver 는 checkpoint 마다 channel 값 전체를 직렬화해서 저장한다.
+# messages 채널은 턴마다 길어지기 때문에 step 하나에 메시지 하나가 추가돼도 history 전체를 다시 쓰고,
+# db 크기는 (턴 수)^2 에 비례해서 늘어난다.
+#
+# 이 모듈의 DeltaSqliteSaver 는
+#   - channel 값 (list 채널은 원소 하나하나) 을 내용 hash 로 blobs 테이블에 한 번만 저장하고 (같은 메시지는 한 번만 저장)
+#   - checkpoint 에는 부모 checkpoint 대비 바뀐 채널의 hash 만 기록한다. (delta)
+#       list 채널 : 부모와 같은 앞부분 길이 + 뒤에 새로 붙은 원소 hash  (RemoveMessage 로 앞이 지워지면 남은 hash 전체)
+#       그 외 채널 : 값이 바뀌었을 때만 hash 하나
+#   - snapshot_every 번째 checkpoint 마다 전체 hash 목록 (snapshot) 을 기록해서
+#     checkpoint 하나를 읽을 때 따라가야 하는 delta 개수를 snapshot_every 이하로 제한한다.
+# 그래서 턴마다 쓰는 byte 와 db 증가량이 바뀐 내용 크기에 비례한다.
+#
+# PooledSqliteSaver (WAL + reader pool + group commit) 를 상속하고, 기존 checkpoints 테이블은 읽기만 한다.
+# (기존 example.db 의 thread 는 그대로 읽히고, 다음 put 부터 snapshot 으로 새 테이블에 저장된다)
+# 처음 열 때 delta_checkpoints / blobs 테이블을 db 파일에 추가한다. (그래서 part2/6.add_sqlite.py 는 커밋된 example.db 대신 따로 만든 db 를 쓴다)
+#
+# 제약
+#   - checkpoint 에 저장된 값 (메시지 객체 등) 은 저장한 뒤에 직접 수정하지 않는다고 가정하고
+#     thread 마다 마지막으로 저장 / 읽은 값의 객체 id -> hash 를 기억해서 바뀌지 않은 원소는 다시 직렬화하지 않는다.
+#     (memo_threads=0 이면 매번 직렬화)
+#   - delete_thread 는 checkpoint 만 지운다. 다른 thread 와 공유할 수 있는 blob 은 남는다.
+#
+# 사용 예시
+#   memory = DeltaSqliteSaver("state_db/example.db", snapshot_every=50)
+#   graph = workflow.compile(checkpointer=memory)
+import hashlib
+import heapq
+import itertools
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+)
+from langgraph.checkpoint.sqlite.utils import search_where
+
+from wal_sqlite_saver import PooledSqliteSaver
+
+# 채널 값 manifest: 일반 채널은 hash 문자열, list 채널은 원소 hash 의 tuple
+Manifest = Dict[str, Union[str, Tuple[str, ...]]]
+
+_INSERT_DELTA = (
+    "INSERT OR REPLACE INTO delta_checkpoints "
+    "(thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, depth, type, checkpoint, channels, metadata) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERT_BLOB = "INSERT OR IGNORE INTO blobs (hash, type, value) VALUES (?, ?, ?)"
+_SELECT_DELTA = (
+    "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, depth, type, checkpoint, channels, metadata "
+    "FROM delta_checkpoints"
+)
+_MISSING = object()
+# SQLite 의 bound parameter 개수 제한보다 작게 나눠서 blob 을 읽는다.
+_IN_CHUNK = 500
+
+
+def _content_hash(type_: str, value: bytes) -> str:
+    return hashlib.blake2b(type_.encode() + b"\0" + value, digest_size=16).hexdigest()
+
+
+class DeltaSqliteSaver(PooledSqliteSaver):
+    """
+    부모 checkpoint 대비 바뀐 채널만 기록하고, 값은 내용 hash 로 한 번만 저장하는 SQLite 체크포인터입니다.
+
+    Args:
+        path: SQLite 파일 경로
+        snapshot_every: 이 개수의 delta 마다 전체 manifest (snapshot) 를 기록한다.
+        cache_size: 복원한 manifest 를 메모리에 들고 있을 checkpoint 수
+        memo_threads: 마지막 값 객체의 hash 를 기억해둘 thread 수 (0 이면 기억하지 않는다)
+        pool_size, batch_size, synchronous, serde: PooledSqliteSaver 와 같다.
+
+    Examples:
+
+        >>> memory = DeltaSqliteSaver("state_db/example.db")
+        >>> graph = workflow.compile(checkpointer=memory)
+        >>> graph.invoke({"messages": [...]}, config)
+        >>> memory.stats()
+        {'commits': ..., 'checkpoints': ..., 'snapshots': ..., 'blobs_written': ..., 'bytes_written': ...}
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        snapshot_every: int = 50,
+        cache_size: int = 1024,
+        memo_threads: int = 256,
+        pool_size: int = 4,
+        batch_size: int = 256,
+        synchronous: str = "NORMAL",
+        serde: Optional[SerializerProtocol] = None,
+    ) -> None:
+        if snapshot_every < 1:
+            raise ValueError("snapshot_every must be at least 1")
+        self.snapshot_every = snapshot_every
+        self.cache_size = cache_size
+        self.memo_threads = memo_threads
+        self._lock = threading.Lock()
+        # (thread_id, checkpoint_ns, checkpoint_id) -> (depth, manifest)
+        self._manifests: "OrderedDict[Tuple[str, str, str], Tuple[int, Manifest]]" = OrderedDict()
+        # (thread_id, checkpoint_ns) -> (checkpoint_id, {id(객체): (객체, hash)}).
+        # 객체를 같이 들고 있어서 id 가 다른 객체에 재사용되지 않는다.
+        # thread 마다 최신 값만 들고 있어서 (이전 버전 객체를 쌓아두지 않아서) 메모리가 history 크기로 제한된다.
+        self._memo: "OrderedDict[Tuple[str, str], Tuple[str, Dict[int, Tuple[Any, str]]]]" = OrderedDict()
+        self._counters = {"checkpoints": 0, "snapshots": 0, "blobs_written": 0, "bytes_written": 0}
+        super().__init__(
+            path, pool_size=pool_size, batch_size=batch_size, synchronous=synchronous, serde=serde
+        )
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS delta_checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                parent_checkpoint_id TEXT,
+                depth INTEGER NOT NULL,
+                type TEXT,
+                checkpoint BLOB,
+                channels TEXT NOT NULL,
+                metadata BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                type TEXT,
+                value BLOB
+            ) WITHOUT ROWID;
+            """
+        )
+
+    # ------------------------------------------------------------------ hashing
+
+    def _hash(
+        self,
+        value: Any,
+        new_blobs: Dict[str, Tuple[str, bytes]],
+        memo: Dict[int, Tuple[Any, str]],
+        seen: Dict[int, Tuple[Any, str]],
+        reused: Dict[str, Any],
+    ) -> str:
+        """값의 내용 hash. 처음 보는 값이면 직렬화해서 new_blobs 에 넣는다. (seen 에 이번 값을 기록)"""
+        entry = memo.get(id(value))
+        if entry is not None and entry[0] is value:
+            digest = entry[1]
+            reused[digest] = value
+        else:
+            type_, data = self.serde.dumps_typed(value)
+            digest = _content_hash(type_, data)
+            new_blobs[digest] = (type_, data)
+        seen[id(value)] = (value, digest)
+        return digest
+
+    def _get_memo(self, key: Tuple[str, str], checkpoint_id: Optional[str] = None) -> Dict[int, Tuple[Any, str]]:
+        """thread 의 memo. checkpoint_id 를 주면 그 checkpoint 의 값을 기억하고 있을 때만 반환한다."""
+        with self._lock:
+            entry = self._memo.get(key)
+        if entry is None or (checkpoint_id is not None and entry[0] != checkpoint_id):
+            return {}
+        return entry[1]
+
+    def _set_memo(self, key: Tuple[str, str], checkpoint_id: str, seen: Dict[int, Tuple[Any, str]]) -> None:
+        if self.memo_threads <= 0:
+            return
+        with self._lock:
+            self._memo[key] = (checkpoint_id, seen)
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_threads:
+                self._memo.popitem(last=False)
+
+    def _cache_manifest(self, key: Tuple[str, str, str], depth: int, manifest: Manifest) -> None:
+        with self._lock:
+            self._manifests[key] = (depth, manifest)
+            self._manifests.move_to_end(key)
+            while len(self._manifests) > self.cache_size:
+                self._manifests.popitem(last=False)
+
+    # ------------------------------------------------------------------ manifest (delta chain)
+
+    @staticmethod
+    def _diff(parent: Optional[Manifest], manifest: Manifest) -> Dict[str, Any]:
+        """parent 대비 manifest 의 delta. parent 가 None 이면 snapshot (전체)"""
+        parent = parent or {}
+        values: Dict[str, str] = {}
+        lists: Dict[str, List[Any]] = {}
+        for channel, current in manifest.items():
+            previous = parent.get(channel)
+            if isinstance(current, tuple):
+                if previous == current:
+                    continue
+                keep = 0
+                if isinstance(previous, tuple):
+                    # 부모와 같은 앞부분은 길이만 기록한다.
+                    for old, new in zip(previous, current):
+                        if old != new:
+                            break
+                        keep += 1
+                lists[channel] = [keep, list(current[keep:])]
+            elif previous != current:
+                values[channel] = current
+        delta: Dict[str, Any] = {}
+        if values:
+            delta["set"] = values
+        if lists:
+            delta["lists"] = lists
+        dropped = [channel for channel in parent if channel not in manifest]
+        if dropped:
+            delta["drop"] = dropped
+        return delta
+
+    @staticmethod
+    def _apply(parent: Optional[Manifest], delta: Dict[str, Any]) -> Manifest:
+        manifest = dict(parent or {})
+        manifest.update(delta.get("set", {}))
+        for channel, (keep, tail) in delta.get("lists", {}).items():
+            previous = manifest.get(channel)
+            head = previous[:keep] if isinstance(previous, tuple) else ()
+            manifest[channel] = head + tuple(tail)
+        for channel in delta.get("drop", ()):
+            manifest.pop(channel, None)
+        return manifest
+
+    def _manifest(self, cur: sqlite3.Cursor, row: tuple) -> Tuple[int, Manifest]:
+        """delta_checkpoints row 의 manifest 를 복원한다. (가장 가까운 snapshot 까지 부모를 따라간다)"""
+        thread_id, checkpoint_ns, checkpoint_id = row[0], row[1], row[2]
+        key = (thread_id, checkpoint_ns, checkpoint_id)
+        with self._lock:
+            cached = self._manifests.get(key)
+        if cached is not None:
+            return cached
+        chain = [row]
+        base: Optional[Tuple[int, Manifest]] = None
+        while chain[-1][4] > 0:
+            parent_id = chain[-1][3]
+            with self._lock:
+                base = self._manifests.get((thread_id, checkpoint_ns, parent_id))
+            if base is not None:
+                break
+            parent = cur.execute(
+                _SELECT_DELTA + " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, parent_id),
+            ).fetchone()
+            if parent is None:
+                raise ValueError(f"checkpoint {parent_id} (delta 의 부모) 가 없습니다.")
+            chain.append(parent)
+        manifest = base[1] if base is not None else None
+        # snapshot (또는 캐시에 있던 부모) 부터 delta 를 순서대로 적용한다.
+        for item in reversed(chain):
+            manifest = self._apply(manifest, json.loads(item[7]))
+            self._cache_manifest((thread_id, checkpoint_ns, item[2]), item[4], manifest)
+        return chain[0][4], manifest
+
+    def _parent_manifest(self, config: RunnableConfig) -> Optional[Tuple[int, Manifest]]:
+        parent_id = config["configurable"].get("checkpoint_id")
+        if not parent_id:
+            return None
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self._lock:
+            cached = self._manifests.get((thread_id, checkpoint_ns, parent_id))
+        if cached is not None:
+            return cached
+        with self.cursor(transaction=False) as cur:
+            row = cur.execute(
+                _SELECT_DELTA + " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, parent_id),
+            ).fetchone()
+            # 부모가 기존 checkpoints 테이블에만 있으면 None (snapshot 으로 저장)
+            return self._manifest(cur, row) if row is not None else None
+
+    # ------------------------------------------------------------------ writes
+
+    def _put_job(
+        self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata
+    ) -> Tuple[Callable[[sqlite3.Cursor], Any], RunnableConfig]:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        parent_id = config["configurable"].get("checkpoint_id")
+        new_blobs: Dict[str, Tuple[str, bytes]] = {}
+        # 부모 checkpoint 의 값을 기억하고 있을 때만 memo 를 쓴다. (memo 의 hash 는 모두 부모가 참조하는 blob 이다)
+        memo = self._get_memo((thread_id, checkpoint_ns), parent_id) if parent_id else {}
+        seen: Dict[int, Tuple[Any, str]] = {}
+        reused: Dict[str, Any] = {}
+        manifest: Manifest = {}
+        for channel, value in checkpoint["channel_values"].items():
+            if type(value) is list:
+                manifest[channel] = tuple(self._hash(item, new_blobs, memo, seen, reused) for item in value)
+            else:
+                manifest[channel] = self._hash(value, new_blobs, memo, seen, reused)
+        self._set_memo((thread_id, checkpoint_ns), checkpoint["id"], seen)
+
+        parent = self._parent_manifest(config)
+        if parent is None or parent[0] + 1 >= self.snapshot_every:
+            depth, delta = 0, self._diff(None, manifest)
+        else:
+            depth, delta = parent[0] + 1, self._diff(parent[1], manifest)
+        channels = json.dumps(delta, separators=(",", ":"))
+        type_, serialized_checkpoint = self.serde.dumps_typed(
+            {k: v for k, v in checkpoint.items() if k != "channel_values"}
+        )
+        row = (
+            thread_id,
+            checkpoint_ns,
+            checkpoint["id"],
+            parent_id,
+            depth,
+            type_,
+            serialized_checkpoint,
+            channels,
+            self.jsonplus_serde.dumps(metadata),
+        )
+        blob_rows = [(digest, t, data) for digest, (t, data) in new_blobs.items()]
+        self._cache_manifest((thread_id, checkpoint_ns, checkpoint["id"]), depth, manifest)
+
+        def job(cur: sqlite3.Cursor) -> None:
+            nonlocal row, channels, depth
+            if depth > 0 and cur.execute(
+                "SELECT 1 FROM delta_checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, parent_id),
+            ).fetchone() is None:
+                # 그 사이 부모가 지워졌으면 (compaction / delete_thread) snapshot 으로 저장하고,
+                # memo 로 건너뛴 값 중 blob 이 같이 지워진 것은 다시 직렬화해서 넣는다.
+                depth, channels = 0, json.dumps(self._diff(None, manifest), separators=(",", ":"))
+                row = row[:4] + (depth,) + row[5:7] + (channels,) + row[8:]
+                self._cache_manifest((thread_id, checkpoint_ns, checkpoint["id"]), depth, manifest)
+                present = set(self._fetch_blobs(cur, list(reused)))
+                for digest, value in reused.items():
+                    if digest not in present:
+                        blob_rows.append((digest, *self.serde.dumps_typed(value)))
+            written = len(serialized_checkpoint) + len(channels) + len(row[8])
+            inserted = 0
+            for blob in blob_rows:
+                cur.execute(_INSERT_BLOB, blob)
+                # 이미 있는 blob (다른 checkpoint / thread 에서 저장한 같은 값) 은 INSERT OR IGNORE 로 건너뛴다.
+                if cur.rowcount:
+                    inserted += 1
+                    written += len(blob[2])
+            cur.execute(_INSERT_DELTA, row)
+            with self._lock:
+                self._counters["checkpoints"] += 1
+                self._counters["snapshots"] += depth == 0
+                self._counters["blobs_written"] += inserted
+                self._counters["bytes_written"] += written
+
+        next_config = {
+            "configurable": {
+                "thread_id": config["configurable"]["thread_id"],
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+        return job, next_config
+
+    def delete_thread(self, thread_id: str) -> None:
+        def job(cur: sqlite3.Cursor) -> None:
+            cur.execute("DELETE FROM delta_checkpoints WHERE thread_id = ?", (str(thread_id),))
+            cur.execute("DELETE FROM checkpoints WHERE thread_id = ?", (str(thread_id),))
+            cur.execute("DELETE FROM writes WHERE thread_id = ?", (str(thread_id),))
+
+        self._submit(job).result()
+        with self._lock:
+            for key in [key for key in self._manifests if key[0] == str(thread_id)]:
+                del self._manifests[key]
+
+    # ------------------------------------------------------------------ reads
+
+    @staticmethod
+    def _fetch_blobs(cur: sqlite3.Cursor, hashes: List[str]) -> Dict[str, Tuple[str, bytes]]:
+        blobs: Dict[str, Tuple[str, bytes]] = {}
+        for start in range(0, len(hashes), _IN_CHUNK):
+            chunk = hashes[start : start + _IN_CHUNK]
+            cur.execute(
+                f"SELECT hash, type, value FROM blobs WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for digest, type_, data in cur:
+                blobs[digest] = (type_, data)
+        return blobs
+
+    def _load_values(
+        self, cur: sqlite3.Cursor, manifest: Manifest, memo_key: Optional[Tuple[str, str, str]] = None
+    ) -> Dict[str, Any]:
+        # 같은 thread 에서 마지막으로 저장 / 읽은 값 중 hash 가 같은 객체는 다시 읽지 않고 그대로 쓴다.
+        known = {digest: value for value, digest in self._get_memo(memo_key[:2]).values()} if memo_key else {}
+        hashes = set()
+        for current in manifest.values():
+            if isinstance(current, tuple):
+                hashes.update(current)
+            else:
+                hashes.add(current)
+        blobs: Dict[str, Tuple[str, bytes]] = {}
+        ordered = [digest for digest in hashes if digest not in known]
+        blobs.update(self._fetch_blobs(cur, ordered))
+
+        seen: Dict[int, Tuple[Any, str]] = {}
+
+        def load(digest: str) -> Any:
+            # 한 checkpoint 안에서 같은 hash 가 또 나오면 새 객체로 만든다. (채널 값끼리 객체를 공유하지 않도록)
+            value = known.pop(digest, _MISSING)
+            if value is _MISSING:
+                if digest not in blobs:
+                    blobs.update(self._fetch_blobs(cur, [digest]))
+                value = self.serde.loads_typed(blobs[digest])
+            seen[id(value)] = (value, digest)
+            return value
+
+        values: Dict[str, Any] = {}
+        for channel, current in manifest.items():
+            if isinstance(current, tuple):
+                values[channel] = [load(digest) for digest in current]
+            else:
+                values[channel] = load(current)
+        if memo_key is not None:
+            # 이어서 실행하면 이 값들로 다음 checkpoint 를 만들기 때문에 다시 직렬화하지 않도록 기억해둔다.
+            self._set_memo(memo_key[:2], memo_key[2], seen)
+        return values
+
+    def _to_tuple(self, cur: sqlite3.Cursor, row: tuple, remember: bool = False) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, _, type_, checkpoint, _, metadata = row
+        _, manifest = self._manifest(cur, row)
+        restored = self.serde.loads_typed((type_, checkpoint))
+        restored["channel_values"] = self._load_values(
+            cur, manifest, (thread_id, checkpoint_ns, checkpoint_id) if remember else None
+        )
+        writes = cur.execute(
+            "SELECT task_id, channel, type, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            {
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            restored,
+            self.jsonplus_serde.loads(metadata) if metadata is not None else {},
+            (
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            [(task_id, channel, self.serde.loads_typed((t, v))) for task_id, channel, t, v in writes],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self.cursor(transaction=False) as cur:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = cur.execute(
+                    _SELECT_DELTA + " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = cur.execute(
+                    _SELECT_DELTA + " WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is not None:
+                return self._to_tuple(cur, row, remember=True)
+        # 이 saver 를 쓰기 전에 저장된 checkpoint (기존 checkpoints 테이블)
+        return super().get_tuple(config)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        where, param_values = search_where(config, filter, before)
+        query = f"{_SELECT_DELTA} {where} ORDER BY checkpoint_id DESC"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        legacy = super().list(config, filter=filter, before=before, limit=limit)
+        # 새 테이블과 기존 테이블의 checkpoint 를 checkpoint_id 내림차순으로 합친다.
+        merged = heapq.merge(
+            self._list_delta(query, param_values), legacy, key=lambda item: item.config["configurable"]["checkpoint_id"], reverse=True
+        )
+        yield from itertools.islice(merged, limit) if limit else merged
+
+    def _list_delta(self, query: str, param_values: Any) -> Iterator[CheckpointTuple]:
+        # 읽기 connection 은 row 하나를 복원하는 동안만 빌리고 yield 전에 돌려준다. (list 는 기존 테이블 list 와 동시에 돈다)
+        with self.cursor(transaction=False) as cur:
+            rows = cur.execute(query, param_values).fetchall()
+        for row in rows:
+            with self.cursor(transaction=False) as cur:
+                item = self._to_tuple(cur, row)
+            yield item
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        return {**super().stats(), **counters}
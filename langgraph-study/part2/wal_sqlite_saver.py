@@ -0,0 +1,388 @@
+# SqliteSaver 는 하나의 connection 을 lock 으로 감싸서 쓰기 때문에
+# 여러 thread_id 가 동시에 실행되면 체크포인트 읽기/쓰기가 모두 한 줄로 직렬화되고, put 마다 commit 을 한다.
+# 이 모듈의 PooledSqliteSaver 는
+#   - WAL 저널 모드 (읽기와 쓰기가 서로 막지 않음)
+#   - 읽기 전용 connection pool + 쓰기 전용 connection 1개 (writer thread)
+#   - group commit: 여러 thread 에서 들어온 put / put_writes 를 하나의 트랜잭션으로 묶어서 commit
+#   - async 인터페이스 (aget_tuple / alist / aput / aput_writes)
+# 를 제공한다. 테이블 스키마는 SqliteSaver 와 같아서 기존 db 파일을 그대로 사용할 수 있다.
+import asyncio
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import closing, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+)
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.utils import search_where
+
+_STOP = object()
+
+_INSERT_CHECKPOINT = (
+    "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_UPSERT_WRITES = (
+    "INSERT OR REPLACE INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERT_WRITES = (
+    "INSERT OR IGNORE INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    # isolation_level=None: 트랜잭션(BEGIN / COMMIT)은 직접 관리한다.
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+class PooledSqliteSaver(SqliteSaver):
+    """
+    WAL 모드 + 읽기 connection pool + group commit writer 를 사용하는 SQLite 체크포인터입니다.
+
+    Args:
+        path: SQLite 파일 경로. connection 을 여러 개 열어야 하므로 ":memory:" 는 사용할 수 없다.
+        pool_size: 읽기 전용 connection 개수
+        batch_size: 한 번의 commit 으로 묶을 최대 쓰기 작업 수
+        synchronous: WAL 에서는 "NORMAL" 이면 commit 마다 fsync 하지 않아도 db 가 깨지지 않는다.
+            전원이 꺼졌을 때 마지막 commit 까지 보장해야 하면 "FULL" 을 사용한다.
+
+    Examples:
+
+        >>> memory = PooledSqliteSaver("state_db/example.db")
+        >>> graph = workflow.compile(checkpointer=memory)
+        >>> await graph.ainvoke({"messages": [...]}, config)
+        >>> memory.close()
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        pool_size: int = 4,
+        batch_size: int = 256,
+        synchronous: str = "NORMAL",
+        serde: Optional[SerializerProtocol] = None,
+    ) -> None:
+        if path == ":memory:":
+            raise ValueError("PooledSqliteSaver 는 파일 db 만 지원합니다. 메모리에서는 SqliteSaver 를 사용하세요.")
+
+        writer = _connect(path)
+        # 새 db 파일이면 incremental vacuum 을 쓸 수 있게 만든다. (WAL 전환 / 테이블 생성 전에만 적용되고, 기존 파일에는 영향 없음)
+        writer.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        writer.execute("PRAGMA journal_mode=WAL")
+        writer.execute(f"PRAGMA synchronous={synchronous}")
+        super().__init__(writer, serde=serde)
+        # 테이블 생성은 writer thread 를 띄우기 전에 끝내둔다.
+        self.setup()
+
+        self.path = path
+        self.batch_size = batch_size
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            reader = _connect(path)
+            reader.execute("PRAGMA query_only=ON")
+            self._readers.put(reader)
+
+        self._jobs: "queue.Queue[Any]" = queue.Queue()
+        # close() 뒤의 읽기 / 쓰기는 멈춰서 기다리지 않고 바로 에러를 낸다.
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self.commits = 0
+        self.writes = 0
+        self._writer = threading.Thread(target=self._writer_loop, name="sqlite-writer", daemon=True)
+        self._writer.start()
+
+    # ------------------------------------------------------------------ writer (group commit)
+
+    def _writer_loop(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is _STOP:
+                return
+            batch = [job]
+            stop = False
+            # 앞의 commit 이 끝나길 기다리는 동안 쌓인 작업을 모두 꺼내서 한 트랜잭션으로 처리
+            while len(batch) < self.batch_size:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stop = True
+                    break
+                batch.append(job)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch) -> None:
+        cur = self.conn.cursor()
+        done = []
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            for fn, future in batch:
+                # 작업 하나가 실패해도 같은 batch 의 다른 작업은 commit 되도록 savepoint 로 감싼다.
+                cur.execute("SAVEPOINT job")
+                try:
+                    result = fn(cur)
+                except Exception as e:
+                    cur.execute("ROLLBACK TO job")
+                    cur.execute("RELEASE job")
+                    future.set_exception(e)
+                    continue
+                cur.execute("RELEASE job")
+                done.append((future, result))
+            cur.execute("COMMIT")
+        except Exception as e:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            for future, _ in done:
+                future.set_exception(e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            cur.close()
+        self.commits += 1
+        self.writes += len(batch)
+        # commit 이 끝난 뒤에 결과를 알려줘야 호출한 쪽에서 바로 읽어도 데이터가 보인다.
+        for future, result in done:
+            future.set_result(result)
+
+    def _submit(self, fn: Callable[[sqlite3.Cursor], Any]) -> Future:
+        future: Future = Future()
+        # close() 가 _STOP 을 넣은 뒤에 들어온 작업은 writer thread 가 처리하지 않으므로 같은 lock 으로 막는다.
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("닫힌 PooledSqliteSaver 입니다.")
+            self._jobs.put((fn, future))
+        return future
+
+    # ------------------------------------------------------------------ readers
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[sqlite3.Cursor]:
+        if transaction:
+            raise RuntimeError("PooledSqliteSaver 의 쓰기는 writer thread 에서만 실행됩니다.")
+        conn = None
+        while conn is None:
+            if self._closed:
+                raise RuntimeError("닫힌 PooledSqliteSaver 입니다.")
+            try:
+                # pool 이 비어 있는 동안 close() 되어도 계속 기다리지 않도록 조금씩 기다린다.
+                conn = self._readers.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        try:
+            with closing(conn.cursor()) as cur:
+                yield cur
+        finally:
+            if self._closed:
+                conn.close()
+            else:
+                self._readers.put(conn)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        # SqliteSaver.list 는 self.conn 을 직접 쓰기 때문에 읽기 connection 으로 다시 구현
+        where, param_values = search_where(config, filter, before)
+        query = f"""SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata
+        FROM checkpoints
+        {where}
+        ORDER BY checkpoint_id DESC"""
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        # 읽기 connection 은 yield 하는 동안 빌려두지 않는다. (loop 안에서 get_tuple / list 를 불러도 pool 이 마르지 않게)
+        with self.cursor(transaction=False) as cur:
+            rows = cur.execute(query, param_values).fetchall()
+        for thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata in rows:
+            with self.cursor(transaction=False) as cur:
+                writes = cur.execute(
+                    "SELECT task_id, channel, type, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchall()
+            yield CheckpointTuple(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": checkpoint_id,
+                    }
+                },
+                self.serde.loads_typed((type_, checkpoint)),
+                self.jsonplus_serde.loads(metadata) if metadata is not None else {},
+                (
+                    {
+                        "configurable": {
+                            "thread_id": thread_id,
+                            "checkpoint_ns": checkpoint_ns,
+                            "checkpoint_id": parent_checkpoint_id,
+                        }
+                    }
+                    if parent_checkpoint_id
+                    else None
+                ),
+                [(task_id, channel, self.serde.loads_typed((t, v))) for task_id, channel, t, v in writes],
+            )
+
+    # ------------------------------------------------------------------ writes
+
+    def _put_job(
+        self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata
+    ) -> Tuple[Callable[[sqlite3.Cursor], Any], RunnableConfig]:
+        # 직렬화는 호출한 thread 에서 미리 해두고 writer thread 는 INSERT 만 한다.
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        type_, serialized_checkpoint = self.serde.dumps_typed(checkpoint)
+        row = (
+            str(thread_id),
+            checkpoint_ns,
+            checkpoint["id"],
+            config["configurable"].get("checkpoint_id"),
+            type_,
+            serialized_checkpoint,
+            self.jsonplus_serde.dumps(metadata),
+        )
+        next_config = {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+        return (lambda cur: cur.execute(_INSERT_CHECKPOINT, row)), next_config
+
+    def _put_writes_job(
+        self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str
+    ) -> Callable[[sqlite3.Cursor], Any]:
+        query = _UPSERT_WRITES if all(w[0] in WRITES_IDX_MAP for w in writes) else _INSERT_WRITES
+        rows = [
+            (
+                str(config["configurable"]["thread_id"]),
+                str(config["configurable"]["checkpoint_ns"]),
+                str(config["configurable"]["checkpoint_id"]),
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                *self.serde.dumps_typed(value),
+            )
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        return lambda cur: cur.executemany(query, rows)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        job, next_config = self._put_job(config, checkpoint, metadata)
+        self._submit(job).result()
+        return next_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self._submit(self._put_writes_job(config, writes, task_id)).result()
+
+    def delete_thread(self, thread_id: str) -> None:
+        def job(cur: sqlite3.Cursor) -> None:
+            cur.execute("DELETE FROM checkpoints WHERE thread_id = ?", (str(thread_id),))
+            cur.execute("DELETE FROM writes WHERE thread_id = ?", (str(thread_id),))
+
+        self._submit(job).result()
+
+    # ------------------------------------------------------------------ async
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        # commit 을 기다리는 동안 event loop 를 막지 않는다 (thread 도 점유하지 않음).
+        job, next_config = self._put_job(config, checkpoint, metadata)
+        await asyncio.wrap_future(self._submit(job))
+        return next_config
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.wrap_future(self._submit(self._put_writes_job(config, writes, task_id)))
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.delete_thread, thread_id)
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def stats(self) -> dict:
+        return {
+            "commits": self.commits,
+            "writes": self.writes,
+            "writes_per_commit": self.writes / self.commits if self.commits else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._jobs.put(_STOP)
+        self._writer.join()
+        self.conn.close()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+
+    def __enter__(self) -> "PooledSqliteSaver":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
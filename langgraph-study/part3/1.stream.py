@@ -3,6 +3,11 @@ from langchain_core.messages import SystemMessage, HumanMessage, RemoveMessage
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph import MessagesState
+import os
+import sys
+# 스터디 루트의 common 패키지 (BackgroundSummarizer, subscribe_events, stream_deltas) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import BackgroundSummarizer, StateRebuilder, stream_deltas, subscribe_events
 
 # LLM
 model = ChatOpenAI(model="gpt-4o", temperature=0)
@@ -76,7 +81,9 @@ workflow.add_node(summarize_conversation)
 # Set the entrypoint as conversation
 workflow.add_edge(START, "conversation")
 
-workflow.add_conditional_edges("conversation", should_continue)
+# workflow.add_conditional_edges("conversation", should_continue)
+# 요약은 stream 이 끝난 뒤 background 에서 실행한다. (요약 LLM 의 이벤트가 사용자 stream 에 섞이지 않는다)
+workflow.add_edge("conversation", END)
 workflow.add_edge("summarize_conversation", END)
 
 memory = MemorySaver()
@@ -84,6 +91,12 @@ memory = MemorySaver()
 # Compile
 graph = workflow.compile(checkpointer=memory)
 
+summarizer = BackgroundSummarizer(
+    graph,
+    summarize_conversation,
+    should_summarize=lambda state: should_continue(state) == "summarize_conversation",
+)
+
 # stream mode - updates
 # config = {"configurable": {"thread_id": "1"}}
 
@@ -100,6 +113,15 @@ graph = workflow.compile(checkpointer=memory)
 #         m.pretty_print()
 #     print("-" * 25)
 
+# stream mode - deltas : step 마다 state 전체 대신 바뀐 채널만 받는다. (messages 는 새로 붙은 메시지만)
+# config = {"configurable": {"thread_id": "2"}}
+
+# state = StateRebuilder()
+# for delta in stream_deltas(graph, {"messages": [input_message]}, config):
+#     for m in state.apply(delta)['messages']:
+#         m.pretty_print()
+#     print("-" * 25)
+
 # stream mode - v2
 import asyncio
 
@@ -107,7 +129,17 @@ async def process_events():
     config = {"configurable": {"thread_id": "3"}}
     input_message = HumanMessage(content="Tell me about the 49ers NFL team")
     
-    async for event in graph.astream_events({"messages": [input_message]}, config, version="v2"):
-        print(f"Node: {event['metadata'].get('langgraph_node', '')}. Type: {event['event']}. Name: {event['name']}")
-
-asyncio.run(process_events())
\ No newline at end of file
+    async with summarizer.aturn(config):
+        # async for event in graph.astream_events({"messages": [input_message]}, config, version="v2"):
+        # conversation 노드의 chat model 이벤트만 구독한다. (나머지 chain / token 이벤트는 만들지 않는다)
+        async for event in subscribe_events(
+            graph,
+            {"messages": [input_message]},
+            config,
+            nodes=["conversation"],
+            events=["on_chat_model_start", "on_chat_model_stream", "on_chat_model_end"],
+        ):
+            print(f"Node: {event['metadata'].get('langgraph_node', '')}. Type: {event['event']}. Name: {event['name']}")
+
+asyncio.run(process_events())
+summarizer.close()
\ No newline at end of file
@@ -1,9 +1,15 @@
 from langchain_openai import ChatOpenAI
 from langgraph.checkpoint.memory import MemorySaver
+import os
+import sys
+# 스터디 루트의 common 패키지 (BoundedMemorySaver, PromptAssembler) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import BoundedMemorySaver, CachedPrefixChatOpenAI, PromptAssembler
 from langgraph.graph import MessagesState
 from langgraph.graph import START, StateGraph
 from langgraph.prebuilt import tools_condition, ToolNode
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 
 def multiply(a: int, b: int) -> int:
     """Multiply a and b.
@@ -34,16 +40,20 @@ def divide(a: int, b: int) -> float:
     """
     return a / b
 
-tools = [add, multiply, divide]
-llm = ChatOpenAI(model="gpt-4o")
-llm_with_tools = llm.bind_tools(tools)
-
 # System message
 sys_msg = SystemMessage(content="You are a helpful assistant tasked with performing arithmetic on a set of inputs.")
 
+# breakpoint 에서 재개할 때도 thread 의 prefix 를 재사용하고 새 메시지만 붙인다.
+prompt_assembler = PromptAssembler(sys_msg)
+
+tools = [add, multiply, divide]
+# llm = ChatOpenAI(model="gpt-4o")
+llm = CachedPrefixChatOpenAI(model="gpt-4o", prompt_assembler=prompt_assembler)
+llm_with_tools = llm.bind_tools(tools)
+
 # Node
-def assistant(state: MessagesState):
-    return {"messages": [llm_with_tools.invoke([sys_msg] + state["messages"])]}
+def assistant(state: MessagesState, config: RunnableConfig):
+    return {"messages": [llm_with_tools.invoke(prompt_assembler.assemble(state["messages"], config))]}
 
 # Graph
 builder = StateGraph(MessagesState)
@@ -63,7 +73,11 @@ builder.add_conditional_edges(
 
 builder.add_edge("tools", "assistant")
 
-memory = MemorySaver()
+# memory = MemorySaver()
+# breakpoint 에서 멈춘 뒤 재개하려면 최신 checkpoint 만 있으면 된다.
+# memory = BoundedMemorySaver(max_bytes=64 * 1024 * 1024, max_checkpoints=10)
+# 사용자 승인을 기다리는 동안 멈춘 thread 는 spill 파일로 내보낸다. (재개할 때 그 thread 만 다시 올린다)
+memory = BoundedMemorySaver(max_bytes=64 * 1024 * 1024, max_checkpoints=10, spill_path="parked_threads.db")
 graph = builder.compile(interrupt_before=["tools"], checkpointer=memory)
 
 
@@ -92,10 +106,18 @@ initial_input = {"messages": "Multiply 2 and 3"}
 
 # Thread
 thread = {"configurable": {"thread_id": "2"}}
+# 이전 실행에서 spill 파일에 남은 같은 thread 를 지우고 시작한다.
+memory.delete_thread("2")
 
 # Run the graph until the first interruption
-for event in graph.stream(initial_input, thread, stream_mode="values"):
-    event['messages'][-1].pretty_print()
+# for event in graph.stream(initial_input, thread, stream_mode="values"):
+#     event['messages'][-1].pretty_print()
+with memory.park_on_interrupt(graph, thread):
+    for event in graph.stream(initial_input, thread, stream_mode="values"):
+        event['messages'][-1].pretty_print()
+
+# 승인 대기 중인 thread (메모리에는 올라가 있지 않다)
+print(memory.pending_interrupts())
 
 # Get user feedback
 user_approval = input("Do you want to call the tool? (yes/no): ")
@@ -4,9 +4,19 @@ from typing import Annotated, TypedDict
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langchain_openai import OpenAI
+from langchain_core.globals import set_llm_cache
+import os
+import sys
+# 스터디 루트의 common 패키지 (TieredLLMCache) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import TieredLLMCache
 # API 키 정보 로드
 load_dotenv()
 
+# 같은 질문을 다시 실행하면 LLM 을 부르지 않고 캐시된 답변을 쓴다. (메모리 LRU + llm_cache.db)
+llm_cache = TieredLLMCache("llm_cache.db")
+set_llm_cache(llm_cache)
+
 #init
 class State(TypedDict):
     input: Annotated[list, add_messages]
@@ -33,4 +43,7 @@ graph = graph_builder.compile()
 question = "서울의 유명한 맛집 TOP 10 추천해줘"
 
 for event in graph.stream({"input": [("user", question)]}):
-    print(event)
\ No newline at end of file
+    print(event)
+
+# 노드별 캐시 hit / miss
+print(llm_cache.stats())
\ No newline at end of file
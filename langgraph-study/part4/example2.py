@@ -1,8 +1,15 @@
 # !pip install langchain-teddynote
 #Tool init
 from langchain_teddynote.tools.tavily import TavilySearch
-
-tool = TavilySearch(max_results=3)
+import os
+import sys
+# 스터디 루트의 common 패키지 (SingleFlightSearchTool) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import SingleFlightSearchTool
+
+# tool = TavilySearch(max_results=3)
+# 같은 검색어를 동시에 / 다시 검색하면 한 번만 요청하고 10분 동안 결과를 재사용한다.
+tool = SingleFlightSearchTool(TavilySearch(max_results=3), ttl=600)
 
 tools = [tool]
 
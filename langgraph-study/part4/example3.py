@@ -6,6 +6,11 @@ from typing import Annotated
 from typing_extensions import TypedDict
 from langchain_openai import ChatOpenAI
 from langchain_teddynote.tools.tavily import TavilySearch
+import os
+import sys
+# 스터디 루트의 common 패키지 (SingleFlightSearchTool, RunBudget) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import RunBudget, SingleFlightSearchTool
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode, tools_condition
@@ -18,7 +23,9 @@ class State(TypedDict):
     messages: Annotated[list, add_messages]
 
 # 도구 초기화
-tool = TavilySearch(max_results=3)
+# tool = TavilySearch(max_results=3)
+# 같은 검색어를 동시에 / 다시 검색하면 한 번만 요청하고 10분 동안 결과를 재사용한다.
+tool = SingleFlightSearchTool(TavilySearch(max_results=3), ttl=600)
 tools = [tool]
 
 # LLM 초기화
@@ -27,7 +34,11 @@ llm_with_tools = llm.bind_tools(tools)
 
 # 메시지 전달
 def chatbot(state: State):
-    return {"messages": [llm_with_tools.invoke(state["messages"])]}
+    # return {"messages": [llm_with_tools.invoke(state["messages"])]}
+    # 실행 예산에 deadline 이 있으면 남은 시간을 모델 요청 timeout 으로 넘긴다. (stream 이 아닌 응답도 deadline 에서 끊긴다)
+    budget = RunBudget.from_config()
+    options = budget.timeout_options() if budget else {}
+    return {"messages": [llm_with_tools.invoke(state["messages"], **options)]}
 
 # Node 초기화
 graph_builder = StateGraph(State)
@@ -61,14 +72,27 @@ config = RunnableConfig(
     configurable={"thread_id": "1"},  # 스레드 ID 설정
 )
 
+# 실행 하나의 예산 : 넘으면 에러 없이 멈추고 (멈추기 전까지의 state 는 checkpoint 에 저장) budget.reason 에 이유가 남는다.
+def print_events(stream, budget):
+    for event in stream:
+        for key, value in event.items():
+            if key == "__interrupt__":
+                # 예산 초과로 멈춤
+                print("중단 :", value[0].value)
+                continue
+            value["messages"][-1].pretty_print()
+    print(budget.usage())
+
 #질문 1
 question = (
     "내 이름은 현상 입니다. LLM 개발자에요. 만나서 반가워요"
 )
 
-for event in graph.stream({"messages": [("user", question)]}, config=config):
-    for value in event.values():
-        value["messages"][-1].pretty_print()
+# for event in graph.stream({"messages": [("user", question)]}, config=config):
+#     for value in event.values():
+#         value["messages"][-1].pretty_print()
+budget = RunBudget(max_tokens=10000, max_tool_calls=2, deadline=30, max_steps=10)
+print_events(graph.stream({"messages": [("user", question)]}, config=budget.attach(config)), budget)
 
 
 #질문2
@@ -79,6 +103,8 @@ config = RunnableConfig(
     configurable={"thread_id": "2"},  # 스레드 ID 설정
 )
 
-for event in graph.stream({"messages": [("user", question)]}, config=config):
-    for value in event.values():
-        value["messages"][-1].pretty_print()
\ No newline at end of file
+# for event in graph.stream({"messages": [("user", question)]}, config=config):
+#     for value in event.values():
+#         value["messages"][-1].pretty_print()
+budget = RunBudget(max_tokens=10000, max_tool_calls=2, deadline=30, max_steps=10)
+print_events(graph.stream({"messages": [("user", question)]}, config=budget.attach(config)), budget)
\ No newline at end of file
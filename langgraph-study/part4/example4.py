@@ -8,12 +8,19 @@ from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode, tools_condition
+# feedparser / quote 는 아래 참고용 GoogleNews 에서만 쓴다.
 import feedparser
 from urllib.parse import quote
 from typing import List, Dict, Optional
+import os
+import sys
+# 스터디 루트의 common 패키지 (AsyncNewsFetcher, stream_deltas, RunBudget) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import AsyncNewsFetcher, RunBudget, StateRebuilder, stream_deltas
 
 load_dotenv()
 
+# 원래 쓰던 GoogleNews (참고용 원본). 지금은 아래에서 common 의 AsyncNewsFetcher 를 쓰고 이 class 는 쓰지 않는다.
 class GoogleNews:
     """
     구글 뉴스를 검색하고 결과를 반환하는 클래스입니다.
@@ -62,14 +69,18 @@ class State(TypedDict):
     messages: Annotated[list, add_messages]
     dummy_data: Annotated[str, "dummy"]
 
-news_tool = GoogleNews()
+# news_tool = GoogleNews()
+# tool 호출마다 새로 만들지 않고 connection pool / ETag 캐시를 가진 fetcher 하나를 같이 쓴다.
+news_tool = AsyncNewsFetcher(timeout=10, fresh_for=60)
 
 # 뉴스 검색 툴 추가
 @tool
 def search_keyword(query: str) -> List[Dict[str, str]]:
     """Look up news by keyword"""
-    news_tool = GoogleNews()
-    return news_tool.search_by_keyword(query, k=5)
+    # news_tool = GoogleNews()
+    # 실행 예산에 deadline 이 있으면 남은 시간 안에 검색 요청을 끊는다.
+    budget = RunBudget.from_config()
+    return news_tool.search_by_keyword(query, k=5, timeout=budget.remaining() if budget else None)
 
 tools = [search_keyword]
 
@@ -79,8 +90,12 @@ llm = ChatOpenAI(model="gpt-4o")
 llm_with_tools = llm.bind_tools(tools)
 
 def chatbot(state: State):
+    # 실행 예산에 deadline 이 있으면 남은 시간을 모델 요청 timeout 으로 넘긴다. (stream 이 아닌 응답도 deadline 에서 끊긴다)
+    budget = RunBudget.from_config()
+    options = budget.timeout_options() if budget else {}
     return {
-        "messages": [llm_with_tools.invoke(state["messages"])],
+        # "messages": [llm_with_tools.invoke(state["messages"])],
+        "messages": [llm_with_tools.invoke(state["messages"], **options)],
         "dummy_data": "[chatbot] 호출, dummy data",  
     }
 
@@ -105,7 +120,9 @@ graph_builder.add_edge("tools", "chatbot")
 graph_builder.add_edge(START, "chatbot")
 graph_builder.add_edge("chatbot", END)
 
-graph = graph_builder.compile()
+# graph = graph_builder.compile()
+# 예산을 넘어 중간에 멈춘 state 를 남기기 위해 checkpointer 를 붙인다.
+graph = graph_builder.compile(checkpointer=MemorySaver())
 
 question = "미국 대선 관련 뉴스 알려줘."
 
@@ -136,13 +153,23 @@ subgraphs (bool): 하위 그래프 스트리밍 여부
 ### stream 매개변수들 사용 예시 ###
 
 
-for event in graph.stream(input=input, config=config): # stream 
+# recursion_limit 은 넘으면 에러로 끝난다. RunBudget 은 token / tool 호출 / 시간 / step 을 넘으면
+# 다음 노드 (또는 모델 / tool 호출) 에서 멈추고, 멈추기 전까지의 state 는 checkpoint 에 남는다.
+budget = RunBudget(max_tokens=20000, max_tool_calls=3, deadline=60, max_steps=10)
+
+# for event in graph.stream(input=input, config=config): # stream 
+for event in graph.stream(input=input, config=budget.attach(config)): # stream 
     for key, value in event.items():
         print(f"\n[ {key} ]\n")
         if "messages" in value:
             messages = value["messages"]
             value["messages"][-1].pretty_print()
 
+# 예산을 넘어서 멈췄으면 이유가 남는다. ({"reason": "tool_calls", "limit": 3, "used": 3, "node": "tools", "step": ...})
+print(budget.usage())
+if budget.reason:
+    print("중단된 노드 :", graph.get_state(config).next)
+
 
 #여기서 상태들을 확인할 수 있음.
 print(list(graph.channels.keys()))
@@ -161,18 +188,42 @@ input = State(dummy_data="테스트 문자열", messages=[("user", question)])
 # config 설정
 config = RunnableConfig(
     recursion_limit=10,  # 최대 10개의 노드까지 방문. 그 이상은 RecursionError 발생
-    configurable={"thread_id": "1"},  # 스레드 ID 설정
+    # configurable={"thread_id": "1"},  # 스레드 ID 설정
+    configurable={"thread_id": "2"},  # 스레드 ID 설정 (checkpointer 를 붙였으므로 첫 번째 대화와 다른 thread)
     tags=["my-rag"],  # Tag
 )
 
+budget = RunBudget(max_tokens=20000, max_tool_calls=3, deadline=60, max_steps=10)
 for event in graph.stream(
     input=input,
-    config=config,
+    # config=config,
+    config=budget.attach(config),
     output_keys=["dummy_data"], # 이거를 가지고 출력할 수 있는 범위를 정할 수 있다. 지금은 dummy_data만 출력을 하는 거임
 ):
     for key, value in event.items():
         print(f"\n[ {key} ]\n")
+        if key == "__interrupt__":
+            # 예산 초과로 멈춤
+            print(value[0].value)
+            continue
         if value:
             print(value.keys())
             if "dummy_data" in value:
-                print(value["dummy_data"])
\ No newline at end of file
+                print(value["dummy_data"])
+
+# output_keys 는 보낼 채널을 사용자가 미리 정한다. stream_deltas 는 step 마다 실제로 바뀐 채널만 골라서 보낸다.
+# (messages 는 새로 붙은 메시지만, client 는 StateRebuilder 로 전체 state 를 다시 만든다)
+config = RunnableConfig(
+    recursion_limit=10,
+    configurable={"thread_id": "3"},  # 같은 질문을 새 thread 에서 다시 실행
+    tags=["my-rag"],
+)
+state = StateRebuilder()
+budget = RunBudget(max_tokens=20000, max_tool_calls=3, deadline=60, max_steps=10)
+for delta in stream_deltas(graph, input, budget.attach(config)):
+    print(f"\n[ {', '.join(delta)} ]\n")
+    values = state.apply(delta)
+    if "dummy_data" in delta:
+        print(values["dummy_data"])
+    if "messages" in delta:
+        values["messages"][-1].pretty_print()
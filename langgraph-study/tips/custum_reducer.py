@@ -1,5 +1,10 @@
 from typing import TypedDict, List, Annotated
 from langgraph.graph import StateGraph, START, END
+import os
+import sys
+# 스터디 루트의 common 패키지 (merge_unique_documents) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import merge_unique_documents
 
 # Custom reducer: 중복된 문서를 제거하며 리스트 병합
 def reduce_unique_documents(left: list | None, right: list | None) -> list:
@@ -14,7 +19,9 @@ def reduce_unique_documents(left: list | None, right: list | None) -> list:
 # 상태 정의 (documents 필드 포함)
 class CustomReducerState(TypedDict):
     query: str
-    documents: Annotated[List[str], reduce_unique_documents]  # Custom Reducer 적용
+    # documents: Annotated[List[str], reduce_unique_documents]  # Custom Reducer 적용
+    # 순서를 유지하고 새 batch 만 확인하는 중복 제거 리듀서 (Document 도 id / 내용 hash 로 중복 제거)
+    documents: Annotated[List[str], merge_unique_documents]
 
 
 # Node 1: query 업데이트
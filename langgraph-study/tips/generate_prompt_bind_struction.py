@@ -173,6 +173,11 @@ def get_state(state):
     return "info"
 
 from langgraph.checkpoint.memory import MemorySaver
+import os
+import sys
+# 스터디 루트의 common 패키지 (BoundedMemorySaver) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import BoundedMemorySaver
 from langgraph.graph import StateGraph, START, END
 from langchain_core.messages import ToolMessage
 from langgraph.graph.message import add_messages
@@ -186,7 +191,9 @@ class State(TypedDict):
 
 
 # 메모리에 대화 기록을 저장하기 위한 MemorySaver 초기화
-memory = MemorySaver()
+# memory = MemorySaver()
+# thread 마다 최신 checkpoint 10개, 전체 64MB 까지만 메모리에 유지
+memory = BoundedMemorySaver(max_bytes=64 * 1024 * 1024, max_checkpoints=10)
 
 # 상태 그래프 초기화
 workflow = StateGraph(State)
@@ -1,10 +1,15 @@
 from typing import List, TypedDict, Annotated
 from langchain_core.documents import Document
-from operator import add
+# from operator import add
+import os
+import sys
+# 스터디 루트의 common 패키지 (append_log) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import append_log
 
 class SearchState(TypedDict):
     question: str                                            
-    documents: Annotated[List[Document], add]     # 컨텍스트 문서를 추가 
+    documents: Annotated[List[Document], append_log]     # 컨텍스트 문서를 추가 (operator.add 대신 복사 없이 append)
     filtered_documents: List[Document] 
     
     
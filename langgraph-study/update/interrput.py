@@ -9,6 +9,11 @@ from langgraph.checkpoint.memory import MemorySaver
 from langgraph.constants import START
 from langgraph.graph import StateGraph
 from langgraph.types import interrupt, Command
+import os
+import sys
+# 스터디 루트의 common 패키지 (BoundedMemorySaver) 를 import 하기 위한 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import BoundedMemorySaver
 
 
 class State(TypedDict):
@@ -34,7 +39,9 @@ builder.add_node("node", node)
 builder.add_edge(START, "node")
 
 # A checkpointer must be enabled for interrupts to work!
-checkpointer = MemorySaver()
+# checkpointer = MemorySaver()
+# interrupt 에서 답을 기다리는 thread 는 spill 파일로 내보내고, Command(resume=...) 때 그 thread 만 다시 올린다.
+checkpointer = BoundedMemorySaver(spill_path="parked_threads.db")
 graph = builder.compile(checkpointer=checkpointer)
 
 config = {
@@ -43,8 +50,13 @@ config = {
     }
 }
 
-for chunk in graph.stream({"foo": "abc"}, config):
-    print(chunk)
+# for chunk in graph.stream({"foo": "abc"}, config):
+#     print(chunk)
+with checkpointer.park_on_interrupt(graph, config):
+    for chunk in graph.stream({"foo": "abc"}, config):
+        print(chunk)
+
+print(checkpointer.pending_interrupt(config["configurable"]["thread_id"]))
 
 
 # Interrupt the graph execution.